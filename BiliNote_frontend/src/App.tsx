@@ -4,7 +4,7 @@ import {HomePage} from "./pages/Home.tsx";
 import {useTaskPolling} from "@/hooks/useTaskPolling.ts";
 
 function App() {
-    useTaskPolling(3000) // 每 3 秒轮询一次
+    useTaskPolling() // 订阅未完成任务的进度推送
 
     return (
         <>
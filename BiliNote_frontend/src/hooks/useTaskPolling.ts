@@ -1,47 +1,115 @@
 // hooks/useTaskPolling.ts
-import { useEffect } from "react"
+import { useEffect, useRef } from "react"
 import { useTaskStore } from "@/store/taskStore"
-import {get_task_status} from "@/services/note.ts";
+import {get_task_result} from "@/services/note.ts";
+import request from "@/utils/request.ts";
 
-export const useTaskPolling = (interval = 3000) => {
+// 通过 SSE 订阅任务进度，由服务端推送阶段变化，不再定时轮询
+export const useTaskPolling = () => {
     const tasks = useTaskStore(state => state.tasks)
     const updateTaskContent = useTaskStore(state => state.updateTaskContent)
     const removeTask=useTaskStore(state=>state.removeTask)
+    const sources = useRef<Record<string, EventSource>>({})
+    const transcriptSources = useRef<Record<string, EventSource>>({})
+    // 总结阶段已收到的 Markdown 行
+    const markdownLines = useRef<Record<string, string[]>>({})
+
+    // 转写过程中逐段接收转写结果，笔记生成前即可看到转写稿
+    const subscribeTranscript = (taskId: string) => {
+        if (transcriptSources.current[taskId]) return
+
+        // 结束后保留已关闭的连接，避免任务状态变化时重复订阅
+        const source = new EventSource(`${request.defaults.baseURL}/task_transcript/${taskId}`)
+        transcriptSources.current[taskId] = source
+        const close = () => source.close()
+
+        source.addEventListener("segment", (event) => {
+            const segment = JSON.parse((event as MessageEvent).data)
+            const task = useTaskStore.getState().tasks.find(t => t.id === taskId)
+            if (!task || task.status === "SUCCESS") return
+            // 片段序号即 SSE 事件 id，重连后重复收到的片段直接忽略
+            const index = Number((event as MessageEvent).lastEventId)
+            if (index < task.transcript.segments.length) return
+            updateTaskContent(taskId, {
+                transcript: {
+                    ...task.transcript,
+                    segments: [...task.transcript.segments, segment],
+                    full_text: `${task.transcript.full_text} ${segment.text}`.trim(),
+                },
+            })
+        })
+        source.addEventListener("end", close)
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) close()
+        }
+    }
+
     useEffect(() => {
-        const timer = setInterval(async () => {
-            const pendingTasks = tasks.filter(
-                (task) => task.status === "PENDING" || task.status === "running"
-            )
-
-            for (const task of pendingTasks) {
-                try {
-                    console.log(task)
-                    const res = await get_task_status(task.id)
-                    const {status}=res.data
-
-                    if (status && status !== task.status) {
-                        if (status === "SUCCESS") {
-                            const { markdown, transcript, audio_meta, timings } = res.data.result
-
-                            updateTaskContent(task.id, {
-                                status,
-                                markdown,
-                                transcript,
-                                audioMeta: audio_meta,
-                                timings,
-                            })
-                        } else {
-                            updateTaskContent(task.id, { status })
-                        }
+        const pendingTasks = tasks.filter(
+            (task) => task.status === "PENDING" || task.status === "RUNNING"
+        )
+
+        for (const task of pendingTasks) {
+            subscribeTranscript(task.id)
+            if (sources.current[task.id]) continue
+
+            const source = new EventSource(`${request.defaults.baseURL}/task_events/${task.id}`)
+            sources.current[task.id] = source
+            const close = () => {
+                source.close()
+                delete sources.current[task.id]
+            }
+
+            source.addEventListener("markdown", (event) => {
+                // 重连后服务端会从第 0 行重新发送，按行号覆盖即可
+                const { index, lines } = JSON.parse((event as MessageEvent).data)
+                const current = (markdownLines.current[task.id] || []).slice(0, index)
+                markdownLines.current[task.id] = current.concat(lines)
+                updateTaskContent(task.id, { markdown: markdownLines.current[task.id].join("\n") })
+            })
+
+            source.addEventListener("progress", async (event) => {
+                const progress = JSON.parse((event as MessageEvent).data)
+                if (progress.stage === "done") {
+                    close()
+                    delete markdownLines.current[task.id]
+                    try {
+                        // 进度事件不含笔记内容，完成后拉取一次完整结果
+                        const res = await get_task_result(task.id)
+                        const { markdown, transcript, audio_meta, timings } = res.data
+                        updateTaskContent(task.id, {
+                            status: "SUCCESS",
+                            markdown,
+                            transcript,
+                            audioMeta: audio_meta,
+                            timings,
+                            progress,
+                        })
+                    } catch (e) {
+                        console.error("❌ 获取笔记结果失败：", e)
+                        removeTask(task.id)
                     }
-                } catch (e) {
-                    console.error("❌ 任务轮询失败：", e)
-                    removeTask(task.id)
+                } else if (progress.stage === "failed") {
+                    close()
+                    updateTaskContent(task.id, { status: "FAILED", progress })
+                } else {
+                    updateTaskContent(task.id, { progress })
+                }
+            })
 
+            source.onerror = () => {
+                // 网络中断时 EventSource 会自动重连，只有服务端拒绝（如任务不存在）时才会关闭
+                if (source.readyState === EventSource.CLOSED) {
+                    console.error("❌ 任务进度订阅失败：", task.id)
+                    close()
+                    removeTask(task.id)
                 }
             }
-        }, interval)
+        }
+    }, [tasks])
 
-        return () => clearInterval(timer)
-    }, [interval, tasks])
+    useEffect(() => () => {
+        Object.values(sources.current).forEach(source => source.close())
+        Object.values(transcriptSources.current).forEach(source => source.close())
+    }, [])
 }
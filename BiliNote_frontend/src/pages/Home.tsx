@@ -20,7 +20,8 @@ export const HomePage:FC =()=>{
         if (!currentTask) {
             setStatus('idle')
         } else if (currentTask.status === 'PENDING') {
-            setStatus('loading')
+            // 总结阶段已开始输出时直接展示生成中的笔记
+            setStatus(currentTask.markdown ? 'success' : 'loading')
         } else if (currentTask.status === 'SUCCESS') {
             setStatus('success')
         }
@@ -27,6 +27,7 @@ const MarkdownViewer: FC<MarkdownViewerProps> = ({ content, status }) => {
     const [elapsedTime, setElapsedTime] = useState(0)
     const getCurrentTask = useTaskStore.getState().getCurrentTask
     const currentTask = getCurrentTask()
+    const liveSegments = currentTask?.transcript?.segments.slice(-20) ?? []
 
     // 计时器逻辑 - 仅在加载状态下运行
     useEffect(() => {
@@ -83,6 +84,17 @@ const MarkdownViewer: FC<MarkdownViewerProps> = ({ content, status }) => {
                     </div>
                     <p className="mt-2 text-xs text-neutral-500">这可能需要几分钟时间，取决于视频长度</p>
                 </div>
+                {/* 转写过程中实时显示最新的转写片段 */}
+                {liveSegments.length > 0 && (
+                    <div className="w-full max-w-xl max-h-48 overflow-y-auto rounded-md border border-neutral-200 bg-neutral-50 p-3 text-xs text-neutral-600 space-y-1">
+                        {liveSegments.map((segment) => (
+                            <p key={segment.start}>
+                                <span className="font-mono text-neutral-400 mr-2">{formatTime(Math.floor(segment.start))}</span>
+                                {segment.text}
+                            </p>
+                        ))}
+                    </div>
+                )}
             </div>
         )
     }
@@ -7,6 +7,16 @@ import { Trash ,Clock} from "lucide-react"
 import { Button } from "@/components/ui/button"
 import { Tooltip, TooltipContent, TooltipProvider, TooltipTrigger } from "@/components/ui/tooltip"
 
+// 任务进度阶段对应的显示文案
+const STAGE_LABELS: Record<string, string> = {
+    queued: "排队中",
+    running: "处理中",
+    downloading: "下载中",
+    transcribing: "转写中",
+    summarizing: "总结中",
+    screenshots: "截图中",
+}
+
 interface NoteHistoryProps {
     onSelect: (taskId: string) => void
     selectedId: string | null
@@ -62,7 +72,12 @@ const NoteHistory: FC<NoteHistoryProps> = ({ onSelect, selectedId }) => {
                                 </TooltipProvider>
                                 <div className="shrink-0">
                                     {task.status === "SUCCESS" && <Badge variant="default">已完成</Badge>}
-                                    {task.status === "PENDING" && <Badge variant="outline">等待中</Badge>}
+                                    {task.status === "PENDING" && (
+                                        <Badge variant="outline">
+                                            {STAGE_LABELS[task.progress?.stage ?? ""] || "等待中"}
+                                            {task.progress?.percent != null && ` ${Math.round(task.progress.percent)}%`}
+                                        </Badge>
+                                    )}
                                     {task.status === "FAILED" && <Badge variant="destructive">失败</Badge>}
                                 </div>
                             </div>
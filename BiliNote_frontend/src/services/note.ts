@@ -94,4 +94,15 @@ export const get_task_status=async (task_id:string)=>{
 
         throw e // 抛出错误以便调用方处理
     }
-}
\ No newline at end of file
+}
+
+export const get_task_result=async (task_id:string)=>{
+    try {
+        const response = await request.get("/task_result/"+task_id)
+        return response.data
+    }
+    catch (e){
+        console.error("❌ 获取笔记结果失败", e)
+        throw e
+    }
+}
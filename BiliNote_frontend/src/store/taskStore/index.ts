@@ -2,7 +2,7 @@ import { create } from 'zustand'
 import { persist } from 'zustand/middleware'
 import {delete_task} from "@/services/note.ts";
 
-export type TaskStatus = 'PENDING' | 'RUNNING' | 'SUCCESS' | 'FAILD'
+export type TaskStatus = 'PENDING' | 'RUNNING' | 'SUCCESS' | 'FAILED'
 
 export interface AudioMeta {
     cover_url: string
@@ -36,6 +36,13 @@ export interface Timings {
     total?: number
 }
 
+export interface TaskProgress {
+    stage: 'queued' | 'running' | 'downloading' | 'transcribing' | 'summarizing' | 'screenshots' | 'done' | 'failed'
+    percent: number | null
+    queue_position?: number
+    error?: string
+}
+
 export interface Task {
     id: string
     markdown: string
@@ -44,6 +51,7 @@ export interface Task {
     audioMeta: AudioMeta
     createdAt: string
     timings?: Timings
+    progress?: TaskProgress
 }
 
 interface TaskStore {
@@ -65,7 +73,10 @@ export const useTaskStore = create<TaskStore>()(
             currentTaskId: null,
 
             addPendingTask: (taskId: string,platform: string) =>
-                set((state) => ({
+                set((state) => state.tasks.some((task) => task.id === taskId)
+                    // 相同视频的任务正在进行时后端会返回同一个 task_id，只切换到该任务
+                    ? { currentTaskId: taskId }
+                    : {
                     tasks: [
                         {
                             id: taskId,
@@ -99,7 +110,7 @@ export const useTaskStore = create<TaskStore>()(
                         ...state.tasks,
                     ],
                     currentTaskId: taskId, // 默认设置为当前任务
-                })),
+                }),
 
             updateTaskContent: (id, data) =>
                 set((state) => ({
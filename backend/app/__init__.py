@@ -1,5 +1,7 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from .routers import note
+from .services.warmup import warmup
 
 
 def create_app() -> FastAPI:
@@ -10,6 +12,12 @@ def create_app() -> FastAPI:
     async def health_check():
         return {"status": "ok"}
 
+    @app.get("/ready")
+    async def ready_check():
+        # 预热完成前返回 503，供编排系统判断是否可以转发流量
+        state = warmup.snapshot()
+        return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
     @app.get("/")
     async def root():
         return {"message": "Welcome to BiliNote API"}
@@ -0,0 +1,114 @@
+import time
+import zlib
+from typing import Optional
+
+from .sqlite_client import get_connection, get_db_path
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SqliteCache:
+    """
+    基于 SQLite 的键值缓存：
+    - value 以 zlib 压缩存储
+    - 总大小超过 max_bytes 时按最近访问时间淘汰（LRU）
+    - 可选 ttl_seconds，过期条目读取时视为未命中
+    - 可选 tag 字段，用于按业务维度（如视频）做二级查询
+    """
+
+    def __init__(self, db_name: str, table: str, max_bytes: int, ttl_seconds: Optional[float] = None):
+        self.db_path = get_db_path(db_name)
+        self.table = table
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._init_table()
+
+    def _init_table(self):
+        conn = get_connection(self.db_path)
+        with conn:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    tag TEXT,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_last_access ON {self.table} (last_access)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_tag ON {self.table} (tag)")
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            conn = get_connection(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                with conn:
+                    cursor.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+            with conn:
+                cursor.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (time.time(), key))
+            return zlib.decompress(row[0]).decode("utf-8")
+        except Exception as e:
+            logger.error(f"读取缓存失败 {self.table}: {e}")
+            return None
+
+    def has_tag(self, tag: str) -> bool:
+        try:
+            conn = get_connection(self.db_path)
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT created_at FROM {self.table} WHERE tag = ? ORDER BY created_at DESC LIMIT 1", (tag,))
+            row = cursor.fetchone()
+            return row is not None and not self._expired(row[0])
+        except Exception as e:
+            logger.error(f"查询缓存失败 {self.table}: {e}")
+            return False
+
+    def set(self, key: str, value: str, tag: Optional[str] = None):
+        data = zlib.compress(value.encode("utf-8"))
+        if len(data) > self.max_bytes:
+            logger.warning(f"缓存条目过大，跳过写入 {self.table}: {len(data)} bytes")
+            return
+        now = time.time()
+        try:
+            conn = get_connection(self.db_path)
+            with conn:
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO {self.table} (key, tag, value, size, created_at, last_access)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (key, tag, data, len(data), now, now))
+            with conn:
+                self._evict(conn)
+        except Exception as e:
+            logger.error(f"写入缓存失败 {self.table}: {e}")
+
+    def _evict(self, conn):
+        """
+        删除过期条目，再按 LRU 淘汰直到总大小不超过上限
+        """
+        cursor = conn.cursor()
+        if self.ttl_seconds is not None:
+            cursor.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+        cursor.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}")
+        total = cursor.fetchone()[0]
+        if total > self.max_bytes:
+            overflow = total - self.max_bytes
+            cursor.execute(f"SELECT key, size FROM {self.table} ORDER BY last_access ASC")
+            victims = []
+            for key, size in cursor.fetchall():
+                if overflow <= 0:
+                    break
+                victims.append((key,))
+                overflow -= size
+            cursor.executemany(f"DELETE FROM {self.table} WHERE key = ?", victims)
+            logger.info(f"缓存 {self.table} 淘汰 {len(victims)} 条")
@@ -0,0 +1,192 @@
+import os
+import socket
+import sqlite3
+from typing import Optional, Tuple
+
+from .sqlite_client import get_connection
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+# 当前进程标识，用于重启时识别哪些 running 任务已无人处理
+WORKER_OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def init_note_job_table():
+    conn = get_connection()
+    cursor = conn.cursor()
+    with conn:
+        _create_note_job_table(cursor)
+    logger.info("note_jobs table created successfully.")
+
+
+def _create_note_job_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS note_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id TEXT NOT NULL UNIQUE,
+            payload TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'queued',
+            owner TEXT,
+            dedup_key TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_note_jobs_queue
+        ON note_jobs (status, priority DESC, id)
+    """)
+    # 旧表补充 dedup_key 字段
+    cursor.execute("PRAGMA table_info(note_jobs)")
+    if 'dedup_key' not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE note_jobs ADD COLUMN dedup_key TEXT")
+    # 同一个 dedup_key 同时只能有一个排队中或执行中的任务，由数据库保证原子性（多进程同样有效）
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_note_jobs_inflight
+        ON note_jobs (dedup_key) WHERE status IN ('queued', 'running')
+    """)
+
+
+def insert_note_job(task_id: str, payload: str, priority: int = 0, dedup_key: Optional[str] = None) -> str:
+    """
+    入队任务，返回实际负责该请求的 task_id：
+    若已有相同 dedup_key 的任务在排队或执行中，不再入队，直接返回已有任务的 task_id
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        with conn:
+            cursor.execute("""
+                INSERT INTO note_jobs (task_id, payload, priority, dedup_key)
+                VALUES (?, ?, ?, ?)
+            """, (task_id, payload, priority, dedup_key))
+        logger.info(f"Note job queued. task_id: {task_id} priority: {priority}")
+        return task_id
+    except sqlite3.IntegrityError:
+        existing = _find_inflight(cursor, dedup_key)
+        if existing is None:
+            raise
+        logger.info(f"Note job coalesced. dedup_key: {dedup_key} -> task_id: {existing}")
+        return existing
+
+
+def _find_inflight(cursor, dedup_key: str) -> Optional[str]:
+    cursor.execute("""
+        SELECT task_id FROM note_jobs
+        WHERE dedup_key = ? AND status IN ('queued', 'running')
+        LIMIT 1
+    """, (dedup_key,))
+    row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def get_inflight_task(dedup_key: str) -> Optional[str]:
+    return _find_inflight(get_connection().cursor(), dedup_key)
+
+
+def count_queued_jobs() -> int:
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT COUNT(*) FROM note_jobs WHERE status = 'queued'")
+    return cursor.fetchone()[0]
+
+
+def claim_next_job() -> Optional[Tuple[str, str]]:
+    """
+    原子地取出优先级最高、最早入队的任务并标记为 running
+    BEGIN IMMEDIATE 保证多个进程同时领取时不会拿到同一个任务
+    """
+    conn = get_connection()
+    # 复用的连接处于自动事务模式，这里临时切换为手动控制事务，结束后恢复
+    conn.isolation_level = None
+    cursor = conn.cursor()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("""
+            SELECT id, task_id, payload FROM note_jobs
+            WHERE status = 'queued'
+            ORDER BY priority DESC, id ASC
+            LIMIT 1
+        """)
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute("COMMIT")
+            return None
+        cursor.execute("""
+            UPDATE note_jobs
+            SET status = 'running', owner = ?, started_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (WORKER_OWNER, row[0]))
+        cursor.execute("COMMIT")
+        return row[1], row[2]
+    except Exception:
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = ''
+
+
+def finish_note_job(task_id: str, status: str):
+    conn = get_connection()
+    with conn:
+        conn.execute("""
+            UPDATE note_jobs
+            SET status = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE task_id = ?
+        """, (status, task_id))
+
+
+def _owner_alive(owner: Optional[str]) -> bool:
+    if not owner or ':' not in owner:
+        return False
+    host, pid = owner.rsplit(':', 1)
+    if host != socket.gethostname():
+        # 其他机器上的进程无法判断，保守地认为仍在运行
+        return True
+    if int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+        return True
+    except OSError:
+        return False
+
+
+def requeue_orphan_jobs() -> int:
+    """
+    进程重启后，把所属进程已经退出的 running 任务重新放回队列
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT task_id, owner FROM note_jobs WHERE status = 'running'")
+    orphans = [(task_id,) for task_id, owner in cursor.fetchall() if not _owner_alive(owner)]
+    with conn:
+        cursor.executemany("""
+            UPDATE note_jobs SET status = 'queued', owner = NULL, started_at = NULL
+            WHERE task_id = ?
+        """, orphans)
+    if orphans:
+        logger.info(f"重新入队 {len(orphans)} 个中断的任务")
+    return len(orphans)
+
+
+def get_job_state(task_id: str) -> Optional[Tuple[str, int]]:
+    """
+    返回 (状态, 排队位置)，排队位置从 1 开始，非 queued 状态时为 0
+    """
+    cursor = get_connection().cursor()
+    cursor.execute("SELECT id, status, priority FROM note_jobs WHERE task_id = ?", (task_id,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    job_id, status, priority = row
+    position = 0
+    if status == 'queued':
+        cursor.execute("""
+            SELECT COUNT(*) FROM note_jobs
+            WHERE status = 'queued' AND (priority > ? OR (priority = ? AND id < ?))
+        """, (priority, priority, job_id))
+        position = cursor.fetchone()[0] + 1
+    return status, position
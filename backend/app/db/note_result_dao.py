@@ -0,0 +1,113 @@
+import json
+import os
+import zlib
+from typing import Optional, Tuple
+
+from .sqlite_client import get_connection
+from app.utils.logger import get_logger
+logger = get_logger(__name__)
+
+
+def _pack(value) -> Optional[bytes]:
+    if value is None:
+        return None
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def _unpack(data: Optional[bytes]):
+    if data is None:
+        return None
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def init_note_result_table():
+    conn = get_connection()
+    with conn:
+        # 状态单独成列，轮询只读这一列；markdown 和转写结果分别压缩存储，按需读取
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS note_results (
+                task_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                error TEXT,
+                markdown BLOB,
+                transcript BLOB,
+                audio_meta TEXT,
+                timings TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+    logger.info("note_results table created successfully.")
+
+
+def save_note_result(task_id: str, result: dict):
+    """
+    保存任务结果，result 为 asdict(NoteResult) 或 asdict(ErrorResult)
+    """
+    error = result.get("error")
+    conn = get_connection()
+    with conn:
+        conn.execute("""
+            INSERT OR REPLACE INTO note_results
+                (task_id, status, error, markdown, transcript, audio_meta, timings)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (
+            task_id,
+            'FAILED' if error is not None else 'SUCCESS',
+            error,
+            _pack(result.get("markdown")),
+            _pack(result.get("transcript")),
+            json.dumps(result["audio_meta"], ensure_ascii=False) if result.get("audio_meta") is not None else None,
+            json.dumps(result["timings"]) if result.get("timings") is not None else None,
+        ))
+    logger.info(f"Note result saved. task_id: {task_id}")
+
+
+def get_note_status(task_id: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    返回 (状态, 错误信息)，不读取 markdown 和转写结果
+    """
+    row = get_connection().execute(
+        "SELECT status, error FROM note_results WHERE task_id = ?", (task_id,)
+    ).fetchone()
+    return (row[0], row[1]) if row else None
+
+
+def get_note_result(task_id: str, with_transcript: bool = True) -> Optional[dict]:
+    columns = "markdown, audio_meta, timings" + (", transcript" if with_transcript else "")
+    row = get_connection().execute(
+        f"SELECT {columns} FROM note_results WHERE task_id = ?", (task_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    result = {
+        "markdown": _unpack(row[0]),
+        "audio_meta": json.loads(row[1]) if row[1] else None,
+        "timings": json.loads(row[2]) if row[2] else None,
+    }
+    if with_transcript:
+        result["transcript"] = _unpack(row[3])
+    return result
+
+
+def import_json_results(directory: str) -> int:
+    """
+    把旧版 <task_id>.json 结果文件导入数据库，导入后重命名为 .json.migrated，返回导入数量
+    """
+    if not os.path.isdir(directory):
+        return 0
+    count = 0
+    for name in os.listdir(directory):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                content = json.load(f)
+            save_note_result(name[:-len(".json")], content)
+            os.replace(path, path + ".migrated")
+            count += 1
+        except Exception as e:
+            logger.error(f"Failed to import note result {path}: {e}")
+    if count:
+        logger.info(f"已导入 {count} 个旧版笔记结果文件")
+    return count
@@ -1,4 +1,59 @@
+import os
 import sqlite3
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def resolve_legacy_path(name: str) -> str:
+    """
+    旧版相对启动时的工作目录创建 note_tasks.db、note_results（如在仓库根目录运行 start_dev.bat），
+    工作目录下已有该文件时继续使用，历史记录不会丢失；否则固定放在 backend 目录下
+    """
+    cwd_path = os.path.abspath(name)
+    if os.path.exists(cwd_path):
+        return cwd_path
+    return os.path.join(BACKEND_DIR, name)
+
+
+# 数据库路径可通过 NOTE_DB_PATH 指定
+DB_PATH = os.getenv('NOTE_DB_PATH') or resolve_legacy_path("note_tasks.db")
+# 等待其他连接释放写锁的时间（毫秒）
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))
+# 每个连接缓存的预编译语句数量
+SQLITE_STATEMENT_CACHE = int(os.getenv('SQLITE_STATEMENT_CACHE', 256))
+
+# 每个线程对每个数据库文件持有一个长连接
+_local = threading.local()
+
+
+def get_db_path(name: str) -> str:
+    """
+    与 note_tasks.db 放在同一目录下的其他数据库文件路径
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), name)
+
+
+def _open(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                           cached_statements=SQLITE_STATEMENT_CACHE)
+    # WAL 模式下读写互不阻塞，多个读线程可以和写入同时进行
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    return conn
+
+
+def get_connection(db_path: str = DB_PATH) -> sqlite3.Connection:
+    """
+    返回当前线程复用的连接：连接在线程内长期保持，预编译语句缓存随之复用
+    调用方不要关闭连接，用 `with conn:` 提交或回滚事务
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_path)
+    if conn is None:
+        conn = connections[db_path] = _open(db_path)
+    return conn
 
-def get_connection():
-    return sqlite3.connect("note_tasks.db")
@@ -1,3 +1,5 @@
+from typing import Iterable, Tuple
+
 from .sqlite_client import get_connection
 from app.utils.logger import get_logger
 logger = get_logger(__name__)
@@ -6,20 +8,23 @@ def init_video_task_table():
     if conn is None:
         logger.error("Failed to connect to the database.")
         return
-    cursor = conn.cursor()
 
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS video_tasks (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            video_id TEXT NOT NULL,
-            platform TEXT NOT NULL,
-            task_id TEXT NOT NULL UNIQUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
     try:
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS video_tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    video_id TEXT NOT NULL,
+                    platform TEXT NOT NULL,
+                    task_id TEXT NOT NULL UNIQUE,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            # get_task_by_video 按 (platform, video_id) 查询最新任务，索引同时覆盖排序
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_video_tasks_lookup
+                ON video_tasks (platform, video_id, created_at)
+            """)
         logger.info("video_tasks table created successfully.")
     except Exception as e:
         logger.error(f"Failed to create video_tasks table: {e}")
@@ -27,13 +32,11 @@ def init_video_task_table():
 def insert_video_task(video_id: str, platform: str, task_id: str):
     try:
         conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO video_tasks (video_id, platform, task_id)
-            VALUES (?, ?, ?)
-        """, (video_id, platform, task_id))
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute("""
+                INSERT INTO video_tasks (video_id, platform, task_id)
+                VALUES (?, ?, ?)
+            """, (video_id, platform, task_id))
         logger.info(f"Video task inserted successfully."
                     f"video_id: {video_id}"
                     f"platform: {platform}"
@@ -42,22 +45,39 @@ def insert_video_task(video_id: str, platform: str, task_id: str):
         logger.error(f"Failed to insert video task: {e}")
 
 
+def insert_video_tasks(rows: Iterable[Tuple[str, str, str]]) -> int:
+    """
+    批量写入 (video_id, platform, task_id)，在同一个事务中完成，返回写入条数
+    """
+    rows = list(rows)
+    try:
+        conn = get_connection()
+        with conn:
+            conn.executemany("""
+                INSERT INTO video_tasks (video_id, platform, task_id)
+                VALUES (?, ?, ?)
+            """, rows)
+        logger.info(f"Video tasks inserted successfully. count: {len(rows)}")
+        return len(rows)
+    except Exception as e:
+        logger.error(f"Failed to insert video tasks: {e}")
+        return 0
+
+
 def get_task_by_video(video_id: str, platform: str):
     try:
         conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
+        result = conn.execute("""
             SELECT task_id FROM video_tasks
-            WHERE video_id = ? AND platform = ?
-            ORDER BY created_at DESC
+            WHERE platform = ? AND video_id = ?
+            ORDER BY created_at DESC, id DESC
             LIMIT 1
-        """, (video_id, platform))
-        result = cursor.fetchone()
-        conn.close()
+        """, (platform, video_id)).fetchone()
         if result is None:
             logger.info(f"No task found for video_id: {video_id} and platform: {platform}")
+            return None
         logger.info(f"Task found for video_id: {video_id} and platform: {platform}")
-        return result[0] if result else None
+        return result[0]
     except Exception as e:
         logger.error(f"Failed to get task by video: {e}")
 
@@ -65,14 +85,11 @@ def get_task_by_video(video_id: str, platform: str):
 def delete_task_by_video(video_id: str, platform: str):
     try:
         conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            DELETE FROM video_tasks
-            WHERE video_id = ? AND platform = ?
-        """, (video_id, platform))
-
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute("""
+                DELETE FROM video_tasks
+                WHERE platform = ? AND video_id = ?
+            """, (platform, video_id))
         logger.info(f"Task deleted for video_id: {video_id} and platform: {platform}")
     except Exception as e:
-        logger.error(f"Failed to delete task by video: {e}")
\ No newline at end of file
+        logger.error(f"Failed to delete task by video: {e}")
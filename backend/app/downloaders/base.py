@@ -5,34 +5,100 @@ from typing import Optional, Union
 
 from app.enmus.note_enums import DownloadQuality
 from app.models.notes_model import AudioDownloadResult
+from app.models.audio_model import RemoteMediaSource
 from os import getenv
-QUALITY_MAP = {
-    "fast": "32",
-    "medium": "64",
-    "slow": "128"
+
+# 截图用视频流的目标高度（像素），只需要看清画面，不需要高清
+SCREENSHOT_HEIGHT_MAP = {
+    "fast": 360,
+    "medium": 480,
+    "slow": 720
 }
 
 
+def get_screenshot_height(quality: DownloadQuality = "fast") -> int:
+    """
+    截图目标分辨率，优先使用 SCREENSHOT_TARGET_HEIGHT 环境变量
+    """
+    height = getenv('SCREENSHOT_TARGET_HEIGHT')
+    if height:
+        return int(height)
+    return SCREENSHOT_HEIGHT_MAP.get(getattr(quality, 'value', quality), SCREENSHOT_HEIGHT_MAP['medium'])
+
+
+def screenshot_format_selector(quality: DownloadQuality = "fast") -> str:
+    """
+    yt-dlp 格式选择：满足目标高度的最小纯视频流，
+    都达不到时取最清晰的纯视频流，平台没有纯视频流时退回最小的音视频合一格式
+    """
+    height = get_screenshot_height(quality)
+    return f"wv[height>={height}]/bv[height<{height}]/wv/worst[height>={height}]/worst"
+
+
 class Downloader(ABC):
     def __init__(self):
-        #TODO 需要修改为可配置
-        self.quality = QUALITY_MAP.get('fast')
         self.cache_data=getenv('DATA_DIR')
 
+    def extract_info(self, video_url: str) -> Optional[dict]:
+        '''
+        只解析一次视频信息（不下载），结果传给下面各方法的 info 参数，避免每一步都重新请求平台
+
+        :param video_url: 资源链接
+        :return: 平台的原始 info；不支持的平台返回 None，各方法自行解析
+        '''
+        return None
+
     @abstractmethod
     def download(self, video_url: str, output_dir: str = None,
-                 quality: DownloadQuality = "fast", need_video: Optional[bool] = False) -> AudioDownloadResult:
+                 quality: DownloadQuality = "fast", need_video: Optional[bool] = False,
+                 info: Optional[dict] = None) -> AudioDownloadResult:
         '''
 
         :param need_video:
         :param video_url: 资源链接
         :param output_dir: 输出路径 默认根目录data
         :param quality: 音频质量 fast | medium | slow
+        :param info: extract_info 的结果，传入时不再重复解析
         :return:返回一个 AudioDownloadResult 类
         '''
         pass
 
     @staticmethod
     def download_video(self, video_url: str,
-                       output_dir: Union[str, None] = None) -> str:
+                       output_dir: Union[str, None] = None,
+                       quality: DownloadQuality = "fast",
+                       info: Optional[dict] = None) -> str:
+        '''
+        下载截图用的视频（低分辨率、不含音频、不转码）
+
+        :param quality: 截图清晰度 fast | medium | slow，对应 SCREENSHOT_HEIGHT_MAP
+        :param info: extract_info 的结果，传入时不再重复解析
+        :return: 视频文件路径
+        '''
         pass
+
+    def resolve_audio_stream(self, video_url: str,
+                             quality: DownloadQuality = "fast",
+                             info: Optional[dict] = None) -> Optional[RemoteMediaSource]:
+        '''
+        解析音频直链，供边下载边转写使用（不落盘下载）
+
+        :param video_url: 资源链接
+        :param quality: 音频质量 fast | medium | slow
+        :param info: extract_info 的结果，传入时不再重复解析
+        :return: 返回 RemoteMediaSource；不支持流式下载的平台返回 None
+        '''
+        return None
+
+    def resolve_video_stream(self, video_url: str,
+                             quality: DownloadQuality = "fast",
+                             info: Optional[dict] = None) -> Optional[RemoteMediaSource]:
+        '''
+        解析截图用视频流的直链，供远程按需截图使用（不下载完整视频）
+
+        :param video_url: 资源链接
+        :param quality: 截图清晰度 fast | medium | slow
+        :param info: extract_info 的结果，传入时不再重复解析
+        :return: 返回 RemoteMediaSource；不支持的平台返回 None
+        '''
+        return None
@@ -2,12 +2,17 @@ import os
 from abc import ABC
 from typing import Union, Optional
 
-import yt_dlp
-
-from app.downloaders.base import Downloader, DownloadQuality, QUALITY_MAP
+from app.downloaders.base import Downloader, DownloadQuality, screenshot_format_selector
+from app.downloaders.common import (
+    extract_media_info,
+    extract_stream_info,
+    run_ydl,
+    download_video_with_audio,
+    download_screenshot_video,
+)
 from app.models.notes_model import AudioDownloadResult
+from app.models.audio_model import RemoteMediaSource
 from app.utils.path_helper import get_data_dir
-from ffmpeg_helper import check_ffmpeg_exists # 导入 check_ffmpeg_exists
 
 class BilibiliDownloader(Downloader, ABC):
     def __init__(self):
@@ -18,7 +23,8 @@ class BilibiliDownloader(Downloader, ABC):
         video_url: str,
         output_dir: Union[str, None] = None,
         quality: DownloadQuality = "fast",
-        need_video:Optional[bool]=False
+        need_video:Optional[bool]=False,
+        info: Optional[dict] = None
     ) -> AudioDownloadResult:
         if output_dir is None:
             output_dir = get_data_dir()
@@ -26,6 +32,9 @@ class BilibiliDownloader(Downloader, ABC):
             output_dir=self.cache_data
         os.makedirs(output_dir, exist_ok=True)
 
+        if need_video:
+            return self._download_with_video(video_url, output_dir, quality, info)
+
         output_path = os.path.join(output_dir, "%(id)s.%(ext)s")
 
         ydl_opts = {
@@ -35,13 +44,12 @@ class BilibiliDownloader(Downloader, ABC):
             'quiet': False,
         }
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=True)
-            video_id = info.get("id")
-            title = info.get("title")
-            duration = info.get("duration", 0)
-            cover_url = info.get("thumbnail")
-            audio_path = os.path.join(output_dir, f"{video_id}.m4a")
+        info = run_ydl(video_url, ydl_opts, download=True, info=info)
+        video_id = info.get("id")
+        title = info.get("title")
+        duration = info.get("duration", 0)
+        cover_url = info.get("thumbnail")
+        audio_path = os.path.join(output_dir, f"{video_id}.m4a")
 
         return AudioDownloadResult(
             file_path=audio_path,
@@ -51,53 +59,95 @@ class BilibiliDownloader(Downloader, ABC):
             platform="bilibili",
             video_id=video_id,
             raw_info=info,
-            video_path=None  # ❗音频下载不包含视频路径
+            video_path=None,  # ❗音频下载不包含视频路径
+            format_id=info.get("format_id")
+        )
+
+    def _download_with_video(self, video_url: str, output_dir: str,
+                             quality: DownloadQuality = "fast", info: Optional[dict] = None) -> AudioDownloadResult:
+        """
+        截图模式：一次解析，分别下载低分辨率纯视频流和音频流，不合并、不转码
+        """
+        info, video_path, audio_path, audio_format_id = download_video_with_audio(
+            video_url,
+            output_dir,
+            video_selector=screenshot_format_selector(quality),
+            audio_selector='bestaudio[ext=m4a]/bestaudio/worst',
+            info=info
+        )
+        return AudioDownloadResult(
+            file_path=audio_path,
+            title=info.get("title"),
+            duration=info.get("duration", 0),
+            cover_url=info.get("thumbnail"),
+            platform="bilibili",
+            video_id=info.get("id"),
+            raw_info=info,
+            video_path=video_path,
+            format_id=audio_format_id
+        )
+
+    def extract_info(self, video_url: str) -> Optional[dict]:
+        return extract_media_info(video_url)
+
+    def resolve_audio_stream(
+        self,
+        video_url: str,
+        quality: DownloadQuality = "fast",
+        info: Optional[dict] = None
+    ) -> Optional[RemoteMediaSource]:
+        """
+        解析音频直链，不下载文件
+        """
+        info, fmt = extract_stream_info(video_url, 'bestaudio[ext=m4a]/bestaudio/best', info)
+        return RemoteMediaSource(
+            url=fmt['url'],
+            title=info.get("title"),
+            duration=info.get("duration", 0),
+            cover_url=info.get("thumbnail"),
+            platform="bilibili",
+            video_id=info.get("id"),
+            raw_info=info,
+            http_headers=fmt.get('http_headers') or info.get('http_headers') or {},
+            format_id=fmt.get('format_id')
+        )
+
+    def resolve_video_stream(
+        self,
+        video_url: str,
+        quality: DownloadQuality = "fast",
+        info: Optional[dict] = None
+    ) -> Optional[RemoteMediaSource]:
+        """
+        解析截图用低分辨率视频流的直链，不下载文件
+        """
+        info, fmt = extract_stream_info(video_url, screenshot_format_selector(quality), info)
+        return RemoteMediaSource(
+            url=fmt['url'],
+            title=info.get("title"),
+            duration=info.get("duration", 0),
+            cover_url=info.get("thumbnail"),
+            platform="bilibili",
+            video_id=info.get("id"),
+            raw_info=info,
+            http_headers=fmt.get('http_headers') or info.get('http_headers') or {}
         )
 
     def download_video(
         self,
         video_url: str,
         output_dir: Union[str, None] = None,
+        quality: DownloadQuality = "fast",
+        info: Optional[dict] = None
     ) -> str:
         """
-        下载视频，返回视频文件路径
+        下载截图用的低分辨率纯视频流，返回视频文件路径
         """
         if output_dir is None:
             output_dir = get_data_dir()
 
         os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, "%(id)s.%(ext)s")
-
-        # 获取 ffmpeg 路径
-        ffmpeg_path = check_ffmpeg_exists()
-
-        ydl_opts = {
-            'format': 'bv*+ba/bestvideo+bestaudio/best',
-            'outtmpl': output_path,
-            'noplaylist': True,
-            'quiet': False,
-            'merge_output_format': 'mp4',  # 确保合并成 mp4
-        }
-        # 如果找到了 ffmpeg 路径，添加到 yt-dlp 选项中
-        if ffmpeg_path:
-            ydl_opts['ffmpeg_location'] = ffmpeg_path
-            # 确保即使指定了 ffmpeg_location，后处理器仍然知道要转换格式
-            # yt-dlp 通常会自动处理，但明确指定可以更保险
-            ydl_opts['postprocessors'] = [{
-                'key': 'FFmpegVideoConvertor',
-                'preferedformat': 'mp4', # 指定转换格式为 mp4
-            }]
-            # downloader_options 通常不需要显式设置 ffmpeg 路径，ffmpeg_location 会处理
-
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(video_url, download=True)
-            video_id = info.get("id")
-            video_path = os.path.join(output_dir, f"{video_id}.mp4")
-
-        if not os.path.exists(video_path):
-            raise FileNotFoundError(f"视频文件未找到: {video_path}")
-
+        _, video_path = download_screenshot_video(video_url, output_dir, screenshot_format_selector(quality), info)
         return video_path
 
     def delete_video(self, video_path: str) -> str:
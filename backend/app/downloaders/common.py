@@ -1 +1,110 @@
-# def download():
+import os
+from typing import List, Optional, Tuple
+
+import yt_dlp
+
+from app.utils.video_helper import extract_audio_track
+
+
+def extract_media_info(video_url: str) -> dict:
+    """
+    只解析一次、不下载：返回包含全部可选格式的 info
+    音频直链、截图视频直链和后续下载都基于这份结果重新选择格式，不再重复请求平台
+    """
+    ydl_opts = {
+        'noplaylist': True,
+        'quiet': True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        return ydl.extract_info(video_url, download=False)
+
+
+def run_ydl(video_url: str, ydl_opts: dict, download: bool, info: Optional[dict] = None) -> dict:
+    """
+    传入 extract_media_info 的结果时，按 ydl_opts 的格式在已解析的 info 上重新选择格式（并下载），
+    不再请求平台接口；否则完整解析一次
+    """
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        if info is not None:
+            # 与 --load-info-json 相同：去掉上一次选择格式留下的字段后重新处理
+            return ydl.process_ie_result(ydl.sanitize_info(info, remove_private_keys=True), download=download)
+        return ydl.extract_info(video_url, download=download)
+
+
+def extract_stream_info(video_url: str, format_selector: str, info: Optional[dict] = None) -> Tuple[dict, dict]:
+    """
+    只解析不下载，返回 (完整 info, 选中格式的 info)
+    选中格式的 info 中包含直链 url 和访问所需的 http_headers
+    """
+    ydl_opts = {
+        'format': format_selector,
+        'noplaylist': True,
+        'quiet': True,
+    }
+    info = run_ydl(video_url, ydl_opts, download=False, info=info)
+
+    # 单一格式时直链在顶层，合并格式时在 requested_formats 中
+    requested = info.get('requested_formats') or [info]
+    fmt = requested[0]
+    if not fmt.get('url'):
+        raise ValueError(f"未能解析到媒体直链: {video_url}")
+    return info, fmt
+
+
+def _downloaded_files(info: dict) -> List[Tuple[dict, str]]:
+    """
+    返回每个实际下载的格式及其文件路径
+    """
+    downloads = info.get('requested_downloads') or [info]
+    return [(fmt, fmt.get('filepath') or fmt.get('_filename')) for fmt in downloads]
+
+
+def download_screenshot_video(video_url: str, output_dir: str, format_selector: str,
+                              info: Optional[dict] = None) -> Tuple[dict, str]:
+    """
+    只下载截图用的纯视频流：不合并音频，不转码
+    返回 (info, 视频路径)
+    """
+    ydl_opts = {
+        'format': format_selector,
+        'outtmpl': os.path.join(output_dir, "%(id)s.f%(format_id)s.%(ext)s"),
+        'noplaylist': True,
+        'quiet': False,
+    }
+    info = run_ydl(video_url, ydl_opts, download=True, info=info)
+
+    _, video_path = _downloaded_files(info)[0]
+    if not video_path or not os.path.exists(video_path):
+        raise FileNotFoundError(f"视频文件未找到: {video_path}")
+    return info, video_path
+
+
+def download_video_with_audio(video_url: str, output_dir: str, video_selector: str,
+                              audio_selector: str = 'bestaudio[ext=m4a]/bestaudio/worst',
+                              info: Optional[dict] = None) -> Tuple[dict, str, str, Optional[str]]:
+    """
+    一次解析，分别下载截图用的视频流和转写用的音频流（不合并、不转码）
+    平台只提供音视频合一格式时，从视频中直接拷贝出音轨
+    返回 (info, 视频路径, 音频路径, 音频格式号)，音轨从视频中拷贝出来时格式号为 None
+    """
+    ydl_opts = {
+        'format': f"{video_selector},{audio_selector}",
+        'outtmpl': os.path.join(output_dir, "%(id)s.f%(format_id)s.%(ext)s"),
+        'noplaylist': True,
+        'quiet': False,
+    }
+    info = run_ydl(video_url, ydl_opts, download=True, info=info)
+
+    video_path = audio_path = audio_format_id = None
+    for fmt, path in _downloaded_files(info):
+        if fmt.get('vcodec') == 'none':
+            if not audio_path:
+                audio_path, audio_format_id = path, fmt.get('format_id')
+        else:
+            video_path = video_path or path
+
+    if not video_path or not os.path.exists(video_path):
+        raise FileNotFoundError(f"视频文件未找到: {video_path}")
+    if not audio_path:
+        audio_path = extract_audio_track(video_path, os.path.join(output_dir, f"{info.get('id')}.m4a"))
+    return info, video_path, audio_path, audio_format_id
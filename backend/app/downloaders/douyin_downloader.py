@@ -11,7 +11,7 @@ from abc import ABC
 from typing import Union, Optional, List, Dict, Tuple
 from os import getenv
 
-from app.downloaders.base import Downloader, DownloadQuality
+from app.downloaders.base import Downloader, DownloadQuality, get_screenshot_height
 from app.models.notes_model import AudioDownloadResult
 from app.utils.path_helper import get_data_dir
 from app.utils.logger import get_logger
@@ -249,8 +249,30 @@ class DouyinDownloader(Downloader, ABC):
             logger.error(f"下载失败: {str(e)}")
             return False
 
-    def download_internal(self, video_url: str, output_dir: str, is_audio: bool = True) -> Tuple[str, dict]:
-        """内部下载方法"""
+    @staticmethod
+    def _select_video_url(video_info: dict, target_height: Optional[int]) -> str:
+        """
+        从多档码率中选出满足目标高度的最小视频，没有多档码率时使用默认播放地址
+        """
+        if target_height:
+            candidates = []
+            for item in video_info.get('bit_rate') or []:
+                play_addr = item.get('play_addr') or {}
+                urls = play_addr.get('url_list') or []
+                if urls:
+                    candidates.append((play_addr.get('height') or 0, item.get('bit_rate') or 0, urls[0]))
+            if candidates:
+                enough = [c for c in candidates if c[0] >= target_height]
+                # 满足目标高度的取最小，都不满足时取最高的一档
+                chosen = min(enough) if enough else max(candidates)
+                return chosen[2]
+
+        media_urls = (video_info.get('play_addr') or {}).get('url_list', [])
+        return media_urls[0] if media_urls else ''
+
+    def download_internal(self, video_url: str, output_dir: str, is_audio: bool = True,
+                          target_height: Optional[int] = None) -> Tuple[str, dict]:
+        """内部下载方法，target_height 用于截图时选择低分辨率视频"""
         # 获取视频信息
         data, success = self.api.get_video_info(video_url)
         if not success:
@@ -284,10 +306,7 @@ class DouyinDownloader(Downloader, ABC):
             output_path = os.path.join(output_dir, f"{video_id}.{file_ext}")
         else:
             # 获取视频URL
-            video_info = aweme_detail.get('video', {})
-            play_addr = video_info.get('play_addr', {})
-            media_urls = play_addr.get('url_list', [])
-            media_url = media_urls[0] if media_urls else ''
+            media_url = self._select_video_url(aweme_detail.get('video', {}), target_height)
 
             # 设置输出文件路径
             file_ext = 'mp4'
@@ -324,7 +343,8 @@ class DouyinDownloader(Downloader, ABC):
         video_url: str,
         output_dir: Union[str, None] = None,
         quality: DownloadQuality = "fast",
-        need_video: Optional[bool] = False
+        need_video: Optional[bool] = False,
+        info: Optional[dict] = None
     ) -> AudioDownloadResult:
         """下载音频"""
         if output_dir is None:
@@ -339,7 +359,8 @@ class DouyinDownloader(Downloader, ABC):
             # 如果需要视频，也下载视频
             video_path = None
             if need_video:
-                video_path, _ = self.download_internal(video_url, output_dir, is_audio=False)
+                video_path, _ = self.download_internal(video_url, output_dir, is_audio=False,
+                                                       target_height=get_screenshot_height(quality))
 
             return AudioDownloadResult(
                 file_path=audio_path,
@@ -359,8 +380,10 @@ class DouyinDownloader(Downloader, ABC):
         self,
         video_url: str,
         output_dir: Union[str, None] = None,
+        quality: DownloadQuality = "fast",
+        info: Optional[dict] = None
     ) -> str:
-        """下载视频，返回视频文件路径"""
+        """下载截图用的低分辨率视频，返回视频文件路径"""
         if output_dir is None:
             output_dir = get_data_dir()
 
@@ -368,7 +391,8 @@ class DouyinDownloader(Downloader, ABC):
 
         try:
             # 下载视频
-            video_path, _ = self.download_internal(video_url, output_dir, is_audio=False)
+            video_path, _ = self.download_internal(video_url, output_dir, is_audio=False,
+                                                   target_height=get_screenshot_height(quality))
 
             if not os.path.exists(video_path):
                 raise FileNotFoundError(f"视频文件未找到: {video_path}")
@@ -0,0 +1,8 @@
+from app.utils.lazy_import import LazyRegistry
+
+# 各平台下载器，按需导入
+DOWNLOADERS = LazyRegistry('平台', {
+    'bilibili': 'app.downloaders.bilibili_downloader:BilibiliDownloader',
+    'youtube': 'app.downloaders.youtube_downloader:YoutubeDownloader',
+    'douyin': 'app.downloaders.douyin_downloader:DouyinDownloader',
+})
@@ -5,3 +5,27 @@ class DownloadQuality(str, enum.Enum):
     fast = "fast"
     medium = "medium"
     slow = "slow"
+
+
+class WhisperModelSize(str, enum.Enum):
+    """
+    faster-whisper 支持的模型大小，请求中的 model_size 只接受这些值
+    """
+    tiny = "tiny"
+    tiny_en = "tiny.en"
+    base = "base"
+    base_en = "base.en"
+    small = "small"
+    small_en = "small.en"
+    distil_small_en = "distil-small.en"
+    medium = "medium"
+    medium_en = "medium.en"
+    distil_medium_en = "distil-medium.en"
+    large_v1 = "large-v1"
+    large_v2 = "large-v2"
+    large_v3 = "large-v3"
+    large = "large"
+    distil_large_v2 = "distil-large-v2"
+    distil_large_v3 = "distil-large-v3"
+    large_v3_turbo = "large-v3-turbo"
+    turbo = "turbo"
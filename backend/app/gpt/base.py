@@ -1,13 +1,136 @@
 from abc import ABC,abstractmethod
+from typing import Iterator, List, Optional, Tuple
 
+from app.gpt.summary_cache import get_summary_cache, fingerprint
 from app.models.gpt_model import GPTSource
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def record_cache_hit(stats: Optional[dict], hit: bool):
+    if stats is not None:
+        stats['cache_hits'] = stats.get('cache_hits', 0) + int(hit)
 
 
 class GPT(ABC):
-    def summarize(self, source:GPTSource )->str:
+    # 子类需设置 provider、model、client
+    provider: str = ''
+    model: str = ''
+
+    def summarize(self, source:GPTSource, stats: Optional[dict] = None)->str:
         '''
 
         :param source: 
+        :param stats: 调用方持有的统计字典，命中缓存的次数累加到 stats['cache_hits']
         :return:
         '''
-        pass
\ No newline at end of file
+        pass
+
+    def build_messages(self, source: GPTSource) -> List[dict]:
+        '''
+        按各提供商的提示词渲染总结用的消息列表，summarize 与 summarize_stream 共用
+
+        :param source:
+        :return: 消息列表
+        '''
+        raise NotImplementedError(f"{self.__class__.__name__} 未实现 build_messages")
+
+    def completion_kwargs(self) -> dict:
+        '''
+        透传给 chat.completions.create 的额外参数（如 OpenRouter 的 extra_headers）
+        '''
+        return {}
+
+    def summarize_stream(self, source: GPTSource, stats: Optional[dict] = None) -> Iterator[str]:
+        '''
+        流式总结：逐个返回模型输出的文本片段，拼接后即完整的 Markdown
+
+        :param source:
+        :param stats: 同 summarize
+        :return: 文本片段迭代器
+        '''
+        return self.chat_completion_stream(self.build_messages(source), temperature=0.7, stats=stats,
+                                           **self.completion_kwargs())
+
+    def chat_completion(self, messages: List[dict], temperature: float = 0.7,
+                        stats: Optional[dict] = None, **kwargs) -> str:
+        '''
+        带缓存的对话补全，命中缓存时累加 stats['cache_hits']
+
+        :param messages: 渲染后的消息列表
+        :param temperature: 采样温度
+        :param stats: 调用方持有的统计字典，可为 None
+        :param kwargs: 透传给 chat.completions.create 的其他参数（如 extra_headers）
+        :return: 模型返回的文本
+        '''
+        content, hit = self.cached_chat_completion(messages, temperature, **kwargs)
+        record_cache_hit(stats, hit)
+        return content
+
+    def cached_chat_completion(self, messages: List[dict], temperature: float = 0.7, **kwargs) -> Tuple[str, bool]:
+        '''
+        按 provider、model、temperature 和消息指纹查询缓存，未命中才调用接口
+        是否命中随结果一起返回，同一个实例上的并发调用（如分段总结）互不影响
+
+        :return: (模型返回的文本, 是否命中缓存)
+        '''
+        cache = get_summary_cache()
+        key = fingerprint(self.provider, self.model, temperature, messages) if cache else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"命中总结缓存: {self.provider}/{self.model}")
+                return cached, True
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            **kwargs
+        )
+        if not response or not response.choices or not response.choices[0].message.content:
+            raise ValueError(f"{self.provider} 返回结构无效: {response}")
+
+        content = response.choices[0].message.content.strip()
+        if cache:
+            cache.set(key, content)
+        return content, False
+
+    def chat_completion_stream(self, messages: List[dict], temperature: float = 0.7,
+                               stats: Optional[dict] = None, **kwargs) -> Iterator[str]:
+        '''
+        流式对话补全：与 chat_completion 共用缓存，命中时一次性返回缓存内容并累加 stats['cache_hits']，
+        未命中时以 stream=True 调用接口，逐个返回增量文本，结束后写入缓存
+        '''
+        cache = get_summary_cache()
+        key = fingerprint(self.provider, self.model, temperature, messages) if cache else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                logger.info(f"命中总结缓存: {self.provider}/{self.model}")
+                record_cache_hit(stats, True)
+                yield cached
+                return
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            stream=True,
+            **kwargs
+        )
+        parts = []
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        content = "".join(parts).strip()
+        if not content:
+            raise ValueError(f"{self.provider} 流式返回内容为空")
+        if cache:
+            cache.set(key, content)
@@ -1,14 +1,15 @@
-from typing import List
+from typing import List, Optional
 from app.gpt.base import GPT
 from openai import OpenAI
 from app.gpt.prompt import BASE_PROMPT, AI_SUM, SCREENSHOT
-from app.gpt.utils import fix_markdown
+from app.gpt.utils import build_segment_text, fix_markdown
 from app.models.gpt_model import GPTSource
 from app.models.transcriber_model import TranscriptSegment
-from datetime import timedelta
 
 
 class DeepSeekGPT(GPT):
+    provider = 'deepseek'
+
     def __init__(self):
         from os import getenv
         self.api_key = getenv("DEEP_SEEK_API_KEY")
@@ -18,15 +19,6 @@ class DeepSeekGPT(GPT):
         self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
         self.screenshot = False
 
-    def _format_time(self, seconds: float) -> str:
-        return str(timedelta(seconds=int(seconds)))[2:]  # e.g., 03:15
-
-    def _build_segment_text(self, segments: List[TranscriptSegment]) -> str:
-        return "\n".join(
-            f"{self._format_time(seg.start)} - {seg.text.strip()}"
-            for seg in segments
-        )
-
     def ensure_segments_type(self, segments) -> List[TranscriptSegment]:
         return [
             TranscriptSegment(**seg) if isinstance(seg, dict) else seg
@@ -36,7 +28,7 @@ class DeepSeekGPT(GPT):
     def create_messages(self, segments: List[TranscriptSegment], title: str,tags:str):
         content = BASE_PROMPT.format(
             video_title=title,
-            segment_text=self._build_segment_text(segments),
+            segment_text=build_segment_text(segments),
             tags=tags
         )
         if self.screenshot:
@@ -45,15 +37,12 @@ class DeepSeekGPT(GPT):
         print(content)
         return [{"role": "user", "content": content + AI_SUM}]
 
-    def summarize(self, source: GPTSource) -> str:
+    def build_messages(self, source: GPTSource) -> List[dict]:
         self.screenshot = source.screenshot
         source.segment = self.ensure_segments_type(source.segment)
-        messages = self.create_messages(source.segment, source.title,source.tags)
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7
-        )
-        return response.choices[0].message.content.strip()
+        return self.create_messages(source.segment, source.title,source.tags)
+
+    def summarize(self, source: GPTSource, stats: Optional[dict] = None) -> str:
+        return self.chat_completion(self.build_messages(source), temperature=0.7, stats=stats)
 
 
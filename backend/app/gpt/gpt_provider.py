@@ -0,0 +1,9 @@
+from app.utils.lazy_import import LazyRegistry
+
+# 各模型提供商，按需导入
+GPT_PROVIDERS = LazyRegistry('AI提供商', {
+    'openai': 'app.gpt.openai_gpt:OpenaiGPT',
+    'deepseek': 'app.gpt.deepseek_gpt:DeepSeekGPT',
+    'qwen': 'app.gpt.qwen_gpt:QwenGPT',
+    'openrouter': 'app.gpt.openrouter_gpt:OpenRouterGPT',
+})
@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
+
+from app.gpt.base import GPT, record_cache_hit
+from app.gpt.prompt import MAP_PROMPT, REDUCE_PROMPT, AI_SUM, SCREENSHOT, LINK
+from app.gpt.utils import build_segment_text, estimate_tokens, format_time
+from app.models.gpt_model import GPTSource
+from app.models.transcriber_model import TranscriptSegment
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 转录稿超过该 token 数时改用分段总结，每段也不超过该值
+GPT_CHUNK_TOKEN_BUDGET = int(os.getenv('GPT_CHUNK_TOKEN_BUDGET', 12000))
+# 分段总结的并发请求数
+GPT_MAP_CONCURRENCY = int(os.getenv('GPT_MAP_CONCURRENCY', 4))
+
+
+def split_segments(segments: List[TranscriptSegment], budget: int) -> List[List[TranscriptSegment]]:
+    """
+    按 token 预算把转录片段顺序切分，单个片段不会被拆开
+    """
+    chunks: List[List[TranscriptSegment]] = []
+    current: List[TranscriptSegment] = []
+    used = 0
+    for seg in segments:
+        cost = estimate_tokens(seg.text) + 4  # 时间戳和换行
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], 0
+        current.append(seg)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class MapReduceSummarizer:
+    """
+    长转录稿的分层总结：
+    map 阶段按 token 预算切分并发总结为带时间戳的要点，
+    reduce 阶段合并要点生成最终 Markdown（包含截图、原片跳转标记）
+    """
+
+    def __init__(self, gpt: GPT, token_budget: int = GPT_CHUNK_TOKEN_BUDGET,
+                 concurrency: int = GPT_MAP_CONCURRENCY):
+        self.gpt = gpt
+        self.token_budget = token_budget
+        self.concurrency = concurrency
+
+    @staticmethod
+    def _segments(source: GPTSource) -> List[TranscriptSegment]:
+        return [
+            TranscriptSegment(**seg) if isinstance(seg, dict) else seg
+            for seg in source.segment
+        ]
+
+    def should_split(self, source: GPTSource) -> bool:
+        total = sum(estimate_tokens(seg.text) + 4 for seg in self._segments(source))
+        return total > self.token_budget
+
+    def _map(self, title: str, index: int, total: int, chunk: List[TranscriptSegment]) -> Tuple[str, bool]:
+        content = MAP_PROMPT.format(
+            index=index + 1,
+            total=total,
+            start=format_time(chunk[0].start),
+            end=format_time(chunk[-1].end),
+            video_title=title,
+            segment_text=build_segment_text(chunk),
+        )
+        partial, hit = self.gpt.cached_chat_completion([{"role": "user", "content": content}], temperature=0.7,
+                                                       **self.gpt.completion_kwargs())
+        logger.info(f"分段总结完成 {index + 1}/{total}")
+        return partial, hit
+
+    def _reduce_messages(self, source: GPTSource, chunks: List[List[TranscriptSegment]],
+                         partials: List[str]) -> List[dict]:
+        partial_notes = "\n\n".join(
+            f"### 第 {i + 1} 段（{format_time(chunk[0].start)} - {format_time(chunk[-1].end)}）\n{partial}"
+            for i, (chunk, partial) in enumerate(zip(chunks, partials))
+        )
+        content = REDUCE_PROMPT.format(
+            video_title=source.title,
+            tags=source.tags,
+            partial_notes=partial_notes,
+        )
+        if source.link:
+            content += LINK
+        if source.screenshot:
+            content += SCREENSHOT
+        content += AI_SUM
+        return [{"role": "user", "content": content}]
+
+    def _map_all(self, source: GPTSource,
+                 stats: Optional[dict] = None) -> Tuple[List[List[TranscriptSegment]], List[str]]:
+        segments = self._segments(source)
+        chunks = split_segments(segments, self.token_budget)
+        logger.info(f"转录稿过长，分为 {len(chunks)} 段总结，并发数 {self.concurrency}")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(
+                lambda item: self._map(source.title, item[0], len(chunks), item[1]),
+                enumerate(chunks)
+            ))
+        # 各分段的命中情况随结果返回，在当前线程汇总
+        for _, hit in results:
+            record_cache_hit(stats, hit)
+        return chunks, [partial for partial, _ in results]
+
+    def summarize(self, source: GPTSource, stats: Optional[dict] = None) -> str:
+        chunks, partials = self._map_all(source, stats)
+        return self.gpt.chat_completion(self._reduce_messages(source, chunks, partials), temperature=0.7,
+                                        stats=stats, **self.gpt.completion_kwargs())
+
+    def summarize_stream(self, source: GPTSource, stats: Optional[dict] = None) -> Iterator[str]:
+        """
+        map 阶段照常并发完成，reduce 阶段流式输出最终 Markdown
+        """
+        chunks, partials = self._map_all(source, stats)
+        yield from self.gpt.chat_completion_stream(self._reduce_messages(source, chunks, partials), temperature=0.7,
+                                                   stats=stats, **self.gpt.completion_kwargs())
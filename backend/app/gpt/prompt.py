@@ -54,4 +54,62 @@ SCREENSHOT='''
    - 格式：`*Screenshot-[mm:ss]`
    - `[mm:ss]` 代表该标题对应内容的**开始时间**（参考转录片段的时间）。
    - **无论你是否认为该部分有视觉内容，都请务必插入此占位符。**
-'''
\ No newline at end of file
+'''
+
+MAP_PROMPT = '''
+你是一位专业的笔记助手。下面是一个长视频转录稿中的一部分（第 {index}/{total} 段，时间范围 {start} - {end}）。
+
+📌 视频标题:
+{video_title}
+
+📝 你的任务:
+将这一部分整理为**详细的中文要点笔记**，供之后与其他部分合并成完整笔记：
+1. 按内容先后顺序列出要点，保留重要事实、示例、结论和建议。
+2. 每个要点前标注其开始时间，格式为 `[mm:ss]`，时间必须取自转录片段。
+3. 省略广告、填充词、随意问候和离题评论。
+4. 不要添加目录、总结或开场白，只返回要点列表。
+
+🎬 转录片段（格式：开始时间 - 文本）:
+
+---
+{segment_text}
+---
+'''
+
+REDUCE_PROMPT = '''
+你是一位专业的笔记助手，擅长将视频内容总结成清晰、结构化、信息丰富的笔记。
+下面是一个长视频按时间顺序分段整理出的要点笔记（每个要点前的 `[mm:ss]` 为其在视频中的开始时间），请将它们合并为一份完整笔记。
+
+🎯 语言要求:
+- 笔记必须使用**中文**书写。
+- 专有名词、技术术语、品牌名称和人名在适当时应保持**英文**。
+
+📌 视频标题:
+{video_title}
+
+📎 视频标签:
+{tags}
+
+📝 你的任务:
+根据下方的分段要点，生成标准 **Markdown 格式** 的结构化笔记，并遵循以下原则：
+
+1. **信息完整**：合并各段要点，去除重复内容，确保全面覆盖。
+2. **结构清晰**：按主题而非分段组织内容。使用合适的标题级别（`##`, `###`）总结各部分要点。
+3. **措辞简洁**：使用准确、清晰、专业的中文表达。
+4. **保留关键细节**：保留重要事实、示例、结论和建议。
+5. **排版易读**：在需要时使用项目符号，并保持段落长度适中以提高可读性。
+6. **目录**：根据 `##` 级别的标题在顶部生成目录。
+7. **时间参考**：下文提到的"转录片段的时间"即要点前标注的 `[mm:ss]`。
+
+
+⚠️ 输出说明:
+- 仅返回最终的 **Markdown 内容**。
+- 请**不要**将输出包裹在 ```markdown``` 或 ``` 等代码块中。
+
+
+🧩 分段要点:
+
+---
+{partial_notes}
+---
+'''
@@ -0,0 +1,42 @@
+import hashlib
+import json
+import os
+from typing import List, Optional
+
+from app.db.cache_store import SqliteCache
+
+SUMMARY_CACHE_ENABLED = os.getenv('SUMMARY_CACHE_ENABLED', 'true').lower() == 'true'
+SUMMARY_CACHE_MAX_MB = int(os.getenv('SUMMARY_CACHE_MAX_MB', 64))
+SUMMARY_CACHE_TTL_HOURS = float(os.getenv('SUMMARY_CACHE_TTL_HOURS', 24 * 7))
+
+
+def fingerprint(provider: str, model: str, temperature: float, messages: List[dict]) -> str:
+    """
+    对渲染后的完整消息做指纹，提示词字节级一致才会命中
+    """
+    payload = json.dumps(
+        {"provider": provider, "model": model, "temperature": temperature, "messages": messages},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+_summary_cache: Optional[SqliteCache] = None
+
+
+def get_summary_cache() -> Optional[SqliteCache]:
+    """
+    获取 LLM 结果缓存单例，未启用时返回 None
+    """
+    global _summary_cache
+    if not SUMMARY_CACHE_ENABLED:
+        return None
+    if _summary_cache is None:
+        _summary_cache = SqliteCache(
+            db_name="llm_cache.db",
+            table="summary_cache",
+            max_bytes=SUMMARY_CACHE_MAX_MB * 1024 * 1024,
+            ttl_seconds=SUMMARY_CACHE_TTL_HOURS * 3600,
+        )
+    return _summary_cache
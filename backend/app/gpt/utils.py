@@ -1,4 +1,29 @@
 import codecs
+from typing import List
+
+from app.models.transcriber_model import TranscriptSegment
+
 
 def fix_markdown(markdown: str) -> str:
-    return codecs.decode(markdown, 'unicode_escape')
\ No newline at end of file
+    return codecs.decode(markdown, 'unicode_escape')
+
+
+def format_time(seconds: float) -> str:
+    # 超过一小时时分钟数继续累加（如 75:20），与 Screenshot/Content 标记的 mm:ss 格式保持一致
+    total = int(seconds)
+    return f"{total // 60:02d}:{total % 60:02d}"  # e.g., 03:15
+
+
+def build_segment_text(segments: List[TranscriptSegment]) -> str:
+    return "\n".join(
+        f"{format_time(seg.start)} - {seg.text.strip()}"
+        for seg in segments
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算 token 数：中日韩字符约 1 字 1 token，其余字符约 4 个字符 1 token
+    """
+    cjk = sum(1 for ch in text if '⺀' <= ch <= '鿿' or '가' <= ch <= '힯')
+    return cjk + (len(text) - cjk) // 4
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Optional, Dict
 
 
 @dataclass
@@ -12,4 +12,17 @@ class AudioDownloadResult:
     video_id: str                # 唯一视频ID
     raw_info: dict               # yt-dlp 的原始 info 字典
     video_path: Optional[str] = None  # ✅ 新增字段：可选视频文件路径
+    format_id: Optional[str] = None   # 音频流的平台格式号，用作与封装无关的转写缓存标识
 
+
+@dataclass
+class RemoteMediaSource:
+    url: str                     # 媒体直链（由 yt-dlp 等解析得到）
+    title: str                   # 视频标题
+    duration: float              # 视频时长（秒）
+    cover_url: Optional[str]     # 视频封面图
+    platform: str                # 平台，如 "bilibili"
+    video_id: str                # 唯一视频ID
+    raw_info: dict               # 原始 info 字典
+    http_headers: Dict[str, str] = field(default_factory=dict)  # 访问直链需要携带的请求头（Referer、UA 等）
+    format_id: Optional[str] = None  # 选中格式的平台格式号
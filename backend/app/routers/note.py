@@ -4,17 +4,23 @@ import os
 import uuid
 from typing import Optional
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, validator
 from dataclasses import asdict
 
+from app.db.note_result_dao import save_note_result, get_note_status, get_note_result
+from app.db.sqlite_client import resolve_legacy_path
 from app.db.video_task_dao import get_task_by_video
-from app.enmus.note_enums import DownloadQuality
+from app.enmus.note_enums import DownloadQuality, WhisperModelSize
 from app.services.note import NoteGenerator
+from app.services.progress import progress_tracker, FINAL_STAGES
+from app.services.task_queue import NoteTaskQueue, QueueFullError
 from app.utils.response import ResponseWrapper as R
+from app.utils.logger import get_logger
 from app.utils.url_parser import extract_video_id
 from app.validators.video_url_validator import is_supported_video_url
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Request, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 import httpx
 
@@ -23,6 +29,8 @@ from app.models.notes_model import ErrorResult # 导入 ErrorResult
 # from app.services.downloader import download_raw_audio
 # from app.services.whisperer import transcribe_audio
 
+logger = get_logger(__name__)
+
 router = APIRouter()
 
 
@@ -37,6 +45,9 @@ class VideoRequest(BaseModel):
     quality: DownloadQuality
     screenshot: Optional[bool] = False
     link: Optional[bool] = False
+    priority: Optional[int] = 0
+    # 不在支持列表中的模型大小直接返回 422，不会拼进模型路径或下载地址
+    model_size: Optional[WhisperModelSize] = None
 
     @validator("video_url")
     def validate_supported_url(cls, v):
@@ -47,31 +58,44 @@ class VideoRequest(BaseModel):
         return v
 
 
-NOTE_OUTPUT_DIR = "note_results"
+# 长轮询单次最长等待时间（秒）、SSE 心跳间隔（秒）
+TASK_STATUS_MAX_WAIT = float(os.getenv('TASK_STATUS_MAX_WAIT', 60))
+TASK_EVENTS_KEEPALIVE = float(os.getenv('TASK_EVENTS_KEEPALIVE', 15))
+# 转写流在这些阶段内持续推送片段
+TRANSCRIPT_STAGES = ('queued', 'running', 'downloading', 'transcribing')
+
+# 旧版按 <task_id>.json 保存结果的目录，启动时导入到 note_results 表
+NOTE_OUTPUT_DIR = resolve_legacy_path("note_results")
 
 
 def save_note_to_file(task_id: str, note):
-    os.makedirs(NOTE_OUTPUT_DIR, exist_ok=True)
-    with open(os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.json"), "w", encoding="utf-8") as f:
-        json.dump(asdict(note), f, ensure_ascii=False, indent=2)
+    save_note_result(task_id, asdict(note))
 
 
-def run_note_task(task_id: str, video_url: str, platform: str, quality: DownloadQuality, link: bool = False,screenshot: bool = False):
+def run_note_task(task_id: str, video_url: str, platform: str, quality: DownloadQuality, link: bool = False,screenshot: bool = False,
+                  model_size: Optional[str] = None):
     try:
-        note = NoteGenerator().generate(
+        note = NoteGenerator(model_size=model_size).generate(
             video_url=video_url,
             platform=platform,
-            quality=quality,
+            quality=DownloadQuality(quality),
             task_id=task_id,
             link=link,
             screenshot=screenshot
         )
-        print('Note 结果',note)
+        # 只记录摘要，markdown 和转写结果体积很大
+        logger.info(f"笔记生成完成: {task_id}，markdown {len(note.markdown)} 字符，耗时 {note.timings}")
         save_note_to_file(task_id, note)
+        progress_tracker.update(task_id, 'done', 100)
     except Exception as e:
         # 使用 ErrorResult 数据类保存错误信息
         error_result = ErrorResult(error=str(e))
         save_note_to_file(task_id, error_result)
+        progress_tracker.update(task_id, 'failed', error=str(e))
+
+
+# 笔记生成任务队列，在 main.py 的 startup 中启动
+task_queue = NoteTaskQueue(handler=run_note_task)
 
 
 @router.post('/delete_task')
@@ -85,7 +109,7 @@ def delete_task(data:RecordRequest):
 
 
 @router.post("/generate_note")
-def generate_note(data: VideoRequest, background_tasks: BackgroundTasks):
+def generate_note(data: VideoRequest):
     try:
 
         video_id = extract_video_id(data.video_url, data.platform)
@@ -100,23 +124,103 @@ def generate_note(data: VideoRequest, background_tasks: BackgroundTasks):
 
         task_id = str(uuid.uuid4())
 
-        background_tasks.add_task(run_note_task, task_id, data.video_url, data.platform, data.quality,data.link ,data.screenshot)
+        # 相同视频 + 相同选项的请求合并为同一个任务
+        model_size = data.model_size.value if data.model_size else None
+        dedup_key = f"{data.platform}:{video_id}:{data.quality.value}:{int(bool(data.link))}:{int(bool(data.screenshot))}:{model_size or ''}"
+        task_id = task_queue.submit(task_id, {
+            "video_url": data.video_url,
+            "platform": data.platform,
+            "quality": data.quality.value,
+            "link": data.link,
+            "screenshot": data.screenshot,
+            "model_size": model_size,
+        }, priority=data.priority or 0, dedup_key=dedup_key)
+        if progress_tracker.get(task_id) is None:
+            progress_tracker.update(task_id, 'queued')
         return R.success({"task_id": task_id})
+    except QueueFullError as e:
+        return R.error(msg=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/task_status/{task_id}")
-def get_task_status(task_id: str):
-    path = os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.json")
-    if not os.path.exists(path):
-        return R.success({"status": "PENDING"})
+def current_progress(task_id: str) -> Optional[dict]:
+    """
+    任务进度：优先取内存中的实时进度，没有时（如服务重启后）按持久化的结果和队列状态还原
+    """
+    progress = progress_tracker.get(task_id)
+    if progress is not None:
+        return progress
+    note_status = get_note_status(task_id)
+    if note_status is not None:
+        status, error = note_status
+        if status == 'FAILED':
+            return {"version": 0, "stage": "failed", "percent": None, "error": error}
+        return {"version": 0, "stage": "done", "percent": 100}
+    job_state = task_queue.state(task_id)
+    if job_state is None:
+        return None
+    stage, position = job_state
+    return {"version": 0, "stage": "queued" if stage == "queued" else "running", "percent": None,
+            "queue_position": position}
+
+
+async def load_progress(task_id: str) -> Optional[dict]:
+    """
+    供异步接口使用：内存中有实时进度时直接返回，需要查库时放到线程池执行，不阻塞事件循环
+    """
+    progress = progress_tracker.get(task_id)
+    if progress is not None:
+        return progress
+    return await run_in_threadpool(current_progress, task_id)
+
+
+def progress_etag(progress: Optional[dict]) -> str:
+    if progress is None:
+        return 'W/"none"'
+    return f'W/"{progress["stage"]}-{progress["version"]}"'
 
-    with open(path, "r", encoding="utf-8") as f:
-        content = json.load(f)
 
-    if "error" in content:
-        return R.error(content["error"], code=500)
+@router.get("/task_status/{task_id}")
+async def get_task_status(task_id: str, request: Request, response: Response, wait: float = 0):
+    """
+    查询任务状态；If-None-Match 与当前 ETag 相同时返回 304，不再查库
+    同时 wait > 0 时为长轮询：进度有变化立即返回，等待超时仍无变化返回 304
+    """
+    progress = await load_progress(task_id)
+    etag = progress_etag(progress)
+    if_none_match = request.headers.get("if-none-match")
+    if wait > 0 and if_none_match == etag and progress is not None and progress["stage"] not in FINAL_STAGES:
+        await progress_tracker.wait_for_change(task_id, progress["version"], min(wait, TASK_STATUS_MAX_WAIT),
+                                               known=True)
+        progress = await load_progress(task_id)
+        etag = progress_etag(progress)
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    # 查库在线程池中执行
+    return await run_in_threadpool(task_status_response, task_id, progress)
+
+
+def task_status_response(task_id: str, progress: Optional[dict]):
+    note_status = get_note_status(task_id)
+    if note_status is None:
+        job_state = task_queue.state(task_id)
+        if job_state is None:
+            return R.success({"status": "PENDING", "progress": progress})
+        stage, position = job_state
+        return R.success({
+            "status": "PENDING",
+            "stage": stage,
+            "queue_position": position,
+            "progress": progress
+        })
+
+    status, error = note_status
+    if status == 'FAILED':
+        return R.error(error, code=500)
+    # 轮询接口不返回转写结果，完整结果通过 /task_result 获取
+    content = get_note_result(task_id, with_transcript=False)
     content['id'] = task_id
     return R.success({
         "status": "SUCCESS",
@@ -124,6 +228,100 @@ def get_task_status(task_id: str):
     })
 
 
+@router.get("/task_events/{task_id}")
+async def task_events(task_id: str):
+    """
+    SSE 推送任务进度：每次阶段或百分比变化发送一条 progress 事件，完成或失败后结束；
+    总结阶段每生成完整的 Markdown 行发送一条 markdown 事件
+    """
+    if await load_progress(task_id) is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+
+    async def events():
+        sent_version = None
+        markdown_index = 0
+        while True:
+            progress = await load_progress(task_id)
+            # 总结阶段已生成的 Markdown 行，index 为本批第一行的行号
+            lines = progress_tracker.get_markdown(task_id, markdown_index)
+            if lines:
+                data = json.dumps({"index": markdown_index, "lines": lines}, ensure_ascii=False)
+                yield f"event: markdown\ndata: {data}\n\n"
+                markdown_index += len(lines)
+            if progress is not None and progress["version"] != sent_version:
+                sent_version = progress["version"]
+                yield f"event: progress\ndata: {json.dumps(progress, ensure_ascii=False)}\n\n"
+                if progress["stage"] in FINAL_STAGES:
+                    return
+            elif sent_version is not None and not lines:
+                yield ": keep-alive\n\n"
+            await progress_tracker.wait_for_change(task_id, sent_version or 0, TASK_EVENTS_KEEPALIVE, known=True)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/task_transcript/{task_id}")
+async def task_transcript(task_id: str, request: Request):
+    """
+    SSE 推送转写片段：转写过程中每产出一个片段发送一条 segment 事件（id 为片段序号），
+    转写阶段结束后发送 end 事件；断线重连时按 Last-Event-ID 从下一个片段继续
+    """
+    if await load_progress(task_id) is None:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    last_event_id = request.headers.get("last-event-id")
+    start = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+
+    def segment_event(index: int, segment: dict) -> str:
+        return f"id: {index}\nevent: segment\ndata: {json.dumps(segment, ensure_ascii=False)}\n\n"
+
+    async def events():
+        index = start
+        while True:
+            progress = await load_progress(task_id)
+            segments = progress_tracker.get_segments(task_id, index)
+            if segments is None:
+                # 任务已结束或不在本进程中：从持久化的结果里补发剩余片段
+                result = None
+                if progress and progress["stage"] in FINAL_STAGES:
+                    result = await run_in_threadpool(get_note_result, task_id)
+                transcript = (result or {}).get("transcript") or {}
+                for segment in transcript.get("segments", [])[index:]:
+                    yield segment_event(index, segment)
+                    index += 1
+                if progress is None or progress["stage"] in FINAL_STAGES:
+                    yield "event: end\ndata: {}\n\n"
+                    return
+            else:
+                for segment in segments:
+                    yield segment_event(index, segment)
+                    index += 1
+                # 片段在进入总结阶段前已全部发布
+                if progress["stage"] not in TRANSCRIPT_STAGES:
+                    yield "event: end\ndata: {}\n\n"
+                    return
+            changed = await progress_tracker.wait_for_change(task_id, progress["version"] if progress else 0,
+                                                             TASK_EVENTS_KEEPALIVE, known=True)
+            if changed is None or progress is None or changed["version"] == progress["version"]:
+                yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/task_result/{task_id}")
+def get_task_result(task_id: str):
+    note_status = get_note_status(task_id)
+    if note_status is None:
+        raise HTTPException(status_code=404, detail="任务结果不存在")
+    status, error = note_status
+    if status == 'FAILED':
+        return R.error(error, code=500)
+    content = get_note_result(task_id)
+    content['id'] = task_id
+    return R.success(content)
+
+
 @router.get("/image_proxy")
 async def image_proxy(request: Request, url: str):
     headers = {
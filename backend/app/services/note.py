@@ -1,31 +1,34 @@
 import os
 import time
-from typing import Union, List, Tuple, Dict
+from contextlib import contextmanager
+from dataclasses import asdict
+from typing import Union, List, Tuple, Dict, Optional, Iterator
 
 from pydantic import HttpUrl
 
 from app.db.video_task_dao import insert_video_task, delete_task_by_video
 from app.downloaders.base import Downloader
-from app.downloaders.bilibili_downloader import BilibiliDownloader
-from app.downloaders.douyin_downloader import DouyinDownloader
-from app.downloaders.youtube_downloader import YoutubeDownloader
+from app.downloaders.downloader_provider import DOWNLOADERS
 from app.gpt.base import GPT
-from app.gpt.deepseek_gpt import DeepSeekGPT
-from app.gpt.openai_gpt import OpenaiGPT
-from app.gpt.qwen_gpt import QwenGPT
-from app.gpt.openrouter_gpt import OpenRouterGPT # 添加 OpenRouterGPT 导入
+from app.gpt.gpt_provider import GPT_PROVIDERS
+from app.gpt.map_reduce import MapReduceSummarizer
 from app.models.gpt_model import GPTSource
 from app.models.notes_model import NoteResult
 from app.models.notes_model import AudioDownloadResult
+from app.models.audio_model import RemoteMediaSource
 from app.enmus.note_enums import DownloadQuality
 from app.models.transcriber_model import TranscriptResult
-from app.transcriber.base import Transcriber
+from app.transcriber.base import Transcriber, set_segment_listener, set_stage_release
 from app.transcriber.transcriber_provider import get_transcriber
-from app.transcriber.whisper import WhisperTranscriber
-import re
-
-from app.utils.note_helper import replace_content_markers
-from app.utils.video_helper import generate_screenshot
+from app.services.transcript_cache import get_transcript_cache, audio_identity
+from app.services.progress import progress_tracker
+from app.services.screenshot_prefetch import ScreenshotPrefetcher, parse_screenshot_markers
+from app.services.stage_pool import stage_pool
+from app.services.warmup import warmup
+
+from app.utils.note_helper import replace_content_markers, StreamingMarkerReplacer
+from app.utils.path_helper import get_data_dir
+from app.utils.video_helper import generate_screenshots, probe_range_support
 # 导入新的信号
 from events.signals import note_generation_finished
 
@@ -39,56 +42,47 @@ BACKEND_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
 
 output_dir = os.getenv('OUT_DIR')
 image_base_url = os.getenv('IMAGE_BASE_URL')
+# 是否启用边下载边转写，以及每个转写窗口的长度（秒）
+STREAM_TRANSCRIBE = os.getenv('STREAM_TRANSCRIBE', 'true').lower() == 'true'
+STREAM_WINDOW_SECONDS = float(os.getenv('STREAM_WINDOW_SECONDS', 60))
+# 截图时优先通过 Range 请求直接从视频直链截取，不下载完整视频
+SCREENSHOT_REMOTE = os.getenv('SCREENSHOT_REMOTE', 'true').lower() == 'true'
+# 是否流式调用 LLM，并把已生成的 Markdown 逐行推送给前端
+GPT_STREAM = os.getenv('GPT_STREAM', 'true').lower() == 'true'
 logger.info("starting up")
 
 
 
 class NoteGenerator:
-    def __init__(self):
-        self.model_size: str = 'base'
+    def __init__(self, model_size: Optional[str] = None):
+        # 每个请求可以指定 whisper 模型大小，未指定时使用 WHISPER_MODEL_SIZE
+        self.model_size: str = model_size or os.getenv('WHISPER_MODEL_SIZE', 'base')
         self.device: Union[str, None] = None
-        self.transcriber_type = 'fast-whisper'
+        self.transcriber_type = os.getenv('TRANSCRIBER_TYPE', 'fast-whisper')
         self.transcriber = self.get_transcriber()
         # TODO 需要更换为可调节
 
         self.provider = os.getenv('MODEl_PROVIDER','openai')
         self.video_path = None
+        self.task_id: Optional[str] = None
         logger.info("初始化NoteGenerator")
 
 
     def get_gpt(self) -> GPT:
         self.provider = self.provider.lower()
-        if self.provider == 'openai':
-            logger.info("使用OpenAI")
-            return OpenaiGPT()
-        elif self.provider == 'deepseek':
-            logger.info("使用DeepSeek")
-            return DeepSeekGPT()
-        elif self.provider == 'qwen':
-            logger.info("使用Qwen")
-            return QwenGPT()
-        elif self.provider == 'openrouter': # 添加 OpenRouter 选项
-            logger.info("使用 OpenRouter")
-            return OpenRouterGPT()
-        else:
+        if self.provider not in GPT_PROVIDERS:
             self.provider = 'openai'
             logger.warning("不支持的AI提供商，使用 OpenAI 做完GPT")
-            return OpenaiGPT()
+        logger.info(f"使用 {self.provider}")
+        return GPT_PROVIDERS.create(self.provider)
 
 
     def get_downloader(self, platform: str) -> Downloader:
-        if platform == "bilibili":
-            logger.info("下载 Bilibili 平台视频")
-            return BilibiliDownloader()
-        elif platform == "youtube":
-            logger.info("下载 YouTube 平台视频")
-            return YoutubeDownloader()
-        elif platform == 'douyin':
-            logger.info("下载 Douyin 平台视频")
-            return DouyinDownloader()
-        else:
+        if platform not in DOWNLOADERS:
             logger.warning("不支持的平台")
             raise ValueError(f"不支持的平台：{platform}")
+        logger.info(f"下载 {platform} 平台视频")
+        return DOWNLOADERS.create(platform)
 
     def get_transcriber(self) -> Transcriber:
         '''
@@ -97,69 +91,361 @@ class NoteGenerator:
         :return:
         '''
         if self.transcriber_type == 'fast-whisper':
-            logger.info("使用Whisper")
-            return get_transcriber()
+            logger.info(f"使用Whisper，模型: {self.model_size}")
+            return get_transcriber(model_size=self.model_size)
+        elif self.transcriber_type in ('bcut', 'kuaishou'):
+            logger.info(f"使用云端转写: {self.transcriber_type}")
+            return get_transcriber(self.transcriber_type)
+        elif self.transcriber_type == 'hedged':
+            logger.info(f"使用对冲转写，Whisper 模型: {self.model_size}")
+            return get_transcriber('hedged', model_size=self.model_size)
         else:
             logger.warning("不支持的转义器")
             raise ValueError(f"不支持的转义器：{self.transcriber_type}")
 
+    def report(self, stage: str, percent: Optional[float] = None, **fields):
+        '''
+        向任务进度通道汇报当前阶段
+        '''
+        if self.task_id:
+            progress_tracker.update(self.task_id, stage, percent, **fields)
+
+    @contextmanager
+    def transcribing(self, duration: Optional[float]):
+        '''
+        转写期间每得到一个片段就发布到任务的转写流，并按「片段结束时间 / 音频时长」汇报转写进度
+        '''
+        def on_segment(segment):
+            percent = segment.end / duration * 100 if duration else None
+            self.report('transcribing', percent, segments=[asdict(segment)])
+
+        self.report('transcribing', 0)
+        set_segment_listener(on_segment)
+        try:
+            yield
+        finally:
+            set_segment_listener(None)
+
+    def finish_transcribing(self, transcript: TranscriptResult):
+        '''
+        转写完成：补发没有逐段发布的片段（缓存命中、云端转写、批量模式等），并标记转写进度 100%
+        '''
+        segments = transcript.segments if transcript is not None else []
+        published = progress_tracker.segment_count(self.task_id) if self.task_id else 0
+        remaining = [asdict(seg) for seg in segments[published:]]
+        self.report('transcribing', 100, segments=remaining)
+
+    def stream_summary(self, tokens: Iterator[str], video_id: str, platform: str,
+                       timings: Dict[str, float], prefetcher: Optional[ScreenshotPrefetcher] = None) -> str:
+        '''
+        消费流式输出：完整的行替换 Content 标记后立即推送到任务进度通道，返回处理后的完整 Markdown
+        传入 prefetcher 时，每完成一行就提交其中截图标记的截图任务
+        '''
+        replacer = StreamingMarkerReplacer(video_id=video_id, platform=platform)
+        start = time.time()
+        for token in tokens:
+            if 'gpt_first_token' not in timings:
+                timings['gpt_first_token'] = round(time.time() - start, 2)
+            lines = replacer.feed(token)
+            if lines:
+                self.report('summarizing', markdown=lines)
+                if prefetcher is not None:
+                    prefetcher.feed(lines)
+        lines = replacer.finish()
+        if lines:
+            self.report('summarizing', markdown=lines)
+            if prefetcher is not None:
+                prefetcher.feed(lines)
+        return replacer.markdown.strip()
+
+    @staticmethod
+    def extract_media_info(downloader: Downloader, video_url: str) -> Optional[dict]:
+        '''
+        只解析一次视频信息，远程截图、边下载边转写和完整下载都基于这份结果选择格式
+        解析失败时返回 None，各步骤自行解析
+        '''
+        try:
+            return downloader.extract_info(video_url)
+        except Exception as e:
+            logger.warning(f"解析视频信息失败，各步骤将单独解析: {e}")
+            return None
+
+    @staticmethod
+    def resolve_audio_source(downloader: Downloader, video_url: str, quality: DownloadQuality,
+                             info: Optional[dict] = None) -> Optional[RemoteMediaSource]:
+        '''
+        解析音频直链和格式号，用于下载前查询转写缓存和边下载边转写；不支持的平台返回 None
+        '''
+        try:
+            return downloader.resolve_audio_stream(video_url, quality, info=info)
+        except Exception as e:
+            logger.warning(f"解析音频直链失败，回退到完整下载: {e}")
+            return None
+
+    def resolve_stream_source(self, source: Optional[RemoteMediaSource]) -> Optional[RemoteMediaSource]:
+        '''
+        判断能否边下载边转写，能则返回音频直链信息
+        '''
+        if source is None or not STREAM_TRANSCRIBE or not self.transcriber.supports_streaming:
+            return None
+        # 模型还没加载好时先完整下载音频，不让下载等待模型
+        # 预热失败后模型会在第一次转写时加载，之后按模型池的状态重新启用流式转写
+        if not warmup.is_done('whisper') and not self.transcriber.is_model_loaded():
+            logger.info("模型预热中，本次不使用边下载边转写")
+            return None
+
+        # 没有格式号时缓存按音频内容哈希查询，该视频已有转写缓存时走完整下载，校验哈希后复用结果
+        cache = get_transcript_cache()
+        if not source.format_id and cache and cache.has_video(source.platform, source.video_id, self.transcriber):
+            logger.info(f"视频 {source.video_id} 存在转写缓存，跳过流式转写")
+            return None
+        return source
+
+    @staticmethod
+    def resolve_remote_video(downloader: Downloader, video_url: str,
+                             quality: DownloadQuality,
+                             info: Optional[dict] = None) -> Optional[RemoteMediaSource]:
+        '''
+        判断能否远程截图，能则返回视频直链信息；服务端不支持 Range 时返回 None，回退到完整下载
+        '''
+        if not SCREENSHOT_REMOTE:
+            return None
+        try:
+            source = downloader.resolve_video_stream(video_url, quality, info=info)
+        except Exception as e:
+            logger.warning(f"解析视频直链失败，回退到完整下载: {e}")
+            return None
+        if source is None:
+            return None
+        if not probe_range_support(source.url, source.http_headers):
+            logger.info("视频直链不支持 Range 请求，回退到完整下载")
+            return None
+        return source
+
+    def lookup_cached_transcript(self, source: Optional[RemoteMediaSource],
+                                 timings: Dict[str, float]) -> Optional[TranscriptResult]:
+        '''
+        下载前按平台格式号查询转写缓存，命中时不必下载音频；没有格式号时只能下载后按内容哈希查询
+        '''
+        cache = get_transcript_cache()
+        if not cache or source is None or not source.format_id:
+            return None
+        key = cache.build_key(source.platform, source.video_id,
+                              audio_identity(None, source.format_id), self.transcriber)
+        cached = cache.get(key)
+        if cached is None:
+            return None
+        timings['transcript_cache_hits'] = 1
+        timings['transcript_cache_misses'] = 0
+        timings['transcription'] = 0
+        logger.info(f"下载前命中转写缓存: {source.video_id}，跳过音频下载")
+        self.finish_transcribing(cached)
+        return cached
+
+    @staticmethod
+    def audio_from_source(source: RemoteMediaSource, output_dir: Union[str, None]) -> AudioDownloadResult:
+        '''
+        由音频直链信息构造下载结果，file_path 为流式转写时音频的落盘位置（命中缓存时不会生成该文件）
+        '''
+        output_dir = output_dir or get_data_dir()
+        return AudioDownloadResult(
+            file_path=os.path.join(output_dir, f"{source.video_id}.m4a"),
+            title=source.title,
+            duration=source.duration,
+            cover_url=source.cover_url,
+            platform=source.platform,
+            video_id=source.video_id,
+            raw_info=source.raw_info,
+            video_path=None,
+            format_id=source.format_id
+        )
+
+    @staticmethod
+    def download_screenshot_video(downloader: Downloader, video_url: str, quality: DownloadQuality,
+                                  info: Optional[dict], timings: Dict[str, float]) -> str:
+        '''
+        单独下载截图用的视频
+        '''
+        with stage_pool.stage('download', timings):
+            start_video = time.time()
+            video_path = downloader.download_video(video_url, quality=quality, info=info)
+            timings['video_download'] = round(time.time() - start_video, 2)
+        logger.info(f"视频下载耗时: {timings['video_download']}秒")
+        return video_path
+
+    def transcribe_with_cache(self, audio: AudioDownloadResult, timings: Dict[str, float]) -> TranscriptResult:
+        '''
+        先按音频标识（格式号或内容哈希）查询转写缓存，未命中再调用转写器并写入缓存
+        '''
+        cache = get_transcript_cache()
+        key = None
+        if cache:
+            key = cache.build_key(audio.platform, audio.video_id,
+                                  audio_identity(audio.file_path, audio.format_id), self.transcriber)
+            cached = cache.get(key)
+            if cached is not None:
+                timings['transcript_cache_hits'] = 1
+                timings['transcript_cache_misses'] = 0
+                timings['transcription'] = 0
+                logger.info(f"命中转写缓存: {audio.video_id}")
+                self.finish_transcribing(cached)
+                return cached
+            timings['transcript_cache_hits'] = 0
+            timings['transcript_cache_misses'] = 1
+
+        # 任务可以先排队、下载，模型预热完成后才开始转写
+        # 对冲转写不等待预热，模型未就绪时由备用后端在延迟预算后接手
+        start_wait = time.time()
+        if self.transcriber_type == 'fast-whisper':
+            warmup.wait_for('whisper')
+        timings['model_wait'] = round(time.time() - start_wait, 2)
+
+        with stage_pool.stage('transcribe', timings) as slot:
+            start_transcript = time.time()
+            # 云端转写等待远端结果时通过 release_stage 提前交还槽位
+            set_stage_release(slot.release)
+            try:
+                with self.transcribing(audio.duration):
+                    transcript: TranscriptResult = self.transcriber.transcript(file_path=audio.file_path)
+            finally:
+                set_stage_release(None)
+            self.finish_transcribing(transcript)
+            timings['transcription'] = round(time.time() - start_transcript, 2)
+        logger.info(f"转写耗时: {timings['transcription']}秒")
+
+        if cache and transcript is not None:
+            cache.set(key, audio.platform, audio.video_id, self.transcriber, transcript)
+        return transcript
+
+    def cache_streamed_transcript(self, audio: AudioDownloadResult, transcript: TranscriptResult,
+                                  timings: Dict[str, float]):
+        '''
+        流式转写完成后写入缓存，有格式号时与完整下载共用同一个 key，否则按落盘的音频计算哈希
+        '''
+        cache = get_transcript_cache()
+        if not cache or transcript is None or not os.path.exists(audio.file_path):
+            return
+        timings['transcript_cache_hits'] = 0
+        timings['transcript_cache_misses'] = 1
+        key = cache.build_key(audio.platform, audio.video_id,
+                              audio_identity(audio.file_path, audio.format_id), self.transcriber)
+        cache.set(key, audio.platform, audio.video_id, self.transcriber, transcript)
+
+    def stream_download_and_transcribe(self, source: RemoteMediaSource, output_dir: Union[str, None],
+                                       timings: Dict[str, float]
+                                       ) -> Optional[Tuple[AudioDownloadResult, TranscriptResult]]:
+        '''
+        边下载边转写：ffmpeg 解码出的 PCM 按窗口送入转写器，下载与转写两个阶段重叠执行
+        第一个窗口之前就读取失败（如直链过期、403）时返回 None，由调用方改为完整下载
+        '''
+        # numpy 较重，只在流式转写时导入
+        from app.utils.audio_stream import AudioStream, StreamNotStartedError
+
+        audio = self.audio_from_source(source, output_dir)
+        audio_path = audio.file_path
+        stream = AudioStream(source, audio_path, window_seconds=STREAM_WINDOW_SECONDS)
+
+        # 统计等待下载数据的时间，剩余部分即为转写耗时
+        waited = 0.0
+
+        def timed_windows():
+            nonlocal waited
+            iterator = stream.windows()
+            while True:
+                start_wait = time.time()
+                try:
+                    window = next(iterator)
+                except StopIteration:
+                    waited += time.time() - start_wait
+                    return
+                waited += time.time() - start_wait
+                yield window
+
+        start_stream = time.time()
+        try:
+            with self.transcribing(source.duration):
+                transcript = self.transcriber.transcript_stream(timed_windows(), file_path=audio_path)
+        except StreamNotStartedError as e:
+            logger.warning(f"流式下载音频失败，回退到完整下载: {e}")
+            return None
+        finally:
+            # 转写出错或取消时终止 ffmpeg 和读取线程，避免 PCM 在内存中继续堆积
+            stream.close()
+        self.finish_transcribing(transcript)
+        wall = time.time() - start_stream
+
+        timings['audio_download'] = stream.download_seconds or round(wall, 2)
+        timings['transcription'] = round(wall - waited, 2)
+        timings['stream_wall'] = round(wall, 2)
+        # 重叠时间 = 两阶段串行所需时间 - 实际耗时
+        timings['stream_overlap'] = round(max(0.0, timings['audio_download'] + timings['transcription'] - wall), 2)
+        logger.info(f"边下载边转写耗时: {timings['stream_wall']}秒，重叠节省: {timings['stream_overlap']}秒")
+        return audio, transcript
+
     def save_meta(self, video_id, platform, task_id):
         logger.info(f"记录已经生成的数据信息")
         insert_video_task(video_id=video_id, platform=platform, task_id=task_id)
 
     def insert_screenshots_into_markdown(self, markdown: str, video_path: str, image_base_url: str,
-                                         output_dir: str) -> str:
+                                         output_dir: str, http_headers: Optional[Dict[str, str]] = None) -> str:
         """
         扫描 markdown 中的 *Screenshot-xx:xx，生成截图并插入 markdown 图片
         :param markdown:
+        :param video_path: 本地视频路径，或支持 Range 的视频直链
         :param image_base_url: 最终返回给前端的路径前缀（如 /static/screenshots）
+        :param http_headers: 访问视频直链所需的请求头
         """
         matches = self.extract_screenshot_timestamps(markdown)
+        if not matches:
+            return markdown
         new_markdown = markdown
         logger.info(f"开始为笔记生成截图")
         try:
-            for idx, (marker, ts) in enumerate(matches):
-                image_path = generate_screenshot(video_path, output_dir, ts, idx)
-                # 直接使用 /screenshots 路径，与 main.py 中的静态文件挂载点一致
-                # 获取文件名
-                image_filename = os.path.basename(image_path)
-                # 构建URL路径
-                image_url = f"{BACKEND_BASE_URL.rstrip('/')}/screenshots/{image_filename}"
-                logger.info(f"生成截图URL: {image_url}")
-                replacement = f"![]({image_url})"
-                new_markdown = new_markdown.replace(marker, replacement, 1)
+            # 所有时间点在一次 ffmpeg 调用中截取
+            image_paths = generate_screenshots(video_path, output_dir, [ts for _, ts in matches], http_headers)
+            for (marker, ts), image_path in zip(matches, image_paths):
+                new_markdown = new_markdown.replace(marker, self.screenshot_image(image_path), 1)
 
             return new_markdown
         except Exception as e:
-            # 记录更详细的错误信息，特别是来自 generate_screenshot 的 RuntimeError
+            # 记录更详细的错误信息，特别是来自 generate_screenshots 的 RuntimeError
             if isinstance(e, RuntimeError):
                 logger.error(f"截图生成失败: {e}") # RuntimeError 已经包含了详细信息
             else:
                 logger.error(f"处理截图时发生意外错误: {e}", exc_info=True) # 对于其他异常，记录堆栈信息
             raise e
 
+    @staticmethod
+    def screenshot_image(image_path: str) -> str:
+        '''
+        截图文件对应的 Markdown 图片，直接使用 /screenshots 路径，与 main.py 中的静态文件挂载点一致
+        '''
+        image_filename = os.path.basename(image_path)
+        image_url = f"{BACKEND_BASE_URL.rstrip('/')}/screenshots/{image_filename}"
+        logger.info(f"生成截图URL: {image_url}")
+        return f"![]({image_url})"
+
+    def apply_prefetched_screenshots(self, markdown: str, image_paths: Dict[int, str]) -> str:
+        '''
+        用已提前截好的图片替换对应的截图标记，没有截图的标记保留，交给 insert_screenshots_into_markdown 处理
+        '''
+        for marker, ts in self.extract_screenshot_timestamps(markdown):
+            if ts in image_paths:
+                markdown = markdown.replace(marker, self.screenshot_image(image_paths[ts]), 1)
+        return markdown
+
     @staticmethod
     def delete_note(video_id: str, platform: str):
         logger.info(f"删除生成的笔记记录")
         return delete_task_by_video(video_id, platform)
 
-    import re
-
     def extract_screenshot_timestamps(self, markdown: str) -> List[Tuple[str, int]]:
         """
         从 Markdown 中提取 Screenshot 时间标记（如 *Screenshot-03:39 或 Screenshot-[03:39]），
         并返回匹配文本和对应时间戳（秒）
         """
         logger.info(f"开始提取截图时间标记")
-        pattern = r"(?:\*Screenshot-(\d{2}):(\d{2})|Screenshot-\[(\d{2}):(\d{2})\])"
-        matches = list(re.finditer(pattern, markdown))
-        results = []
-        for match in matches:
-            mm = match.group(1) or match.group(3)
-            ss = match.group(2) or match.group(4)
-            total_seconds = int(mm) * 60 + int(ss)
-            results.append((match.group(0), total_seconds))
-        return results
+        return parse_screenshot_markers(markdown)
 
     def generate(
             self,
@@ -174,6 +460,7 @@ class NoteGenerator:
 
     ) -> NoteResult:
         logger.info(f"开始解析并生成笔记")
+        self.task_id = task_id
         # 记录各阶段耗时
         timings: Dict[str, float] = {}
         start_total = time.time()
@@ -185,35 +472,56 @@ class NoteGenerator:
         logger.info(f'使用{gpt.__class__.__name__}GPT')
         logger.info(f'视频地址：{video_url}')
 
-        # 下载视频（如果需要截图）
-        if screenshot:
-            start_video = time.time()
-            video_path = downloader.download_video(video_url)
-            self.video_path = video_path
-            timings['video_download'] = round(time.time() - start_video, 2)
-            logger.info(f"视频下载耗时: {timings['video_download']}秒")
-
-        # 2. 下载音频
-        start_audio = time.time()
-        audio: AudioDownloadResult = downloader.download(
-            video_url=video_url,
-            quality=quality,
-            output_dir=path,
-            need_video=screenshot
-        )
-        timings['audio_download'] = round(time.time() - start_audio, 2)
-        logger.info(f"音频下载耗时: {timings['audio_download']}秒")
-        logger.info(f"下载音频成功，文件路径：{audio.file_path}")
-
-        # 3. Whisper 转写
-        start_transcript = time.time()
-        transcript: TranscriptResult = self.transcriber.transcript(file_path=audio.file_path)
-        timings['transcription'] = round(time.time() - start_transcript, 2)
-        logger.info(f"转写耗时: {timings['transcription']}秒")
+        # 2. 下载音频 + 3. Whisper 转写
+        # 需要截图时优先远程截图，不支持时音视频一起下载；不需要下载视频时尝试边下载边转写
+        media_info = self.extract_media_info(downloader, video_url)
+        remote_video = self.resolve_remote_video(downloader, video_url, quality, media_info) if screenshot else None
+        need_video = screenshot and remote_video is None
+        audio_source = self.resolve_audio_source(downloader, video_url, quality, media_info)
+        # 有格式号时下载前就能查询转写缓存，命中则不下载音频
+        transcript = self.lookup_cached_transcript(audio_source, timings)
+        stream_source = None if need_video or transcript is not None else self.resolve_stream_source(audio_source)
+        self.report('downloading')
+        streamed = None
+        if stream_source is not None:
+            # 边下载边转写同时占用下载和转写两个阶段的槽位
+            with stage_pool.stage('download', timings), stage_pool.stage('transcribe', timings):
+                streamed = self.stream_download_and_transcribe(stream_source, path, timings)
+        if transcript is not None:
+            audio = self.audio_from_source(audio_source, path)
+            if need_video:
+                self.video_path = self.download_screenshot_video(downloader, video_url, quality, media_info, timings)
+        elif streamed is not None:
+            audio, transcript = streamed
+            self.cache_streamed_transcript(audio, transcript, timings)
+        else:
+            # 流式下载失败可能是直链已失效，此时重新解析，不复用同一份 info
+            download_info = media_info if stream_source is None else None
+            with stage_pool.stage('download', timings):
+                start_audio = time.time()
+                audio: AudioDownloadResult = downloader.download(
+                    video_url=video_url,
+                    quality=quality,
+                    output_dir=path,
+                    need_video=need_video,
+                    info=download_info
+                )
+                timings['audio_download'] = round(time.time() - start_audio, 2)
+            logger.info(f"音频下载耗时: {timings['audio_download']}秒")
+            logger.info(f"下载音频成功，文件路径：{audio.file_path}")
+
+            if need_video:
+                if audio.video_path:
+                    self.video_path = audio.video_path
+                else:
+                    # 下载器不支持合并下载时，单独下载视频
+                    self.video_path = self.download_screenshot_video(downloader, video_url, quality,
+                                                                     download_info, timings)
+
+            transcript = self.transcribe_with_cache(audio, timings)
         logger.info(f"Whisper 转写成功，转写结果：{transcript.full_text}")
 
         # 4. GPT 总结
-        start_gpt = time.time()
         source = GPTSource(
             title=audio.title,
             segment=transcript.segments,
@@ -221,18 +529,66 @@ class NoteGenerator:
             screenshot=screenshot,
             link=link
         )
-        markdown: str = gpt.summarize(source)
-        timings['gpt_summary'] = round(time.time() - start_gpt, 2)
+        # 流式总结时，截图所需的视频来源已经确定，边生成边截图
+        prefetcher = None
+        if screenshot and GPT_STREAM:
+            if remote_video is not None:
+                prefetcher = ScreenshotPrefetcher(remote_video.url, output_dir, remote_video.http_headers)
+            elif self.video_path:
+                prefetcher = ScreenshotPrefetcher(self.video_path, output_dir)
+        self.report('summarizing')
+        with stage_pool.stage('summarize', timings):
+            start_gpt = time.time()
+            summarizer = MapReduceSummarizer(gpt)
+            # 长转录稿：分段并发总结后再合并
+            split = summarizer.should_split(source)
+            summary_stats = {'cache_hits': 0}
+            if GPT_STREAM:
+                tokens = summarizer.summarize_stream(source, summary_stats) if split \
+                    else gpt.summarize_stream(source, summary_stats)
+                try:
+                    markdown: str = self.stream_summary(tokens, audio.video_id, platform, timings, prefetcher)
+                except Exception:
+                    if prefetcher is not None:
+                        prefetcher.cancel()
+                    raise
+            elif split:
+                markdown: str = summarizer.summarize(source, summary_stats)
+            else:
+                markdown: str = gpt.summarize(source, summary_stats)
+            timings['gpt_summary'] = round(time.time() - start_gpt, 2)
+        # 命中总结缓存的调用次数（分段总结时包含各分段和合并）
+        timings['summary_cache_hits'] = summary_stats['cache_hits']
         logger.info(f"GPT 总结耗时: {timings['gpt_summary']}秒")
         logger.info(f"GPT 总结完成")
 
         # 处理内容标记和截图
         start_post = time.time()
-        markdown = replace_content_markers(markdown=markdown, video_id=audio.video_id, platform=platform)
+        # 流式输出时已逐行替换过 Content 标记
+        if not GPT_STREAM:
+            markdown = replace_content_markers(markdown=markdown, video_id=audio.video_id, platform=platform)
 
         # 处理截图（如果启用）
+        if screenshot:
+            self.report('screenshots')
+        if prefetcher is not None:
+            start_collect = time.time()
+            markdown = self.apply_prefetched_screenshots(markdown, prefetcher.collect())
+            timings['screenshot_collect'] = round(time.time() - start_collect, 2)
+        # 以下只处理还没有截图的标记：非流式模式、提前截图失败的时间点
+        if remote_video is not None:
+            try:
+                with stage_pool.stage('screenshot', timings):
+                    markdown = self.insert_screenshots_into_markdown(markdown, remote_video.url, image_base_url,
+                                                                     output_dir, remote_video.http_headers)
+            except RuntimeError as e:
+                logger.warning(f"远程截图失败，回退到完整下载视频: {e}")
+                # 总结耗时较长，之前解析出的直链可能已过期，这里重新解析
+                with stage_pool.stage('download', timings):
+                    self.video_path = downloader.download_video(video_url, quality=quality)
         if self.video_path:
-            markdown = self.insert_screenshots_into_markdown(markdown, self.video_path, image_base_url, output_dir)
+            with stage_pool.stage('screenshot', timings):
+                markdown = self.insert_screenshots_into_markdown(markdown, self.video_path, image_base_url, output_dir)
 
         timings['post_processing'] = round(time.time() - start_post, 2)
         logger.info(f"后处理耗时: {timings['post_processing']}秒")
@@ -247,6 +603,8 @@ class NoteGenerator:
         # 在返回结果之前触发笔记生成完成信号
         note_generation_finished.send({
             "file_path": audio.file_path,
+            "video_id": audio.video_id,
+            "video_path": self.video_path,
         })
 
         # 5. 返回结构体
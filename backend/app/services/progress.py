@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 内存中最多保留的任务进度条数，超出时丢弃最早的任务
+PROGRESS_MAX_TASKS = int(os.getenv('PROGRESS_MAX_TASKS', 1000))
+
+# 任务阶段：queued / downloading / transcribing / summarizing / screenshots / done / failed
+FINAL_STAGES = ('done', 'failed')
+
+
+class _TaskProgress:
+    def __init__(self):
+        self.version = 0
+        self.state: dict = {}
+        # 转写阶段已产出的片段、总结阶段已完成的 Markdown 行，任务结束后清空（结果已持久化）
+        self.segments: List[dict] = []
+        self.markdown: List[str] = []
+        # 等待下一次变化的协程：(事件循环, Future)
+        self.waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ProgressTracker:
+    """
+    任务进度：工作线程调用 update 写入，接口协程通过 wait_for_change 等待下一次变化
+    - 每次更新 version 加一，长轮询以 version 作为 ETag，SSE 以 version 判断是否有新事件
+    - 等待方挂在事件循环上，不占用线程，空闲连接几乎没有开销
+    """
+
+    def __init__(self, max_tasks: int = PROGRESS_MAX_TASKS):
+        self.max_tasks = max_tasks
+        self._lock = threading.Lock()
+        self._tasks: "OrderedDict[str, _TaskProgress]" = OrderedDict()
+
+    def _entry(self, task_id: str) -> _TaskProgress:
+        progress = self._tasks.get(task_id)
+        if progress is None:
+            progress = self._tasks[task_id] = _TaskProgress()
+            while len(self._tasks) > self.max_tasks:
+                self._tasks.popitem(last=False)
+        return progress
+
+    def update(self, task_id: str, stage: str, percent: Optional[float] = None,
+               segments: Optional[List[dict]] = None, markdown: Optional[List[str]] = None, **fields):
+        """
+        更新任务进度，percent 为当前阶段的完成百分比（0-100），未知时为 None
+        segments / markdown 为本次新产出的转写片段 / Markdown 行，随同一个版本号一起发布
+        """
+        with self._lock:
+            progress = self._entry(task_id)
+            progress.version += 1
+            if segments:
+                progress.segments.extend(segments)
+            if markdown:
+                progress.markdown.extend(markdown)
+            if stage in FINAL_STAGES:
+                progress.segments = []
+                progress.markdown = []
+            progress.state = {
+                "stage": stage,
+                "percent": None if percent is None else round(min(max(percent, 0), 100), 1),
+                "updated_at": time.time(),
+                **fields,
+            }
+            waiters, progress.waiters = progress.waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_wake, future)
+
+    def get(self, task_id: str) -> Optional[dict]:
+        """
+        返回带 version 的进度快照，没有记录时返回 None
+        """
+        with self._lock:
+            progress = self._tasks.get(task_id)
+            if progress is None or not progress.state:
+                return None
+            return {"version": progress.version, **progress.state}
+
+    def get_segments(self, task_id: str, start: int = 0) -> Optional[List[dict]]:
+        """
+        返回从第 start 个开始的转写片段，没有记录或任务已结束时返回 None
+        """
+        with self._lock:
+            progress = self._tasks.get(task_id)
+            if progress is None or not progress.state or progress.state["stage"] in FINAL_STAGES:
+                return None
+            return progress.segments[start:]
+
+    def get_markdown(self, task_id: str, start: int = 0) -> List[str]:
+        """
+        返回从第 start 行开始已生成的 Markdown 行
+        """
+        with self._lock:
+            progress = self._tasks.get(task_id)
+            return progress.markdown[start:] if progress else []
+
+    def segment_count(self, task_id: str) -> int:
+        with self._lock:
+            progress = self._tasks.get(task_id)
+            return len(progress.segments) if progress else 0
+
+    async def wait_for_change(self, task_id: str, version: int, timeout: float,
+                              known: bool = False) -> Optional[dict]:
+        """
+        等待任务进度的 version 不同于给定值，超时后返回当前快照
+        本进程还没有该任务的记录时，只有调用方确认任务存在（known=True，如重启后从数据库还原的任务）
+        才登记占位记录并等待第一次更新；否则直接返回，任意 task_id 不会挤掉内存中真实任务的进度
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            progress = self._tasks.get(task_id)
+            if progress is None and known and version == 0:
+                progress = self._entry(task_id)
+            if progress is None or progress.version != version:
+                future = None
+            else:
+                progress.waiters.append((loop, future))
+        if future is not None:
+            try:
+                await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    if (loop, future) in progress.waiters:
+                        progress.waiters.remove((loop, future))
+        return self.get(task_id)
+
+progress_tracker = ProgressTracker()
@@ -0,0 +1,89 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.logger import get_logger
+from app.utils.video_helper import generate_screenshots
+
+logger = get_logger(__name__)
+
+# 流式总结期间提前截图的全局线程数，所有任务共享，限制同时运行的 ffmpeg 进程数
+SCREENSHOT_PREFETCH_WORKERS = int(os.getenv('SCREENSHOT_PREFETCH_WORKERS', 2))
+
+# 分钟数不限两位：超过 100 分钟的长视频会出现 105:30 这样的标记
+SCREENSHOT_PATTERN = re.compile(r"(?:\*Screenshot-(\d{2,}):(\d{2})|Screenshot-\[(\d{2,}):(\d{2})\])")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def parse_screenshot_markers(text: str) -> List[Tuple[str, int]]:
+    """
+    提取 Screenshot 时间标记（如 *Screenshot-03:39 或 Screenshot-[03:39]），返回 (匹配文本, 秒数)
+    """
+    results = []
+    for match in SCREENSHOT_PATTERN.finditer(text):
+        mm = match.group(1) or match.group(3)
+        ss = match.group(2) or match.group(4)
+        results.append((match.group(0), int(mm) * 60 + int(ss)))
+    return results
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=SCREENSHOT_PREFETCH_WORKERS,
+                                           thread_name_prefix="screenshot")
+        return _executor
+
+
+class ScreenshotPrefetcher:
+    """
+    边总结边截图：流式输出每完成一行就扫描其中的截图标记，立即把对应时间点交给线程池截取
+    模型输出结束时大部分截图已经生成，后处理只需做字符串替换
+    标记不会跨行，因此按行扫描不会漏掉标记
+    """
+
+    def __init__(self, video_path: str, output_dir: str, http_headers: Optional[Dict[str, str]] = None):
+        self.video_path = video_path
+        self.output_dir = output_dir
+        self.http_headers = http_headers
+        self._futures: Dict[int, Future] = {}
+
+    def _capture(self, ts: int) -> str:
+        return generate_screenshots(self.video_path, self.output_dir, [ts], self.http_headers)[0]
+
+    def feed(self, lines: List[str]):
+        """
+        扫描新完成的行，为尚未提交的时间点提交截图任务
+        """
+        for line in lines:
+            for _, ts in parse_screenshot_markers(line):
+                if ts not in self._futures:
+                    self._futures[ts] = _get_executor().submit(self._capture, ts)
+
+    def collect(self) -> Dict[int, str]:
+        """
+        等待已提交的截图完成，返回 {秒数: 图片路径}；失败的时间点不在结果中，由调用方按原流程补截
+        """
+        paths = {}
+        start = time.time()
+        for ts, future in self._futures.items():
+            try:
+                paths[ts] = future.result()
+            except Exception as e:
+                logger.warning(f"提前截图失败（{ts}s），稍后重试: {e}")
+        if self._futures:
+            logger.info(f"提前截图 {len(paths)}/{len(self._futures)} 张，等待 {time.time() - start:.2f} 秒")
+        return paths
+
+    def cancel(self):
+        """
+        总结失败时取消还未开始的截图任务
+        """
+        for future in self._futures.values():
+            future.cancel()
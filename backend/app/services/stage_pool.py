@@ -0,0 +1,90 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 各阶段的并发上限：下载受网络限制，转写受 CPU/GPU 限制，总结受接口限流限制
+STAGE_LIMITS: Dict[str, int] = {
+    'download': int(os.getenv('STAGE_DOWNLOAD_CONCURRENCY', 3)),
+    'transcribe': int(os.getenv('STAGE_TRANSCRIBE_CONCURRENCY', 1)),
+    'summarize': int(os.getenv('STAGE_SUMMARIZE_CONCURRENCY', 4)),
+    'screenshot': int(os.getenv('STAGE_SCREENSHOT_CONCURRENCY', 2)),
+}
+
+
+class StageSlot:
+    """
+    stage() 占用的一个槽位，可以在离开阶段之前提前释放（如云端转写上传完成、只剩等待远端结果时）
+    """
+
+    def __init__(self, pool: "StagePool", name: str):
+        self._pool = pool
+        self.name = name
+        self._released = False
+
+    def release(self):
+        with self._pool._lock:
+            if self._released:
+                return
+            self._released = True
+            self._pool._active[self.name] -= 1
+        self._pool._semaphores[self.name].release()
+
+
+class StagePool:
+    """
+    分阶段的资源池：每个阶段有独立的并发槽位
+    任务完成一个阶段后释放该阶段槽位，再排队进入下一阶段，
+    这样下载慢的任务不会占着转写槽位，LLM 调用慢也不会拖住 whisper
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = dict(limits)
+        self._semaphores = {name: threading.BoundedSemaphore(limit) for name, limit in limits.items()}
+        self._lock = threading.Lock()
+        self._waiting = {name: 0 for name in limits}
+        self._active = {name: 0 for name in limits}
+
+    @contextmanager
+    def stage(self, name: str, timings: Optional[Dict[str, float]] = None):
+        """
+        占用某个阶段的一个槽位，timings 不为空时记录排队等待时间
+        返回 StageSlot，可在离开阶段前调用 release() 提前交还槽位
+        """
+        semaphore = self._semaphores[name]
+        with self._lock:
+            self._waiting[name] += 1
+        start_wait = time.time()
+        semaphore.acquire()
+        waited = time.time() - start_wait
+        with self._lock:
+            self._waiting[name] -= 1
+            self._active[name] += 1
+        if timings is not None:
+            timings[f'{name}_wait'] = round(timings.get(f'{name}_wait', 0) + waited, 2)
+        if waited > 1:
+            logger.info(f"阶段 {name} 排队等待 {waited:.2f} 秒")
+        slot = StageSlot(self, name)
+        try:
+            yield slot
+        finally:
+            slot.release()
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                name: {
+                    'limit': self.limits[name],
+                    'active': self._active[name],
+                    'waiting': self._waiting[name],
+                }
+                for name in self.limits
+            }
+
+
+stage_pool = StagePool(STAGE_LIMITS)
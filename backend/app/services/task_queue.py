@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+from typing import Callable, List, Optional
+
+from app.db.note_job_dao import (
+    init_note_job_table,
+    insert_note_job,
+    get_inflight_task,
+    count_queued_jobs,
+    claim_next_job,
+    finish_note_job,
+    requeue_orphan_jobs,
+    get_job_state,
+)
+from app.services.stage_pool import STAGE_LIMITS
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 默认工作线程数为各阶段并发数之和，保证每个阶段都能被占满
+NOTE_WORKERS = int(os.getenv('NOTE_WORKERS') or 0) or sum(STAGE_LIMITS.values())
+NOTE_QUEUE_MAX_SIZE = int(os.getenv('NOTE_QUEUE_MAX_SIZE', 100))
+# 空闲时轮询数据库的间隔，用于发现其他进程写入的任务
+NOTE_QUEUE_POLL_SECONDS = float(os.getenv('NOTE_QUEUE_POLL_SECONDS', 2))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class NoteTaskQueue:
+    """
+    持久化在 SQLite 中的笔记任务队列：
+    - 固定数量的工作线程，限制同时运行的下载/转写任务数
+    - 按优先级（高优先）+ 入队顺序（FIFO）领取
+    - 进程重启后，未完成的任务会重新执行
+    """
+
+    def __init__(self, handler: Callable[..., None], workers: int = NOTE_WORKERS,
+                 max_size: int = NOTE_QUEUE_MAX_SIZE):
+        self.handler = handler
+        self.workers = workers
+        self.max_size = max_size
+        self._wakeup = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        if self._threads:
+            return
+        init_note_job_table()
+        requeue_orphan_jobs()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"note-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"任务队列已启动，工作线程数: {self.workers}")
+
+    def submit(self, task_id: str, payload: dict, priority: int = 0, dedup_key: Optional[str] = None) -> str:
+        """
+        提交任务，返回负责该请求的 task_id
+        相同 dedup_key 的任务正在排队或执行时，直接复用该任务（single-flight）
+        """
+        if dedup_key:
+            existing = get_inflight_task(dedup_key)
+            if existing:
+                logger.info(f"相同任务正在进行中，复用任务: {existing}")
+                return existing
+        if count_queued_jobs() >= self.max_size:
+            raise QueueFullError("任务队列已满，请稍后再试")
+        task_id = insert_note_job(task_id, json.dumps(payload, ensure_ascii=False), priority, dedup_key)
+        self._wakeup.set()
+        return task_id
+
+    @staticmethod
+    def state(task_id: str):
+        return get_job_state(task_id)
+
+    def _worker(self):
+        while True:
+            try:
+                job = claim_next_job()
+            except Exception as e:
+                logger.error(f"领取任务失败: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.wait(NOTE_QUEUE_POLL_SECONDS)
+                self._wakeup.clear()
+                continue
+
+            task_id, payload = job
+            logger.info(f"开始执行任务: {task_id}")
+            status = 'done'
+            try:
+                self.handler(task_id, **json.loads(payload))
+            except Exception as e:
+                status = 'failed'
+                logger.error(f"任务执行失败 {task_id}: {e}", exc_info=True)
+            finally:
+                finish_note_job(task_id, status)
+                logger.info(f"任务结束: {task_id} ({status})")
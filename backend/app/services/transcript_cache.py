@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from typing import Optional, Tuple
+
+from app.db.cache_store import SqliteCache
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.transcriber.base import Transcriber
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRANSCRIPT_CACHE_ENABLED = os.getenv('TRANSCRIPT_CACHE_ENABLED', 'true').lower() == 'true'
+TRANSCRIPT_CACHE_MAX_MB = int(os.getenv('TRANSCRIPT_CACHE_MAX_MB', 512))
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    计算音频文件内容的 sha256
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def audio_identity(file_path: Optional[str], format_id: Optional[str] = None) -> str:
+    """
+    音频来源标识：有平台格式号时使用格式号，与下载方式和封装无关，
+    流式转写（ffmpeg 重新封装）与完整下载（yt-dlp 原始文件）可以共享同一条缓存，
+    且解析出格式号后、下载前即可查询；此时不再校验音频内容，平台替换同一格式号下的文件不会使缓存失效
+    没有格式号时（如抖音、从视频拷贝出的音轨）使用文件内容哈希
+    """
+    if format_id:
+        return f"format:{format_id}"
+    return hash_file(file_path)
+
+
+def transcriber_identity(transcriber: Transcriber) -> Tuple[str, str, str]:
+    """
+    (转写器类型, 模型大小, 计算精度)，云端转写器没有后两项
+    """
+    return (
+        transcriber.__class__.__name__,
+        str(getattr(transcriber, 'model_size', '') or ''),
+        str(getattr(transcriber, 'compute_type', '') or ''),
+    )
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+
+class TranscriptCache:
+    """
+    转写结果缓存
+    key = (平台, 视频ID, 音频标识, 转写器类型, 模型大小, 计算精度)，音频标识见 audio_identity
+    tag = (平台, 视频ID, 转写器类型, 模型大小, 计算精度)，没有格式号时用于下载前判断该视频是否可能命中
+    """
+
+    def __init__(self):
+        self.store = SqliteCache(
+            db_name="transcript_cache.db",
+            table="transcript_cache",
+            max_bytes=TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024,
+        )
+
+    @staticmethod
+    def video_tag(platform: str, video_id: str, transcriber: Transcriber) -> str:
+        return _digest(platform, video_id, *transcriber_identity(transcriber))
+
+    @staticmethod
+    def build_key(platform: str, video_id: str, audio_id: str, transcriber: Transcriber) -> str:
+        return _digest(platform, video_id, audio_id, *transcriber_identity(transcriber))
+
+    def has_video(self, platform: str, video_id: str, transcriber: Transcriber) -> bool:
+        return self.store.has_tag(self.video_tag(platform, video_id, transcriber))
+
+    def get(self, key: str) -> Optional[TranscriptResult]:
+        value = self.store.get(key)
+        if value is None:
+            return None
+        data = json.loads(value)
+        return TranscriptResult(
+            language=data.get('language'),
+            full_text=data.get('full_text', ''),
+            segments=[TranscriptSegment(**seg) for seg in data.get('segments', [])],
+            raw=data.get('raw'),
+        )
+
+    def set(self, key: str, platform: str, video_id: str, transcriber: Transcriber, result: TranscriptResult):
+        data = {
+            'language': result.language,
+            'full_text': result.full_text,
+            'segments': [asdict(seg) for seg in result.segments],
+            # whisper 的 raw 是 TranscriptionInfo 对象，无法序列化时不缓存
+            'raw': result.raw if isinstance(result.raw, dict) else None,
+        }
+        try:
+            value = json.dumps(data, ensure_ascii=False)
+        except (TypeError, ValueError):
+            data['raw'] = None
+            value = json.dumps(data, ensure_ascii=False)
+        self.store.set(key, value, tag=self.video_tag(platform, video_id, transcriber))
+
+
+_transcript_cache: Optional[TranscriptCache] = None
+
+
+def get_transcript_cache() -> Optional[TranscriptCache]:
+    """
+    获取转写缓存单例，未启用时返回 None
+    """
+    global _transcript_cache
+    if not TRANSCRIPT_CACHE_ENABLED:
+        return None
+    if _transcript_cache is None:
+        _transcript_cache = TranscriptCache()
+    return _transcript_cache
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 与 NoteGenerator 使用的转写器保持一致，只有 whisper 需要预热模型
+TRANSCRIBER_TYPE = os.getenv('TRANSCRIBER_TYPE', 'fast-whisper')
+
+
+class WarmupStep:
+    def __init__(self, name: str, func: Callable[[], None]):
+        self.name = name
+        self.func = func
+        self.status = 'pending'  # pending / running / done / failed
+        self.detail: Optional[str] = None
+        self.error: Optional[str] = None
+        self.seconds: Optional[float] = None
+        # 步骤结束（无论成功失败）时置位，等待方不会被永久阻塞
+        self.finished = threading.Event()
+
+
+class Warmup:
+    """
+    后台预热：服务先启动接收请求，重量级模块和模型在后台线程中依次加载
+    - /ready 在全部步骤成功前返回 503，/health 只表示进程存活
+    - 任务可以先排队和下载，需要某个资源时再调用 wait_for 等待对应步骤完成
+    """
+
+    def __init__(self):
+        self._steps: Dict[str, WarmupStep] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._current: Optional[WarmupStep] = None
+
+    def add_step(self, name: str, func: Callable[[], None]):
+        self._steps[name] = WarmupStep(name, func)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def report(self, detail: str):
+        """
+        预热步骤内汇报当前进度
+        """
+        with self._lock:
+            if self._current is not None:
+                self._current.detail = detail
+        logger.info(f"预热进度: {detail}")
+
+    def _run(self):
+        start = time.time()
+        for step in self._steps.values():
+            with self._lock:
+                self._current = step
+                step.status = 'running'
+            step_start = time.time()
+            try:
+                step.func()
+                status, error = 'done', None
+                logger.info(f"预热完成 {step.name}，耗时 {time.time() - step_start:.2f} 秒")
+            except Exception as e:
+                # 失败的步骤不影响后续步骤，使用方在第一次需要时会重新尝试
+                status, error = 'failed', str(e)
+                logger.error(f"预热步骤失败 {step.name}: {e}", exc_info=True)
+            with self._lock:
+                step.status = status
+                step.error = error
+                step.seconds = round(time.time() - step_start, 2)
+                self._current = None
+            step.finished.set()
+        logger.info(f"服务预热结束，总耗时 {time.time() - start:.2f} 秒")
+
+    @property
+    def ready(self) -> bool:
+        return all(step.status == 'done' for step in self._steps.values())
+
+    def wait_for(self, name: str, timeout: Optional[float] = None) -> bool:
+        """
+        等待某个预热步骤结束，返回该步骤是否成功；预热未启动或没有该步骤时直接返回
+        """
+        step = self._steps.get(name)
+        if step is None or self._thread is None:
+            return True
+        if not step.finished.is_set():
+            logger.info(f"等待预热步骤 {name} 完成")
+        step.finished.wait(timeout)
+        return step.status == 'done'
+
+    def is_done(self, name: str) -> bool:
+        step = self._steps.get(name)
+        return step is None or step.status == 'done'
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            steps: List[dict] = [
+                {
+                    "name": step.name,
+                    "status": step.status,
+                    "detail": step.detail,
+                    "error": step.error,
+                    "seconds": step.seconds,
+                }
+                for step in self._steps.values()
+            ]
+        done = sum(1 for step in steps if step["status"] == 'done')
+        return {
+            "ready": self.ready,
+            "progress": round(done / len(steps), 2) if steps else 1.0,
+            "steps": steps,
+        }
+
+
+def _preload_modules():
+    from app.downloaders.downloader_provider import DOWNLOADERS
+    from app.gpt.gpt_provider import GPT_PROVIDERS
+    from app.transcriber.transcriber_provider import TRANSCRIBERS
+
+    for registry in (DOWNLOADERS, GPT_PROVIDERS, TRANSCRIBERS):
+        registry.preload()
+
+
+def _load_whisper_model():
+    from app.transcriber.transcriber_provider import get_transcriber
+
+    model_size = os.getenv('WHISPER_MODEL_SIZE', 'base')
+    transcriber = get_transcriber(model_size=model_size)
+    warmup.report(f"检查 whisper-{model_size} 模型文件")
+    transcriber.prepare_model_files()
+    warmup.report(f"加载 whisper-{model_size} 模型")
+    # 借出再归还，模型副本留在模型池中供后续任务直接使用
+    with transcriber.checkout_model():
+        pass
+
+
+warmup = Warmup()
+warmup.add_step('modules', _preload_modules)
+if TRANSCRIBER_TYPE == 'fast-whisper' or (
+        TRANSCRIBER_TYPE == 'hedged' and 'whisper' in os.getenv('HEDGE_TRANSCRIBERS', 'whisper,bcut')):
+    warmup.add_step('whisper', _load_whisper_model)
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 轮询间隔上限（秒）
+ASR_POLL_MAX_INTERVAL = float(os.getenv('ASR_POLL_MAX_INTERVAL', 30))
+# 云端识别大致耗时与音频时长的比例，用于估算第一次查询的时间
+ASR_POLL_SPEED_RATIO = float(os.getenv('ASR_POLL_SPEED_RATIO', 0.05))
+
+# 查询函数：未完成返回 None，完成返回结果，失败直接抛出异常
+QueryFunc = Callable[[httpx.AsyncClient], Awaitable[Optional[dict]]]
+
+
+class AsrPoller:
+    """
+    云端 ASR 结果轮询服务：
+    所有等待中的任务都在同一个事件循环线程里轮询，不再每个任务占用一个线程固定每秒查询，
+    查询间隔从按音频时长估算的初始值开始指数退避并加随机抖动，结果通过 Future 返回给调用方
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._thread = threading.Thread(target=self._run, name="asr-poller", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._client = httpx.AsyncClient(timeout=10.0)
+        self._loop.run_forever()
+
+    def submit(self, query: QueryFunc, duration: Optional[float], label: str = '') -> Future:
+        """
+        登记一个待轮询的任务，返回 concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(self._track(query, duration or 60, label), self._loop)
+
+    @staticmethod
+    def schedule(duration: float, seed: str = ''):
+        """
+        按音频时长生成轮询间隔：首次查询在预计完成时间附近，之后指数退避，每次加 ±20% 抖动
+        抖动以 (时长, 任务标识) 为种子，同时提交的任务不会在同一时刻集中查询
+        """
+        rng = random.Random(f"{duration}:{seed}")
+        delay = min(max(1.0, duration * ASR_POLL_SPEED_RATIO), ASR_POLL_MAX_INTERVAL)
+        while True:
+            yield delay * rng.uniform(0.8, 1.2)
+            delay = min(delay * 2, ASR_POLL_MAX_INTERVAL)
+
+    async def _track(self, query: QueryFunc, duration: float, label: str) -> dict:
+        # 超时时间随音频时长增长，至少 10 分钟
+        deadline = time.monotonic() + max(600.0, duration * 2)
+        polls = 0
+        for delay in self.schedule(duration, label):
+            await asyncio.sleep(delay)
+            polls += 1
+            result = await query(self._client)
+            if result is not None:
+                logger.info(f"ASR 任务完成 {label}，共查询 {polls} 次")
+                return result
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"ASR 任务等待超时 {label}，已查询 {polls} 次")
+
+
+_poller: Optional[AsrPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_asr_poller() -> AsrPoller:
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            _poller = AsrPoller()
+        return _poller
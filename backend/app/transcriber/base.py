@@ -1,9 +1,68 @@
+import threading
 from abc import ABC, abstractmethod
+from typing import Callable, Iterable, Tuple, Optional
 
-from app.models.transcriber_model import TranscriptResult
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+
+# 当前线程的取消信号，由 HedgedTranscriber 在各后端的工作线程中设置
+_cancel_local = threading.local()
+# 当前线程的转写片段监听器，由 NoteGenerator 在转写阶段设置，用于汇报进度
+_listener_local = threading.local()
+# 当前线程占用的转写阶段槽位的释放函数，由 NoteGenerator 在转写阶段设置
+_stage_local = threading.local()
+
+
+class TranscriptionCancelled(Exception):
+    pass
+
+
+def set_cancel_event(event: Optional[threading.Event]):
+    _cancel_local.event = event
+
+
+def get_cancel_event() -> Optional[threading.Event]:
+    return getattr(_cancel_local, 'event', None)
+
+
+def set_segment_listener(listener: Optional[Callable[[TranscriptSegment], None]]):
+    _listener_local.listener = listener
+
+
+def notify_segment(segment: TranscriptSegment):
+    '''
+    转写器每得到一个片段时调用，转发给当前线程的监听器
+    '''
+    listener = getattr(_listener_local, 'listener', None)
+    if listener is not None:
+        listener(segment)
+
+
+def set_stage_release(release: Optional[Callable[[], None]]):
+    _stage_local.release = release
+
+
+def release_stage():
+    '''
+    云端转写上传完成、开始等待远端结果时调用：提前交还转写阶段槽位，让排队的任务开始转写
+    '''
+    release = getattr(_stage_local, 'release', None)
+    if release is not None:
+        release()
+
+
+def check_cancelled():
+    '''
+    转写过程中的检查点：当前线程的转写已被取消时抛出 TranscriptionCancelled
+    '''
+    event = get_cancel_event()
+    if event is not None and event.is_set():
+        raise TranscriptionCancelled()
 
 
 class Transcriber(ABC):
+    # 是否支持边下载边转写（transcript_stream）
+    supports_streaming: bool = False
+
     @abstractmethod
     def transcript(self,file_path:str)->TranscriptResult:
         '''
@@ -13,6 +72,16 @@ class Transcriber(ABC):
         '''
         pass
 
+    def transcript_stream(self, windows: Iterable[Tuple[float, "np.ndarray"]], file_path: str) -> TranscriptResult:
+        '''
+        流式转写：音频边下载边按窗口送入，窗口内的时间戳需要加上窗口起始时间
+
+        :param windows: (窗口起始秒数, 16k 单声道 float32 采样) 的迭代器
+        :param file_path: 音频最终落盘的路径，用于完成回调
+        :return: 返回一个 TranscriptResult 类
+        '''
+        raise NotImplementedError(f"{self.__class__.__name__} 不支持流式转写")
+
     def on_finish(self,video_path:str,result: TranscriptResult)->None:
         '''
         当音频转录完成时调用
@@ -20,4 +89,4 @@ class Transcriber(ABC):
         :param result: 识别结果
         :return:
         '''
-        pass
\ No newline at end of file
+        pass
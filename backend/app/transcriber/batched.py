@@ -0,0 +1,181 @@
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.transcriber_model import TranscriptSegment, TranscriptResult
+from app.utils.audio_stream import SAMPLE_RATE
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 每次送入模型的音频片段数
+WHISPER_BATCH_SIZE = int(os.getenv('WHISPER_BATCH_SIZE', 8))
+# 凑批等待时间（毫秒），让其他任务的片段有机会进入同一批
+WHISPER_BATCH_WAIT_MS = int(os.getenv('WHISPER_BATCH_WAIT_MS', 200))
+# 单轮最多处理的片段数（按批大小的倍数），限制拼接音频的内存占用
+WHISPER_BATCH_ROUNDS = int(os.getenv('WHISPER_BATCH_ROUNDS', 8))
+
+# whisper 单个输入窗口最长 30 秒
+CLIP_MAX_SECONDS = 30
+
+
+class _BatchJob:
+    """
+    一个待转写的音频：切分为不超过 30 秒的语音片段，片段全部完成后合并结果
+    """
+
+    def __init__(self, audio: np.ndarray, clips: List[Tuple[int, int]]):
+        self.audio = audio
+        self.clips = clips
+        self.language: Optional[str] = None
+        self.segments: List[TranscriptSegment] = []
+        self.remaining = len(clips)
+        self.error: Optional[Exception] = None
+        self.done = threading.Event()
+        if not clips:
+            self.done.set()
+
+
+def split_clips(audio: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    用 VAD 把音频切成不超过 30 秒的语音片段，返回 [(起始采样, 结束采样)]
+    """
+    from faster_whisper.vad import get_speech_timestamps, VadOptions
+
+    options = VadOptions(max_speech_duration_s=CLIP_MAX_SECONDS, min_silence_duration_ms=160)
+    return [(ts['start'], ts['end']) for ts in get_speech_timestamps(audio, options)]
+
+
+class WhisperBatcher:
+    """
+    跨任务的批量转写：
+    各任务的音频先切成语音片段放入同一个队列，后台线程按语言分组，
+    把不同任务的片段拼接后交给 BatchedInferencePipeline 一次解码多个片段，
+    再按片段位置把识别结果分发回各自的任务
+    """
+
+    def __init__(self, checkout_model: Callable, batch_size: int = WHISPER_BATCH_SIZE):
+        self.checkout_model = checkout_model
+        self.batch_size = batch_size
+        self._cond = threading.Condition()
+        self._pending: Deque[Tuple[_BatchJob, int]] = deque()
+        self._thread = threading.Thread(target=self._run, name="whisper-batcher", daemon=True)
+        self._thread.start()
+
+    def transcribe(self, file_path: str) -> TranscriptResult:
+        from faster_whisper import decode_audio
+
+        audio = decode_audio(file_path, sampling_rate=SAMPLE_RATE)
+        job = _BatchJob(audio, split_clips(audio))
+        logger.info(f"批量转写入队: {file_path}，{len(job.clips)} 个语音片段")
+        with self._cond:
+            self._pending.extend((job, i) for i in range(len(job.clips)))
+            self._cond.notify()
+
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+
+        segments = sorted(job.segments, key=lambda seg: seg.start)
+        return TranscriptResult(
+            language=job.language,
+            full_text=" ".join(seg.text for seg in segments).strip(),
+            segments=segments,
+            raw={"clips": len(job.clips), "batch_size": self.batch_size}
+        )
+
+    def _take(self) -> List[Tuple[_BatchJob, int]]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            short = len(self._pending) < self.batch_size
+        # 不满一批时等待一小段时间，让其他任务的片段一起凑批
+        if short:
+            time.sleep(WHISPER_BATCH_WAIT_MS / 1000)
+        with self._cond:
+            limit = self.batch_size * WHISPER_BATCH_ROUNDS
+            return [self._pending.popleft() for _ in range(min(limit, len(self._pending)))]
+
+    def _run(self):
+        while True:
+            items = self._take()
+            try:
+                with self.checkout_model() as model:
+                    self._process(model, items)
+            except Exception as e:
+                logger.error(f"批量转写失败: {e}", exc_info=True)
+                for job, _ in items:
+                    job.error = e
+                    job.done.set()
+
+    def _process(self, model, items: List[Tuple[_BatchJob, int]]):
+        from faster_whisper import BatchedInferencePipeline
+
+        pipeline = BatchedInferencePipeline(model)
+
+        # 每个任务只检测一次语言，不同语言的片段不能放在同一批
+        groups: Dict[str, List[Tuple[_BatchJob, int]]] = {}
+        for job, index in items:
+            if job.language is None:
+                start, end = job.clips[0]
+                job.language, _, _ = model.detect_language(job.audio[start:end])
+            groups.setdefault(job.language, []).append((job, index))
+
+        for language, group in groups.items():
+            self._decode_group(pipeline, language, group)
+
+        for job, _ in items:
+            job.remaining -= 1
+            if job.remaining == 0:
+                job.done.set()
+
+    def _decode_group(self, pipeline, language: str, group: List[Tuple[_BatchJob, int]]):
+        # 把各片段首尾相接，记录每个片段在拼接音频中的位置
+        pieces = []
+        bounds = []
+        cursor = 0
+        for job, index in group:
+            start, end = job.clips[index]
+            pieces.append(job.audio[start:end])
+            bounds.append((cursor, cursor + end - start))
+            cursor += end - start
+        audio = np.concatenate(pieces)
+        starts = [b[0] for b in bounds]
+
+        segments_raw, _ = pipeline.transcribe(
+            audio,
+            language=language,
+            clip_timestamps=[{"start": s / SAMPLE_RATE, "end": e / SAMPLE_RATE} for s, e in bounds],
+            batch_size=self.batch_size,
+        )
+        for seg in segments_raw:
+            # 按片段中点找到所属片段，再换算回原音频的时间
+            mid = (seg.start + seg.end) / 2 * SAMPLE_RATE
+            slot = max(0, bisect.bisect_right(starts, mid) - 1)
+            job, index = group[slot]
+            shift = (job.clips[index][0] - bounds[slot][0]) / SAMPLE_RATE
+            job.segments.append(TranscriptSegment(
+                start=seg.start + shift,
+                end=seg.end + shift,
+                text=seg.text.strip()
+            ))
+        logger.info(f"批量转写完成 {len(group)} 个片段（语言: {language}）")
+
+
+_batchers: Dict[Tuple[str, str], WhisperBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(key: Tuple[str, str], checkout_model: Callable) -> WhisperBatcher:
+    """
+    每个 (模型大小, 计算精度) 共用一个批量转写线程，不同任务的片段才能凑到同一批
+    """
+    with _batchers_lock:
+        if key not in _batchers:
+            _batchers[key] = WhisperBatcher(checkout_model)
+        return _batchers[key]
@@ -1,19 +1,34 @@
 import json
 import logging
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import Optional, List, Dict, Union
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from app.decorators.timeit import timeit
 from app.models.transcriber_model import TranscriptSegment, TranscriptResult
-from app.transcriber.base import Transcriber
+from app.transcriber.asr_poller import get_asr_poller
+from app.transcriber.base import (
+    Transcriber,
+    TranscriptionCancelled,
+    check_cancelled,
+    get_cancel_event,
+    release_stage,
+)
 from app.utils.logger import get_logger
+from app.utils.video_helper import probe_duration
 from events import transcription_finished
 
 __version__ = "0.0.3"
 
-API_BASE_URL = "https://member.bilibili.com/x/bcut/rubick-interface"
+API_BASE_URL = os.getenv('BCUT_API_BASE_URL') or "https://member.bilibili.com/x/bcut/rubick-interface"
+
+# 同时上传的分片数，以及单个分片失败后的重试次数
+BCUT_UPLOAD_CONCURRENCY = int(os.getenv('BCUT_UPLOAD_CONCURRENCY', 4))
+BCUT_UPLOAD_RETRIES = int(os.getenv('BCUT_UPLOAD_RETRIES', 3))
 
 # 申请上传
 API_REQ_UPLOAD = API_BASE_URL + "/resource/create"
@@ -29,6 +44,42 @@ API_QUERY_RESULT = API_BASE_URL + "/task/result"
 
 logger = get_logger(__name__)
 
+
+class _FilePart:
+    """
+    文件中的一段字节范围，作为请求体时按块从磁盘读取，不把整个分片读入内存
+    """
+
+    def __init__(self, file_path: str, start: int, end: int, block_size: int = 64 * 1024):
+        self._file = open(file_path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+        self._length = end - start
+        self._block_size = block_size
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def __iter__(self):
+        while True:
+            data = self.read(self._block_size)
+            if not data:
+                break
+            yield data
+
+    def close(self):
+        self._file.close()
+
+
 class BcutTranscriber(Transcriber):
     """必剪 语音识别接口"""
     headers = {
@@ -37,36 +88,23 @@ class BcutTranscriber(Transcriber):
     }
 
     def __init__(self):
+        # 实例由多个任务共享（转写器单例），只保存会话；每次上传的状态都放在局部变量中，避免并发任务互相覆盖
         self.session = requests.Session()
-        self.task_id = None
-        self.__etags = []
-
-        self.__in_boss_key: Optional[str] = None
-        self.__resource_id: Optional[str] = None
-        self.__upload_id: Optional[str] = None
-        self.__upload_urls: List[str] = []
-        self.__per_size: Optional[int] = None
-        self.__clips: Optional[int] = None
-
-        self.__etags: List[str] = []
-        self.__download_url: Optional[str] = None
-        self.task_id: Optional[str] = None
-        
-    def _load_file(self, file_path: str) -> bytes:
-        """读取文件内容"""
-        with open(file_path, 'rb') as f:
-            return f.read()
-
-    def _upload(self, file_path: str) -> None:
-        """申请上传"""
-        file_binary = self._load_file(file_path)
-        if not file_binary:
+        # 连接池大小与并发上传数一致，避免并发分片互相等待连接
+        adapter = HTTPAdapter(pool_maxsize=max(10, BCUT_UPLOAD_CONCURRENCY))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _upload(self, file_path: str) -> str:
+        """申请上传并上传文件，返回提交后的下载链接"""
+        file_size = os.path.getsize(file_path)
+        if not file_size:
             raise ValueError("无法读取文件数据")
             
         payload = json.dumps({
             "type": 2,
             "name": "audio.mp3",
-            "size": len(file_binary),
+            "size": file_size,
             "ResourceFileType": "mp3",
             "model_id": "8",
         })
@@ -80,42 +118,53 @@ class BcutTranscriber(Transcriber):
         resp = resp.json()
         resp_data = resp["data"]
 
-        self.__in_boss_key = resp_data["in_boss_key"]
-        self.__resource_id = resp_data["resource_id"]
-        self.__upload_id = resp_data["upload_id"]
-        self.__upload_urls = resp_data["upload_urls"]
-        self.__per_size = resp_data["per_size"]
-        self.__clips = len(resp_data["upload_urls"])
-
+        upload_urls = resp_data["upload_urls"]
         logger.info(
-            f"申请上传成功, 总计大小{resp_data['size'] // 1024}KB, {self.__clips}分片, 分片大小{resp_data['per_size'] // 1024}KB: {self.__in_boss_key}"
+            f"申请上传成功, 总计大小{resp_data['size'] // 1024}KB, {len(upload_urls)}分片, 分片大小{resp_data['per_size'] // 1024}KB: {resp_data['in_boss_key']}"
         )
-        self.__upload_part(file_binary)
-        self.__commit_upload()
-
-    def __upload_part(self, file_binary: bytes) -> None:
-        """上传音频数据"""
-        for clip in range(self.__clips):
-            start_range = clip * self.__per_size
-            end_range = min((clip + 1) * self.__per_size, len(file_binary))
-            logger.info(f"开始上传分片{clip}: {start_range}-{end_range}")
-            resp = self.session.put(
-                self.__upload_urls[clip],
-                data=file_binary[start_range:end_range],
-                headers={'Content-Type': 'application/octet-stream'}
-            )
-            resp.raise_for_status()
-            etag = resp.headers.get("Etag", "").strip('"')
-            self.__etags.append(etag)
-            logger.info(f"分片{clip}上传成功: {etag}")
+        etags = self.__upload_part(file_path, file_size, upload_urls, resp_data["per_size"])
+        return self.__commit_upload(resp_data, etags)
+
+    def __put_part(self, file_path: str, file_size: int, upload_url: str, per_size: int, clip: int) -> str:
+        """上传单个分片，失败时只重试该分片"""
+        start_range = clip * per_size
+        end_range = min((clip + 1) * per_size, file_size)
+        for attempt in range(BCUT_UPLOAD_RETRIES + 1):
+            part = _FilePart(file_path, start_range, end_range)
+            try:
+                logger.info(f"开始上传分片{clip}: {start_range}-{end_range}")
+                resp = self.session.put(
+                    upload_url,
+                    data=part,
+                    headers={'Content-Type': 'application/octet-stream'}
+                )
+                resp.raise_for_status()
+                etag = resp.headers.get("Etag", "").strip('"')
+                logger.info(f"分片{clip}上传成功: {etag}")
+                return etag
+            except requests.RequestException as e:
+                if attempt == BCUT_UPLOAD_RETRIES:
+                    raise
+                logger.warning(f"分片{clip}上传失败，第{attempt + 1}次重试: {e}")
+                time.sleep(min(2 ** attempt, 10))
+            finally:
+                part.close()
 
-    def __commit_upload(self) -> None:
-        """提交上传数据"""
+    def __upload_part(self, file_path: str, file_size: int, upload_urls: List[str], per_size: int) -> List[str]:
+        """并发上传音频分片，返回按分片顺序排列的 Etag"""
+        with ThreadPoolExecutor(max_workers=max(1, BCUT_UPLOAD_CONCURRENCY)) as executor:
+            return list(executor.map(
+                lambda clip: self.__put_part(file_path, file_size, upload_urls[clip], per_size, clip),
+                range(len(upload_urls))
+            ))
+
+    def __commit_upload(self, upload: dict, etags: List[str]) -> str:
+        """提交上传数据，返回下载链接"""
         data = json.dumps({
-            "InBossKey": self.__in_boss_key,
-            "ResourceId": self.__resource_id,
-            "Etags": ",".join(self.__etags),
-            "UploadId": self.__upload_id,
+            "InBossKey": upload["in_boss_key"],
+            "ResourceId": upload["resource_id"],
+            "Etags": ",".join(etags),
+            "UploadId": upload["upload_id"],
             "model_id": "8",
         })
         resp = self.session.post(
@@ -130,13 +179,14 @@ class BcutTranscriber(Transcriber):
             logger.error(error_msg)
             raise Exception(error_msg)
             
-        self.__download_url = resp["data"]["download_url"]
-        logger.info(f"提交成功，下载链接: {self.__download_url}")
+        download_url = resp["data"]["download_url"]
+        logger.info(f"提交成功，下载链接: {download_url}")
+        return download_url
 
-    def _create_task(self) -> str:
-        """开始创建转换任务"""
+    def _create_task(self, download_url: str) -> str:
+        """开始创建转换任务，返回任务 ID"""
         resp = self.session.post(
-            API_CREATE_TASK, json={"resource": self.__download_url, "model_id": "8"}, headers=self.headers
+            API_CREATE_TASK, json={"resource": download_url, "model_id": "8"}, headers=self.headers
         )
         resp.raise_for_status()
         resp = resp.json()
@@ -145,15 +195,15 @@ class BcutTranscriber(Transcriber):
             logger.error(error_msg)
             raise Exception(error_msg)
             
-        self.task_id = resp["data"]["task_id"]
-        logger.info(f"任务已创建: {self.task_id}")
-        return self.task_id
-
-    def _query_result(self) -> dict:
-        """查询转换结果"""
-        resp = self.session.get(
-            API_QUERY_RESULT, 
-            params={"model_id": 7, "task_id": self.task_id}, 
+        task_id = resp["data"]["task_id"]
+        logger.info(f"任务已创建: {task_id}")
+        return task_id
+
+    async def _query_result_async(self, client, task_id: str) -> Optional[dict]:
+        """查询转换结果，未完成时返回 None"""
+        resp = await client.get(
+            API_QUERY_RESULT,
+            params={"model_id": 7, "task_id": task_id},
             headers=self.headers
         )
         resp.raise_for_status()
@@ -162,8 +212,29 @@ class BcutTranscriber(Transcriber):
             error_msg = f"查询结果失败: {resp.get('message', '未知错误')}"
             logger.error(error_msg)
             raise Exception(error_msg)
-            
-        return resp["data"]
+
+        task_resp = resp["data"]
+        if task_resp["state"] == 4:  # 完成状态
+            return task_resp
+        if task_resp["state"] == 3:  # 失败状态
+            error_msg = f"B站ASR任务失败，状态码: {task_resp['state']}"
+            logger.error(error_msg)
+            raise Exception(error_msg)
+        return None
+
+    @staticmethod
+    def _wait_result(future) -> dict:
+        """等待轮询结果，期间响应对冲转写的取消信号"""
+        cancel = get_cancel_event()
+        if cancel is None:
+            return future.result()
+        while True:
+            try:
+                return future.result(timeout=1)
+            except FutureTimeoutError:
+                if cancel.is_set():
+                    future.cancel()
+                    check_cancelled()
 
     @timeit
     def transcript(self, file_path: str) -> TranscriptResult:
@@ -173,37 +244,25 @@ class BcutTranscriber(Transcriber):
             
             # 上传文件
             logger.info("正在上传文件...")
-            self._upload(file_path)
+            download_url = self._upload(file_path)
             
             # 创建任务
+            check_cancelled()
             logger.info("提交转录任务...")
-            self._create_task()
+            task_id = self._create_task(download_url)
             
-            # 轮询检查任务状态
+            # 交给轮询服务统一查询，按音频时长决定查询节奏
             logger.info("等待转录结果...")
-            task_resp = None
-            max_retries = 500
-            for i in range(max_retries):
-                task_resp = self._query_result()
-                
-                if task_resp["state"] == 4:  # 完成状态
-                    break
-                elif task_resp["state"] == 3:  # 失败状态
-                    error_msg = f"B站ASR任务失败，状态码: {task_resp['state']}"
-                    logger.error(error_msg)
-                    raise Exception(error_msg)
-                    
-                # 每隔一段时间打印进度
-                if i % 10 == 0:
-                    logger.info(f"转录进行中... {i}/{max_retries}")
-                    
-                time.sleep(1)
-                
-            if not task_resp or task_resp["state"] != 4:
-                error_msg = f"B站ASR任务未能完成，状态: {task_resp.get('state') if task_resp else 'Unknown'}"
-                logger.error(error_msg)
-                raise Exception(error_msg)
-                
+            duration = probe_duration(file_path)
+            future = get_asr_poller().submit(
+                lambda client: self._query_result_async(client, task_id),
+                duration,
+                label=task_id
+            )
+            # 之后只是等待远端识别，交还转写阶段槽位，不让排队的任务空等
+            release_stage()
+            task_resp = self._wait_result(future)
+
             # 解析结果
             logger.info("转录成功，处理结果...")
             result_json = json.loads(task_resp["result"])
@@ -238,6 +297,9 @@ class BcutTranscriber(Transcriber):
             
             return result
             
+        except TranscriptionCancelled:
+            logger.info(f"B站ASR任务已取消: {file_path}")
+            raise
         except Exception as e:
             logger.error(f"B站ASR处理失败: {str(e)}")
             raise
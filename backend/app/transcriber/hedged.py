@@ -0,0 +1,108 @@
+import os
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from app.models.transcriber_model import TranscriptResult
+from app.transcriber.base import Transcriber, set_cancel_event
+from app.utils.logger import get_logger
+from app.utils.video_helper import probe_duration
+
+logger = get_logger(__name__)
+
+# 首选后端的延迟预算 = 音频时长 × 比例，至少 HEDGE_MIN_BUDGET_SECONDS 秒，超时后启动下一个后端
+HEDGE_BUDGET_RATIO = float(os.getenv('HEDGE_BUDGET_RATIO', 0.5))
+HEDGE_MIN_BUDGET_SECONDS = float(os.getenv('HEDGE_MIN_BUDGET_SECONDS', 20))
+
+
+class HedgedTranscriber(Transcriber):
+    """
+    对冲转写：先启动首选后端，超过延迟预算仍未完成（或已失败）时启动下一个后端，
+    采用最先返回的结果，并通知其余后端取消
+    本地 CPU 繁忙时由云端识别兜底，降低转写的长尾延迟
+    """
+
+    def __init__(self, backends: List[Tuple[str, Transcriber]]):
+        if not backends:
+            raise ValueError("对冲转写至少需要一个后端")
+        self.backends = backends
+        # 转写缓存标识：带上各后端的模型大小和计算精度，不同 whisper 模型的对冲结果不共用缓存
+        self.model_size = self._backend_attr('model_size')
+        self.compute_type = self._backend_attr('compute_type')
+
+    def _backend_attr(self, attr: str) -> str:
+        return ",".join(
+            f"{name}:{getattr(transcriber, attr, '') or ''}" for name, transcriber in self.backends
+        )
+
+    @staticmethod
+    def latency_budget(duration: Optional[float]) -> float:
+        if not duration:
+            return HEDGE_MIN_BUDGET_SECONDS
+        return max(HEDGE_MIN_BUDGET_SECONDS, duration * HEDGE_BUDGET_RATIO)
+
+    def _run_backend(self, name: str, transcriber: Transcriber, file_path: str,
+                     cancel: threading.Event, results: "queue.Queue"):
+        set_cancel_event(cancel)
+        start = time.time()
+        try:
+            result = transcriber.transcript(file_path)
+            # 部分转写器出错时返回 None，按失败处理
+            if result is None:
+                raise RuntimeError(f"{name} 未返回转写结果")
+            results.put((name, result, None, time.time() - start))
+        except Exception as e:
+            results.put((name, None, e, time.time() - start))
+        finally:
+            set_cancel_event(None)
+
+    def transcript(self, file_path: str) -> TranscriptResult:
+        budget = self.latency_budget(probe_duration(file_path))
+        results: "queue.Queue" = queue.Queue()
+        cancels = []
+        errors = []
+
+        def launch(index: int):
+            name, transcriber = self.backends[index]
+            cancel = threading.Event()
+            cancels.append(cancel)
+            logger.info(f"对冲转写启动后端: {name}")
+            threading.Thread(
+                target=self._run_backend,
+                args=(name, transcriber, file_path, cancel, results),
+                name=f"hedge-{name}",
+                daemon=True
+            ).start()
+
+        launch(0)
+        launched = 1
+        running = 1
+        while running:
+            # 还有备用后端时只等待到预算耗尽，否则一直等到有结果
+            timeout = budget if launched < len(self.backends) else None
+            try:
+                name, result, error, seconds = results.get(timeout=timeout)
+            except queue.Empty:
+                logger.info(f"转写超过延迟预算 {budget:.0f}s，启动备用后端")
+                launch(launched)
+                launched += 1
+                running += 1
+                continue
+
+            running -= 1
+            if error is None:
+                logger.info(f"对冲转写采用 {name} 的结果，耗时 {seconds:.1f}s")
+                for cancel in cancels:
+                    cancel.set()
+                return result
+
+            logger.warning(f"{name} 转写失败: {error}")
+            errors.append(f"{name}: {error}")
+            # 失败后不再等预算，立即启动下一个后端
+            if launched < len(self.backends):
+                launch(launched)
+                launched += 1
+                running += 1
+
+        raise RuntimeError(f"所有转写后端均失败：{'; '.join(errors)}")
@@ -14,7 +14,8 @@ logger = get_logger(__name__)
 class KuaishouTranscriber(Transcriber):
     """快手语音识别实现"""
     
-    API_URL = "https://ai.kuaishou.com/api/effects/subtitle_generate"
+    # 可通过 KUAISHOU_API_URL 指向本地替身服务做联调
+    API_URL = os.getenv('KUAISHOU_API_URL') or "https://ai.kuaishou.com/api/effects/subtitle_generate"
     
     def __init__(self):
         pass
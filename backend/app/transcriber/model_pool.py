@@ -0,0 +1,158 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple, Any
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 每个 (模型大小, 计算精度) 最多同时加载的副本数，副本越多可并行转写的任务越多
+WHISPER_POOL_REPLICAS = int(os.getenv('WHISPER_POOL_REPLICAS', 1))
+# 所有已加载模型的内存预算（MB），超出时按最近最少使用卸载空闲模型
+WHISPER_POOL_MEMORY_MB = int(os.getenv('WHISPER_POOL_MEMORY_MB', 4096))
+
+# float16 下各模型的大致内存占用（MB），int8 约为一半
+MODEL_MEMORY_MB = {
+    'tiny': 150,
+    'base': 300,
+    'small': 1000,
+    'medium': 2600,
+    'large': 4500,
+    'turbo': 2500,
+    'distil': 2000,
+}
+
+ModelKey = Tuple[str, str]
+
+
+def estimate_model_memory(model_size: str, compute_type: str) -> int:
+    """
+    估算一个模型副本的内存占用（MB）
+    """
+    name = model_size.lower()
+    if 'turbo' in name:
+        size = MODEL_MEMORY_MB['turbo']
+    else:
+        size = next((mb for prefix, mb in MODEL_MEMORY_MB.items() if name.startswith(prefix)), MODEL_MEMORY_MB['large'])
+    if compute_type and 'int8' in compute_type:
+        size //= 2
+    return size
+
+
+class WhisperModelPool:
+    """
+    whisper 模型池：按 (模型大小, 计算精度) 管理多个模型副本
+    - 调用方借出（checkout）一个副本独占使用，用完归还（checkin），并发任务不会共用同一个模型
+    - 副本数达到上限时，借用方等待其他任务归还
+    - 总内存超出预算时，按最近最少使用卸载其他模型的空闲副本
+    """
+
+    def __init__(self, replicas: int = WHISPER_POOL_REPLICAS, memory_budget_mb: int = WHISPER_POOL_MEMORY_MB):
+        self.replicas = max(1, replicas)
+        self.memory_budget_mb = memory_budget_mb
+        self._cond = threading.Condition()
+        self._idle: Dict[ModelKey, List[Any]] = {}
+        self._loaded: Dict[ModelKey, int] = {}
+        # 已占用名额但还在加载中的副本数
+        self._loading: Dict[ModelKey, int] = {}
+        self._sizes: Dict[ModelKey, int] = {}
+        self._lru: "OrderedDict[ModelKey, None]" = OrderedDict()
+        self._used_mb = 0
+
+    def _touch(self, key: ModelKey):
+        self._lru[key] = None
+        self._lru.move_to_end(key)
+
+    def _evict_for(self, size_mb: int, keep: ModelKey):
+        """
+        卸载最久未使用的空闲副本，直到能放下 size_mb
+        """
+        for key in list(self._lru):
+            if self._used_mb + size_mb <= self.memory_budget_mb:
+                return
+            if key == keep:
+                continue
+            idle = self._idle.get(key) or []
+            while idle and self._used_mb + size_mb > self.memory_budget_mb:
+                idle.pop()
+                self._loaded[key] -= 1
+                self._used_mb -= self._sizes[key]
+                logger.info(f"卸载空闲的 whisper 模型副本: {key}")
+            if self._loaded.get(key) == 0:
+                self._lru.pop(key, None)
+
+    def checkout(self, key: ModelKey, factory: Callable[[], Any], size_mb: int) -> Any:
+        """
+        借出一个模型副本：优先复用空闲副本，未达上限且内存允许时加载新副本，否则等待归还
+        """
+        with self._cond:
+            while True:
+                self._touch(key)
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop()
+                loaded = self._loaded.get(key, 0)
+                if loaded < self.replicas:
+                    self._evict_for(size_mb, keep=key)
+                    # 该模型一个副本都没有时，即使超出预算也要加载，否则请求永远无法执行
+                    if loaded == 0 or self._used_mb + size_mb <= self.memory_budget_mb:
+                        if self._used_mb + size_mb > self.memory_budget_mb:
+                            logger.warning(f"whisper 模型内存超出预算: {self._used_mb + size_mb}MB > {self.memory_budget_mb}MB")
+                        self._loaded[key] = loaded + 1
+                        self._loading[key] = self._loading.get(key, 0) + 1
+                        self._sizes[key] = size_mb
+                        self._used_mb += size_mb
+                        break
+                self._cond.wait()
+
+        # 加载模型较慢，放在锁外进行
+        logger.info(f"加载 whisper 模型副本: {key}（第 {self._loaded[key]} 个）")
+        try:
+            model = factory()
+        except Exception:
+            with self._cond:
+                self._loading[key] -= 1
+                self._loaded[key] -= 1
+                self._used_mb -= size_mb
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._loading[key] -= 1
+        return model
+
+    def reserve(self, size_mb: int, owner: str):
+        """
+        登记模型池之外常驻的模型内存（如多进程分块转写的子进程副本），
+        先卸载空闲副本腾出空间，之后加载副本时一并计入预算；这部分内存不会被卸载
+        """
+        with self._cond:
+            self._evict_for(size_mb, keep=None)
+            self._used_mb += size_mb
+            if self._used_mb > self.memory_budget_mb:
+                logger.warning(f"whisper 模型内存超出预算: {self._used_mb}MB > {self.memory_budget_mb}MB（{owner}）")
+            logger.info(f"{owner} 占用 whisper 模型内存 {size_mb}MB")
+
+    def is_loaded(self, key: ModelKey) -> bool:
+        """
+        是否已有加载完成的副本（空闲或正在使用）
+        """
+        with self._cond:
+            return self._loaded.get(key, 0) - self._loading.get(key, 0) > 0
+
+    def checkin(self, key: ModelKey, model: Any):
+        with self._cond:
+            self._idle.setdefault(key, []).append(model)
+            self._cond.notify_all()
+
+    @contextmanager
+    def use(self, key: ModelKey, factory: Callable[[], Any], size_mb: int):
+        model = self.checkout(key, factory, size_mb)
+        try:
+            yield model
+        finally:
+            self.checkin(key, model)
+
+
+whisper_model_pool = WhisperModelPool()
@@ -0,0 +1,171 @@
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.transcriber_model import TranscriptSegment, TranscriptResult
+from app.transcriber.base import notify_segment
+from app.transcriber.model_pool import whisper_model_pool, estimate_model_memory
+from app.utils.audio_stream import SAMPLE_RATE, find_quiet_cut
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 子进程内的模型副本，每个进程加载一次后复用
+_worker_model = None
+
+
+def _init_worker(model_size: str, device: str, compute_type: str, download_root: str):
+    global _worker_model
+    from faster_whisper import WhisperModel
+    _worker_model = WhisperModel(
+        model_size,
+        device=device,
+        compute_type=compute_type,
+        cpu_threads=1,
+        download_root=download_root
+    )
+
+
+def _transcribe_chunk(offset: float, samples: np.ndarray) -> Tuple[Optional[str], List[Tuple[float, float, str]]]:
+    segments_raw, info = _worker_model.transcribe(samples)
+    segments = [(seg.start + offset, seg.end + offset, seg.text.strip()) for seg in segments_raw]
+    return info.language, segments
+
+
+def plan_chunks(samples: np.ndarray, chunk_seconds: float) -> List[Tuple[int, int]]:
+    """
+    按静音边界把音频切成约 chunk_seconds 长的窗口，返回 [(起始采样, 结束采样)]
+    优先在 VAD 检测到的语音间隙中点切分，找不到合适间隙时退回能量最低点
+    """
+    from faster_whisper.vad import get_speech_timestamps
+
+    total = len(samples)
+    target = int(chunk_seconds * SAMPLE_RATE)
+    speech = get_speech_timestamps(samples)
+    gaps = [(prev['end'] + nxt['start']) // 2 for prev, nxt in zip(speech, speech[1:])]
+
+    bounds = []
+    start = 0
+    while total - start > target * 1.5:
+        candidates = [c for c in gaps if start + target * 0.5 <= c <= start + target * 1.5]
+        if candidates:
+            cut = min(candidates, key=lambda c: abs(c - (start + target)))
+        else:
+            cut = start + find_quiet_cut(samples[start:start + target])
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, total))
+    return bounds
+
+
+class ParallelWhisperRunner:
+    """
+    多进程分块转写：每个进程持有一个模型副本，各窗口并行转写后按绝对时间合并
+    """
+
+    def __init__(self, model_size: str, device: str, compute_type: str, download_root: str,
+                 workers: int, chunk_seconds: float):
+        self.workers = workers
+        self.chunk_seconds = chunk_seconds
+        # spawn 避免在多线程的服务进程里 fork
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(model_size, device, compute_type, download_root),
+        )
+
+    def transcribe(self, file_path: str) -> TranscriptResult:
+        from faster_whisper import decode_audio
+
+        samples = decode_audio(file_path, sampling_rate=SAMPLE_RATE)
+        bounds = plan_chunks(samples, self.chunk_seconds)
+        logger.info(f"音频时长 {len(samples) / SAMPLE_RATE:.0f}s，切分为 {len(bounds)} 个窗口，{self.workers} 进程并行转写")
+
+        futures = [
+            self.executor.submit(_transcribe_chunk, start / SAMPLE_RATE, samples[start:end])
+            for start, end in bounds
+        ]
+
+        language = None
+        segments: List[TranscriptSegment] = []
+        # 按提交顺序收集，保证时间顺序
+        for future in futures:
+            chunk_language = self._collect(future, segments)
+            language = language or chunk_language
+
+        return TranscriptResult(
+            language=language,
+            full_text=" ".join(seg.text for seg in segments).strip(),
+            segments=segments,
+            raw={"chunks": len(bounds), "workers": self.workers}
+        )
+
+    def transcribe_windows(self, windows: Iterable[Tuple[float, np.ndarray]]) -> TranscriptResult:
+        """
+        边下载边转写：每解码出一个窗口就提交给进程池，下载与多进程转写重叠进行
+        前面的窗口完成后立即发布片段；未完成的窗口超过进程数的两倍时等待最早的窗口，
+        让下载端感受到背压，PCM 不会在内存中无限堆积
+        """
+        language = None
+        segments: List[TranscriptSegment] = []
+        pending: Deque[Future] = deque()
+        chunks = 0
+        try:
+            for offset, samples in windows:
+                pending.append(self.executor.submit(_transcribe_chunk, offset, samples))
+                chunks += 1
+                while pending and (pending[0].done() or len(pending) > self.workers * 2):
+                    chunk_language = self._collect(pending.popleft(), segments)
+                    language = language or chunk_language
+            while pending:
+                chunk_language = self._collect(pending.popleft(), segments)
+                language = language or chunk_language
+        except BaseException:
+            # 下载或转写出错时取消还没开始的窗口，不占用进程池
+            for future in pending:
+                future.cancel()
+            raise
+        logger.info(f"流式窗口 {chunks} 个，{self.workers} 进程并行转写完成")
+
+        return TranscriptResult(
+            language=language,
+            full_text=" ".join(seg.text for seg in segments).strip(),
+            segments=segments,
+            raw={"chunks": chunks, "workers": self.workers}
+        )
+
+    @staticmethod
+    def _collect(future: Future, segments: List[TranscriptSegment]) -> Optional[str]:
+        """
+        等待一个窗口完成，把片段追加到 segments 并逐个发布，返回窗口检测到的语言
+        """
+        chunk_language, chunk_segments = future.result()
+        for s, e, t in chunk_segments:
+            segments.append(TranscriptSegment(start=s, end=e, text=t))
+            notify_segment(segments[-1])
+        return chunk_language
+
+
+_runners: Dict[Tuple[str, str, str], ParallelWhisperRunner] = {}
+_runners_lock = threading.Lock()
+
+
+def get_parallel_runner(model_size: str, device: str, compute_type: str, download_root: str,
+                        workers: int, chunk_seconds: float) -> ParallelWhisperRunner:
+    """
+    进程池按 (模型大小, 设备, 精度) 复用，避免每次转写都重新加载模型
+    每个子进程常驻一个模型副本，创建进程池时把这部分内存计入模型池的预算
+    """
+    key = (model_size, device, compute_type)
+    with _runners_lock:
+        if key not in _runners:
+            whisper_model_pool.reserve(workers * estimate_model_memory(model_size, compute_type),
+                                       owner=f"多进程转写 {model_size} x{workers}")
+            _runners[key] = ParallelWhisperRunner(model_size, device, compute_type, download_root,
+                                                  workers, chunk_seconds)
+        return _runners[key]
@@ -1,36 +1,50 @@
-from app.transcriber.whisper import WhisperTranscriber
-from app.transcriber.bcut import BcutTranscriber
-from app.transcriber.kuaishou import KuaishouTranscriber
+import os
+
+from app.utils.lazy_import import LazyRegistry
 from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
 logger.info('初始化转录服务提供器')
 
+# 转录器类按需导入，faster_whisper 等依赖只在第一次使用时加载
+TRANSCRIBERS = LazyRegistry('转录器', {
+    'whisper': 'app.transcriber.whisper:WhisperTranscriber',
+    'bcut': 'app.transcriber.bcut:BcutTranscriber',
+    'kuaishou': 'app.transcriber.kuaishou:KuaishouTranscriber',
+    'hedged': 'app.transcriber.hedged:HedgedTranscriber',
+})
+
+# 对冲转写的后端顺序，第一个为首选后端
+HEDGE_TRANSCRIBERS = [name.strip() for name in os.getenv('HEDGE_TRANSCRIBERS', 'whisper,bcut').split(',') if name.strip()]
+
 # 维护各种转录器的单例实例
 _transcribers = {
-    'whisper': None,
     'bcut': None,
     'kuaishou': None
 }
+# Whisper 转录器按 (模型大小, 设备) 区分，模型本身由模型池统一加载和复用
+_whisper_transcribers = {}
+_hedged_transcribers = {}
 
 def get_whisper_transcriber(model_size="base", device="cuda"):
     """获取 Whisper 转录器实例"""
-    if _transcribers['whisper'] is None:
+    key = (model_size, device)
+    if key not in _whisper_transcribers:
         logger.info(f'创建 Whisper 转录器实例，参数：{model_size}, {device}')
         try:
-            _transcribers['whisper'] = WhisperTranscriber(model_size=model_size, device=device)
+            _whisper_transcribers[key] = TRANSCRIBERS.create('whisper', model_size=model_size, device=device)
             logger.info('Whisper 转录器创建成功')
         except Exception as e:
             logger.error(f"Whisper 转录器创建失败: {e}")
             raise
-    return _transcribers['whisper']
+    return _whisper_transcribers[key]
 
 def get_bcut_transcriber():
     """获取 Bcut 转录器实例"""
     if _transcribers['bcut'] is None:
         logger.info('创建 Bcut 转录器实例')
         try:
-            _transcribers['bcut'] = BcutTranscriber()
+            _transcribers['bcut'] = TRANSCRIBERS.create('bcut')
             logger.info('Bcut 转录器创建成功')
         except Exception as e:
             logger.error(f"Bcut 转录器创建失败: {e}")
@@ -42,19 +56,33 @@ def get_kuaishou_transcriber():
     if _transcribers['kuaishou'] is None:
         logger.info('创建快手转录器实例')
         try:
-            _transcribers['kuaishou'] = KuaishouTranscriber()
+            _transcribers['kuaishou'] = TRANSCRIBERS.create('kuaishou')
             logger.info('快手转录器创建成功')
         except Exception as e:
             logger.error(f"快手转录器创建失败: {e}")
             raise
     return _transcribers['kuaishou']
 
+def get_hedged_transcriber(model_size="base", device="cuda"):
+    """获取对冲转录器实例，后端按 HEDGE_TRANSCRIBERS 的顺序依次启动"""
+    key = (model_size, device)
+    if key not in _hedged_transcribers:
+        logger.info(f'创建对冲转录器实例，后端：{HEDGE_TRANSCRIBERS}')
+        backends = []
+        for name in HEDGE_TRANSCRIBERS:
+            if name == 'hedged' or name not in TRANSCRIBERS:
+                logger.warning(f'忽略不支持的对冲后端 "{name}"')
+                continue
+            backends.append((name, get_transcriber(name, model_size, device)))
+        _hedged_transcribers[key] = TRANSCRIBERS.create('hedged', backends=backends)
+    return _hedged_transcribers[key]
+
 def get_transcriber(transcriber_type="whisper", model_size="base", device="cuda"):
     """
     获取指定类型的转录器实例
     
     参数:
-        transcriber_type: 转录器类型，支持 "whisper", "bcut", "kuaishou"
+        transcriber_type: 转录器类型，支持 "whisper", "bcut", "kuaishou", "hedged"
         model_size: 模型大小，whisper 特有参数
         device: 设备类型，whisper 特有参数
     
@@ -69,6 +97,8 @@ def get_transcriber(transcriber_type="whisper", model_size="base", device="cuda"
         return get_bcut_transcriber()
     elif transcriber_type == "kuaishou":
         return get_kuaishou_transcriber()
+    elif transcriber_type == "hedged":
+        return get_hedged_transcriber(model_size, device)
     else:
         logger.warning(f'未知转录器类型 "{transcriber_type}"，使用默认 whisper')
         return get_whisper_transcriber(model_size, device)
\ No newline at end of file
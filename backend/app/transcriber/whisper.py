@@ -2,7 +2,10 @@ from faster_whisper import WhisperModel
 
 from app.decorators.timeit import timeit
 from app.models.transcriber_model import TranscriptSegment, TranscriptResult
-from app.transcriber.base import Transcriber
+from app.transcriber.base import Transcriber, TranscriptionCancelled, check_cancelled, notify_segment
+from app.transcriber.model_pool import whisper_model_pool, estimate_model_memory
+from app.transcriber.parallel import get_parallel_runner
+from app.transcriber.batched import get_batcher
 from app.utils.env_checker import is_cuda_available, is_torch_installed
 from app.utils.logger import get_logger
 from app.utils.path_helper import get_model_dir
@@ -10,6 +13,7 @@ from app.utils.path_helper import get_model_dir
 from events import transcription_finished
 from pathlib import Path
 import os
+import threading
 from tqdm import tqdm
 from huggingface_hub import snapshot_download
 
@@ -18,7 +22,16 @@ from huggingface_hub import snapshot_download
 '''
 logger=get_logger(__name__)
 
+# 大于 1 时启用多进程分块转写，WHISPER_CHUNK_SECONDS 为每个窗口的目标长度
+WHISPER_PARALLEL_WORKERS = int(os.getenv('WHISPER_PARALLEL_WORKERS', 1))
+WHISPER_CHUNK_SECONDS = float(os.getenv('WHISPER_CHUNK_SECONDS', 300))
+# 批量转写模式：多个任务的语音片段合并成批解码，适合大量视频回填
+WHISPER_BATCH_MODE = os.getenv('WHISPER_BATCH_MODE', 'false').lower() == 'true'
+
 class WhisperTranscriber(Transcriber):
+    # 批量模式要在完整音频上切分语音片段、跨任务凑批，不走边下载边转写
+    supports_streaming = not WHISPER_BATCH_MODE
+
     # TODO:修改为可配置
     def __init__(
             self,
@@ -34,56 +47,94 @@ class WhisperTranscriber(Transcriber):
             if device == 'cuda' and self.device == 'cpu':
                 print('没有 cuda 使用 cpu进行计算')
 
+        self.model_size = model_size
         self.compute_type = compute_type or ("float16" if self.device == "cuda" else "int8")
 
-        # 直接使用项目根目录下的 backend/models/whisper-{model_size} 目录
-        project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
-        custom_model_path = os.path.join(project_root, "backend", "models", f"whisper-{model_size}")
-
-        # 打印路径信息便于调试
-        logger.info(f"Project root: {project_root}")
-        logger.info(f"Custom model path: {custom_model_path}")
-        logger.info(f"Custom model path exists: {Path(custom_model_path).exists()}")
-        if Path(custom_model_path).exists():
-            logger.info(f"Custom model path contents: {list(Path(custom_model_path).iterdir())}")
-
-        # 然后检查默认的模型目录
-        model_dir = get_model_dir("whisper")
-        model_path = os.path.join(model_dir, f"whisper-{model_size}")
-
-        # 打印默认模型路径信息
-        logger.info(f"Default model dir: {model_dir}")
-        logger.info(f"Default model path: {model_path}")
-        logger.info(f"Default model path exists: {Path(model_path).exists()}")
-        if Path(model_path).exists():
-            logger.info(f"Default model path contents: {list(Path(model_path).iterdir())}")
-
-        # 如果项目根目录下存在模型，使用该目录
-        if Path(custom_model_path).exists() and os.path.isfile(os.path.join(custom_model_path, "model.bin")):
-            logger.info(f"使用项目根目录下的模型: {custom_model_path}")
-            model_path = custom_model_path
-        # 如果默认目录下不存在模型，尝试下载
-        elif not Path(model_path).exists() or not os.path.isfile(os.path.join(model_path, "model.bin")):
-            logger.info(f"模型 whisper-{model_size} 不存在，开始下载...")
-            try:
-                repo_id = f"guillaumekln/faster-whisper-{model_size}"
-                snapshot_download(
-                    repo_id,
-                    local_dir=model_path,
-                    local_dir_use_symlinks=False,
-                )
-                logger.info("模型下载完成")
-            except Exception as e:
-                logger.error(f"模型下载失败: {e}")
-                raise
-
-        self.model = WhisperModel(
-            model_size,
+        self.model_dir = get_model_dir("whisper")
+        self.cpu_threads = cpu_threads
+        self.parallel_workers = WHISPER_PARALLEL_WORKERS
+        if WHISPER_BATCH_MODE:
+            logger.info("已启用批量转写模式，音频完整下载后再进入批次，不使用边下载边转写")
+        # 模型文件在第一次加载时才检查和下载，创建转写器本身不做任何耗时操作
+        self._files_ready = False
+        self._files_lock = threading.Lock()
+
+    def prepare_model_files(self):
+        '''
+        检查模型文件，不存在时下载
+        '''
+        with self._files_lock:
+            if self._files_ready:
+                return
+
+            # 直接使用项目根目录下的 backend/models/whisper-{model_size} 目录
+            project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../"))
+            custom_model_path = os.path.join(project_root, "backend", "models", f"whisper-{self.model_size}")
+
+            # 打印路径信息便于调试
+            logger.info(f"Project root: {project_root}")
+            logger.info(f"Custom model path: {custom_model_path}")
+            logger.info(f"Custom model path exists: {Path(custom_model_path).exists()}")
+            if Path(custom_model_path).exists():
+                logger.info(f"Custom model path contents: {list(Path(custom_model_path).iterdir())}")
+
+            # 然后检查默认的模型目录
+            model_dir = get_model_dir("whisper")
+            model_path = os.path.join(model_dir, f"whisper-{self.model_size}")
+
+            # 打印默认模型路径信息
+            logger.info(f"Default model dir: {model_dir}")
+            logger.info(f"Default model path: {model_path}")
+            logger.info(f"Default model path exists: {Path(model_path).exists()}")
+            if Path(model_path).exists():
+                logger.info(f"Default model path contents: {list(Path(model_path).iterdir())}")
+
+            # 如果项目根目录下存在模型，使用该目录
+            if Path(custom_model_path).exists() and os.path.isfile(os.path.join(custom_model_path, "model.bin")):
+                logger.info(f"使用项目根目录下的模型: {custom_model_path}")
+                model_path = custom_model_path
+            # 如果默认目录下不存在模型，尝试下载
+            elif not Path(model_path).exists() or not os.path.isfile(os.path.join(model_path, "model.bin")):
+                logger.info(f"模型 whisper-{self.model_size} 不存在，开始下载...")
+                try:
+                    repo_id = f"guillaumekln/faster-whisper-{self.model_size}"
+                    snapshot_download(
+                        repo_id,
+                        local_dir=model_path,
+                        local_dir_use_symlinks=False,
+                    )
+                    logger.info("模型下载完成")
+                except Exception as e:
+                    logger.error(f"模型下载失败: {e}")
+                    raise
+            self._files_ready = True
+
+    def _load_model(self) -> WhisperModel:
+        self.prepare_model_files()
+        return WhisperModel(
+            self.model_size,
             device=self.device,
             compute_type=self.compute_type,
-            cpu_threads=cpu_threads,
-            download_root=model_dir
+            cpu_threads=self.cpu_threads,
+            download_root=self.model_dir
+        )
+
+    def is_model_loaded(self) -> bool:
+        '''
+        模型池中是否已有该模型加载完成的副本
+        '''
+        return whisper_model_pool.is_loaded((self.model_size, self.compute_type))
+
+    def checkout_model(self):
+        '''
+        从模型池借出一个模型副本，用完自动归还
+        '''
+        return whisper_model_pool.use(
+            (self.model_size, self.compute_type),
+            self._load_model,
+            estimate_model_memory(self.model_size, self.compute_type)
         )
+
     @staticmethod
     def is_torch_installed() -> bool:
         try:
@@ -108,23 +159,54 @@ class WhisperTranscriber(Transcriber):
         except ImportError:
             return False
 
+    def _parallel_runner(self):
+        return get_parallel_runner(
+            self.model_size,
+            self.device,
+            self.compute_type,
+            self.model_dir,
+            workers=self.parallel_workers,
+            chunk_seconds=WHISPER_CHUNK_SECONDS
+        )
+
+    def _transcript_parallel(self, file_path: str) -> TranscriptResult:
+        self.prepare_model_files()
+        return self._parallel_runner().transcribe(file_path)
+
+    def _transcript_batched(self, file_path: str) -> TranscriptResult:
+        batcher = get_batcher((self.model_size, self.compute_type), self.checkout_model)
+        return batcher.transcribe(file_path)
+
     @timeit
     def transcript(self, file_path: str) -> TranscriptResult:
         try:
+            if WHISPER_BATCH_MODE:
+                result = self._transcript_batched(file_path)
+                self.on_finish(file_path, result)
+                return result
 
-            segments_raw, info = self.model.transcribe(file_path)
+            if self.parallel_workers > 1:
+                result = self._transcript_parallel(file_path)
+                self.on_finish(file_path, result)
+                return result
 
             segments = []
             full_text = ""
 
-            for seg in segments_raw:
-                text = seg.text.strip()
-                full_text += text + " "
-                segments.append(TranscriptSegment(
-                    start=seg.start,
-                    end=seg.end,
-                    text=text
-                ))
+            # segments_raw 是惰性生成器，必须在归还模型之前消费完
+            with self.checkout_model() as model:
+                segments_raw, info = model.transcribe(file_path)
+                for seg in segments_raw:
+                    # 对冲转写中另一个后端先完成时，在段与段之间停止解码
+                    check_cancelled()
+                    text = seg.text.strip()
+                    full_text += text + " "
+                    segments.append(TranscriptSegment(
+                        start=seg.start,
+                        end=seg.end,
+                        text=text
+                    ))
+                    notify_segment(segments[-1])
 
             result= TranscriptResult(
                 language=info.language,
@@ -134,10 +216,52 @@ class WhisperTranscriber(Transcriber):
             )
             self.on_finish(file_path, result)
             return result
+        except TranscriptionCancelled:
+            # 取消（对冲转写的落选方、任务被取消）不是转写失败，交给调用方处理
+            logger.info(f"转写已取消: {file_path}")
+            raise
         except Exception as e:
             print(f"转写失败：{e}")
 
 
+    @timeit
+    def transcript_stream(self, windows, file_path: str) -> TranscriptResult:
+        if self.parallel_workers > 1:
+            # 多进程模式下各窗口并行转写，下载仍与转写重叠
+            self.prepare_model_files()
+            result = self._parallel_runner().transcribe_windows(windows)
+            self.on_finish(file_path, result)
+            return result
+
+        segments = []
+        language = None
+        raw = None
+
+        for offset, samples in windows:
+            # 每个窗口单独借用模型，等待下载的间隙不占用模型副本
+            with self.checkout_model() as model:
+                segments_raw, info = model.transcribe(samples)
+                if language is None:
+                    language = info.language
+                    raw = info
+                for seg in segments_raw:
+                    segments.append(TranscriptSegment(
+                        start=seg.start + offset,
+                        end=seg.end + offset,
+                        text=seg.text.strip()
+                    ))
+                    notify_segment(segments[-1])
+            logger.info(f"窗口 {offset:.0f}s 转写完成，累计 {len(segments)} 段")
+
+        result = TranscriptResult(
+            language=language,
+            full_text=" ".join(seg.text for seg in segments).strip(),
+            segments=segments,
+            raw=raw
+        )
+        self.on_finish(file_path, result)
+        return result
+
     def on_finish(self,video_path:str,result: TranscriptResult)->None:
         print("转写完成")
         transcription_finished.send({
@@ -0,0 +1,195 @@
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Iterator, Tuple, Optional
+
+import numpy as np
+
+from app.models.audio_model import RemoteMediaSource
+from app.utils.logger import get_logger
+from app.utils.video_helper import get_ffmpeg_path
+
+logger = get_logger(__name__)
+
+# whisper 需要 16k 单声道 PCM
+SAMPLE_RATE = 16000
+BYTES_PER_SAMPLE = 2  # s16le
+# 读取线程最多缓冲的 PCM 秒数（约 32KB/秒），转写跟不上时 ffmpeg 暂停读取远程数据
+STREAM_BUFFER_SECONDS = int(os.getenv('STREAM_BUFFER_SECONDS', 600))
+
+
+class StreamNotStartedError(RuntimeError):
+    """
+    流式下载在产出第一个窗口之前就失败（如直链过期、403），调用方可以改为完整下载
+    """
+    pass
+
+
+def find_quiet_cut(samples: np.ndarray, search_seconds: float = 5.0, frame_ms: int = 100) -> int:
+    """
+    在窗口末尾 search_seconds 秒内寻找能量最低的位置作为切分点，尽量避免把一个词切成两半
+    返回切分点的采样下标
+    """
+    frame = SAMPLE_RATE * frame_ms // 1000
+    search = min(len(samples), int(search_seconds * SAMPLE_RATE))
+    if search < frame * 2:
+        return len(samples)
+
+    tail = samples[len(samples) - search:]
+    n_frames = len(tail) // frame
+    energy = np.square(tail[:n_frames * frame].reshape(n_frames, frame)).mean(axis=1)
+    quietest = int(np.argmin(energy))
+    return len(samples) - search + quietest * frame + frame // 2
+
+
+class AudioStream:
+    """
+    边下载边解码音频：
+    ffmpeg 读取远程直链，一路原样写入本地音频文件（供后续清理、缓存使用），
+    一路解码为 16k 单声道 PCM 输出到管道，按窗口交给转写器
+    """
+
+    def __init__(self, source: RemoteMediaSource, output_path: str, window_seconds: float = 60):
+        self.source = source
+        self.output_path = output_path
+        self.window_seconds = window_seconds
+        # 下载（ffmpeg 读取完远程数据）耗时，结束后才有值
+        self.download_seconds: Optional[float] = None
+
+        # 每项约 1 秒 PCM，队列满时读取线程阻塞，ffmpeg 随之停止读取，形成背压
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max(2, STREAM_BUFFER_SECONDS))
+        self._process: Optional[subprocess.Popen] = None
+        self._stderr = None
+        self._started_at: Optional[float] = None
+        # close() 之后读取线程丢弃剩余数据；completed 表示所有窗口已正常读完
+        self._closed = False
+        self._completed = False
+
+    def _build_command(self, ffmpeg_path: str) -> list:
+        command = [ffmpeg_path, "-hide_banner", "-loglevel", "error"]
+        if self.source.http_headers:
+            headers = "".join(f"{k}: {v}\r\n" for k, v in self.source.http_headers.items())
+            command += ["-headers", headers]
+        command += [
+            "-i", self.source.url,
+            # 输出一：原始音轨直接落盘，不重新编码
+            "-map", "0:a:0", "-c", "copy", "-y", self.output_path,
+            # 输出二：解码后的 PCM 写入 stdout
+            "-map", "0:a:0", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1",
+        ]
+        return command
+
+    def start(self) -> "AudioStream":
+        ffmpeg_path = get_ffmpeg_path()
+
+        os.makedirs(os.path.dirname(self.output_path) or ".", exist_ok=True)
+        self._stderr = tempfile.TemporaryFile()
+        self._started_at = time.time()
+        self._process = subprocess.Popen(
+            self._build_command(ffmpeg_path),
+            stdout=subprocess.PIPE,
+            stderr=self._stderr,
+        )
+        # 单独线程读取管道，保证下载速度不受转写速度拖累
+        threading.Thread(target=self._read_pcm, daemon=True).start()
+        logger.info(f"开始流式下载音频: {self.source.video_id}")
+        return self
+
+    def _read_pcm(self):
+        chunk_size = int(SAMPLE_RATE * BYTES_PER_SAMPLE)  # 每次读取 1 秒
+        remainder = b""
+        try:
+            while True:
+                data = self._process.stdout.read(chunk_size)
+                if not data:
+                    break
+                # 管道可能返回奇数字节，保留不完整的采样到下一次
+                if self._closed:
+                    continue
+                data = remainder + data
+                usable = len(data) - len(data) % BYTES_PER_SAMPLE
+                remainder = data[usable:]
+                if usable:
+                    self._queue.put(data[:usable])
+        finally:
+            self._process.wait()
+            self.download_seconds = round(time.time() - self._started_at, 2)
+            self._queue.put(None)
+
+    def windows(self) -> Iterator[Tuple[float, np.ndarray]]:
+        """
+        按到达顺序产出 (窗口起始秒数, float32 采样)
+        """
+        if self._process is None:
+            self.start()
+
+        window_samples = int(self.window_seconds * SAMPLE_RATE)
+        pending = np.zeros(0, dtype=np.float32)
+        offset_samples = 0
+        finished = False
+
+        while not finished:
+            data = self._queue.get()
+            if data is None:
+                finished = True
+                # 先检查 ffmpeg 是否出错，失败时剩余的不完整音频不再送去转写
+                self._check_exit(started=offset_samples > 0)
+            else:
+                samples = np.frombuffer(data, dtype=np.int16).astype(np.float32) / 32768.0
+                pending = np.concatenate([pending, samples])
+
+            while len(pending) >= window_samples or (finished and len(pending) > 0):
+                if finished and len(pending) < window_samples:
+                    cut = len(pending)
+                else:
+                    cut = find_quiet_cut(pending[:window_samples])
+                yield offset_samples / SAMPLE_RATE, pending[:cut]
+                offset_samples += cut
+                pending = pending[cut:]
+
+        self._completed = True
+        logger.info(f"流式下载音频完成，耗时 {self.download_seconds} 秒: {self.output_path}")
+
+    def _check_exit(self, started: bool):
+        self._stderr.seek(0)
+        stderr = self._stderr.read().decode("utf-8", errors="ignore")
+        self._stderr.close()
+        if self._process.returncode != 0:
+            logger.error(f"流式下载音频失败: {stderr}")
+            if not started:
+                raise StreamNotStartedError(f"流式下载音频失败: {stderr}")
+            raise RuntimeError(f"流式下载音频失败: {stderr}")
+
+    def close(self):
+        """
+        转写中途出错或取消时调用：终止 ffmpeg，丢弃已缓冲的 PCM，删除不完整的音频文件
+        所有窗口已正常读完时调用不做任何事
+        """
+        if self._completed or self._closed:
+            return
+        self._closed = True
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        if self._stderr is not None and not self._stderr.closed:
+            self._stderr.close()
+        if os.path.exists(self.output_path):
+            try:
+                os.remove(self.output_path)
+            except OSError as e:
+                logger.warning(f"删除不完整的音频文件失败: {e}")
+        logger.info(f"流式下载已中止: {self.source.video_id}")
+
+    def __enter__(self) -> "AudioStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,41 @@
+import importlib
+import threading
+from typing import Any, Dict, List
+
+
+class LazyRegistry:
+    """
+    名称 -> "模块路径:类名" 的注册表
+    模块在第一次使用时才导入，避免启动时加载 yt_dlp、openai、faster_whisper 等重量级依赖
+    """
+
+    def __init__(self, kind: str, entries: Dict[str, str]):
+        self.kind = kind
+        self._entries = dict(entries)
+        self._classes: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def names(self) -> List[str]:
+        return list(self._entries)
+
+    def get(self, name: str) -> Any:
+        if name not in self._entries:
+            raise ValueError(f"不支持的{self.kind}：{name}")
+        with self._lock:
+            if name not in self._classes:
+                module_path, class_name = self._entries[name].split(':')
+                self._classes[name] = getattr(importlib.import_module(module_path), class_name)
+            return self._classes[name]
+
+    def create(self, name: str, *args, **kwargs) -> Any:
+        return self.get(name)(*args, **kwargs)
+
+    def preload(self):
+        """
+        导入全部模块，供后台预热使用
+        """
+        for name in self._entries:
+            self.get(name)
@@ -9,8 +9,8 @@ def replace_content_markers(markdown: str, video_id: str, platform: str = 'bilib
     """
     替换 *Content-04:16*、Content-04:16 或 Content-[04:16] 为超链接，跳转到对应平台视频的时间位置
     """
-    # 匹配三种形式：*Content-04:16*、Content-04:16、Content-[04:16]
-    pattern = r"(?:\*?)Content-(?:\[(\d{2}):(\d{2})\]|(\d{2}):(\d{2}))"
+    # 匹配三种形式：*Content-04:16*、Content-04:16、Content-[04:16]，分钟数可超过两位（如 105:30）
+    pattern = r"(?:\*?)Content-(?:\[(\d{2,}):(\d{2})\]|(\d{2,}):(\d{2}))"
 
     def replacer(match):
         mm = match.group(1) or match.group(3)
@@ -30,3 +30,41 @@ def replace_content_markers(markdown: str, video_id: str, platform: str = 'bilib
         return f"[原片 @ {mm}:{ss}]({url})"
 
     return re.sub(pattern, replacer, markdown)
+
+
+class StreamingMarkerReplacer:
+    """
+    流式输出的 Markdown 按行处理：只对已经完整的行替换 Content 标记，最后一行等输出结束再处理
+    标记不会跨行，因此逐行替换与整篇替换结果一致
+    """
+
+    def __init__(self, video_id: str, platform: str = 'bilibili'):
+        self.video_id = video_id
+        self.platform = platform
+        self._pending = ""
+        self.lines = []
+
+    def feed(self, text: str) -> list:
+        """
+        追加一段模型输出，返回本次新完成并替换过标记的行
+        """
+        self._pending += text
+        *complete, self._pending = self._pending.split("\n")
+        done = [replace_content_markers(line, self.video_id, self.platform) for line in complete]
+        self.lines.extend(done)
+        return done
+
+    def finish(self) -> list:
+        """
+        输出结束，处理剩余的最后一行
+        """
+        if not self._pending:
+            return []
+        done = [replace_content_markers(self._pending, self.video_id, self.platform)]
+        self._pending = ""
+        self.lines.extend(done)
+        return done
+
+    @property
+    def markdown(self) -> str:
+        return "\n".join(self.lines)
@@ -1,15 +1,33 @@
+import re
 import subprocess
 import os
 import uuid
+from typing import List, Optional, Dict
 from ffmpeg_helper import check_ffmpeg_exists # 导入 check_ffmpeg_exists
 
+# 单个 ffmpeg 进程最多打开的输入数，避免命令行过长和文件句柄过多
+SCREENSHOT_BATCH_SIZE = int(os.getenv('SCREENSHOT_BATCH_SIZE', 24))
+
+_ffmpeg_path: Optional[str] = None
+
+
+def get_ffmpeg_path() -> str:
+    """
+    获取 ffmpeg 路径，找到后在进程内缓存，避免每次截图都重新探测
+    """
+    global _ffmpeg_path
+    if _ffmpeg_path is None:
+        _ffmpeg_path = check_ffmpeg_exists()
+    if not _ffmpeg_path:
+        raise RuntimeError("FFmpeg 命令未找到")
+    return _ffmpeg_path
+
+
 def generate_screenshot(video_path: str, output_dir: str, timestamp: int, index: int) -> str:
     """
     使用 ffmpeg 生成截图，返回生成图片路径
     """
-    ffmpeg_path = check_ffmpeg_exists() # 获取 ffmpeg 路径
-    if not ffmpeg_path:
-        raise RuntimeError("FFmpeg 命令未找到") # 如果找不到 ffmpeg，抛出错误
+    ffmpeg_path = get_ffmpeg_path() # 获取 ffmpeg 路径
 
     os.makedirs(output_dir, exist_ok=True)
     ids=str(uuid.uuid4())
@@ -45,3 +63,106 @@ def generate_screenshot(video_path: str, output_dir: str, timestamp: int, index:
         logger.error(f"FFmpeg 命令未找到，请确保 ffmpeg 已安装并配置在系统 PATH 中，或者检查 ffmpeg_helper.py 中的路径设置。")
         raise RuntimeError("FFmpeg 命令未找到")
 
+
+def probe_range_support(url: str, http_headers: Optional[Dict[str, str]] = None, timeout: float = 10) -> bool:
+    """
+    判断远程媒体是否支持 HTTP Range 请求（请求前两个字节，期望返回 206）
+    """
+    import requests
+
+    headers = dict(http_headers or {})
+    headers['Range'] = 'bytes=0-1'
+    try:
+        with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+            return response.status_code == 206 and 'Content-Range' in response.headers
+    except requests.RequestException:
+        return False
+
+
+def _ffmpeg_headers(http_headers: Dict[str, str]) -> str:
+    return "".join(f"{key}: {value}\r\n" for key, value in http_headers.items())
+
+
+def generate_screenshots(video_path: str, output_dir: str, timestamps: List[int],
+                         http_headers: Optional[Dict[str, str]] = None) -> List[str]:
+    """
+    一次 ffmpeg 调用截取多个时间点，返回与 timestamps 顺序一致的图片路径
+    每个时间点作为一个带 -ss 的输入，ffmpeg 直接跳到该时间点之前的关键帧解码一帧，
+    不需要从头解码整个视频；相同时间点只截一次
+    video_path 也可以是支持 Range 的直链（需要时传入 http_headers），
+    此时 ffmpeg 只按需请求索引和各时间点附近的字节范围，完整视频不会落盘
+    """
+    if not timestamps:
+        return []
+    ffmpeg_path = get_ffmpeg_path()
+    os.makedirs(output_dir, exist_ok=True)
+
+    unique_ts = list(dict.fromkeys(timestamps))
+    ids = str(uuid.uuid4())
+    paths = {
+        ts: os.path.join(output_dir, f"screenshot_{index}{ids}.jpg")
+        for index, ts in enumerate(unique_ts)
+    }
+
+    for start in range(0, len(unique_ts), SCREENSHOT_BATCH_SIZE):
+        batch = unique_ts[start:start + SCREENSHOT_BATCH_SIZE]
+        command = [ffmpeg_path, "-hide_banner", "-loglevel", "error"]
+        for ts in batch:
+            if http_headers:
+                command += ["-headers", _ffmpeg_headers(http_headers)]
+            command += ["-noaccurate_seek", "-ss", str(ts), "-i", video_path]
+        for i, ts in enumerate(batch):
+            command += ["-map", f"{i}:v:0", "-frames:v", "1", "-q:v", "2", "-y", paths[ts]]
+
+        try:
+            subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8')
+        except subprocess.CalledProcessError as e:
+            from app.utils.logger import get_logger
+            logger = get_logger(__name__)
+            logger.error(f"FFmpeg 批量截图失败: {e}")
+            logger.error(f"FFmpeg 标准错误输出:\n{e.stderr}")
+            raise RuntimeError(f"生成截图失败: {e.stderr}") from e
+
+    return [paths[ts] for ts in timestamps]
+
+
+def probe_duration(media_path: str) -> Optional[float]:
+    """
+    读取 ffmpeg 输出中的 Duration 字段，返回媒体时长（秒），无法识别时返回 None
+    """
+    try:
+        result = subprocess.run([get_ffmpeg_path(), "-hide_banner", "-i", media_path],
+                                capture_output=True, text=True, encoding='utf-8', errors='ignore')
+    except (RuntimeError, OSError):
+        return None
+    match = re.search(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)", result.stderr)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def extract_audio_track(video_path: str, output_path: str) -> str:
+    """
+    从已下载的视频中分离音轨（直接拷贝，不重新编码），返回音频路径
+    """
+    ffmpeg_path = get_ffmpeg_path()
+
+    command = [
+        ffmpeg_path,
+        "-i", video_path,
+        "-vn",            # 丢弃视频流
+        "-c:a", "copy",   # 音频流原样拷贝
+        output_path,
+        "-y"
+    ]
+
+    try:
+        subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8')
+        return output_path
+    except subprocess.CalledProcessError as e:
+        from app.utils.logger import get_logger
+        logger = get_logger(__name__)
+        logger.error(f"FFmpeg 分离音轨失败: {e}")
+        logger.error(f"FFmpeg 标准错误输出:\n{e.stderr}")
+        raise RuntimeError(f"分离音轨失败: {e.stderr}") from e
@@ -0,0 +1,72 @@
+"""
+批量转写吞吐基准：模拟积压任务，同一批音频分别走逐个转写（WhisperTranscriber 默认路径）
+和跨任务批量转写（WhisperBatcher），输出每小时墙钟时间能处理的音频小时数
+
+用法（在 backend 目录下，需要本地已有或可下载 whisper 模型）：
+    python benchmarks/bench_batched_whisper.py a.m4a b.m4a --copies 4 --jobs 8 --batch-size 8
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def report(name: str, audio_seconds: float, wall: float, segments: int):
+    # 每墙钟小时处理的音频小时数，与音频秒数 / 墙钟秒数相同
+    print(f"{name:<10} {wall:>9.1f} {audio_seconds / wall:>14.1f} {segments:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio', nargs='+', help='测试音频文件')
+    parser.add_argument('--copies', type=int, default=1, help='每个文件重复提交的次数，用于模拟更多任务')
+    parser.add_argument('--jobs', type=int, default=8, help='批量模式下同时提交的任务数（模拟队列并发）')
+    parser.add_argument('--batch-size', type=int, default=8)
+    parser.add_argument('--model-size', default='base')
+    parser.add_argument('--cpu-threads', type=int, default=os.cpu_count() or 1,
+                        help='模型使用的 CPU 线程数，两种模式相同')
+    args = parser.parse_args()
+
+    from faster_whisper import decode_audio
+    from app.transcriber.batched import WhisperBatcher
+    from app.transcriber.whisper import WhisperTranscriber
+    from app.utils.audio_stream import SAMPLE_RATE
+
+    logging.getLogger('app.transcriber.batched').setLevel(logging.WARNING)
+
+    files = [path for path in args.audio for _ in range(args.copies)]
+    audio_seconds = sum(len(decode_audio(path, sampling_rate=SAMPLE_RATE)) / SAMPLE_RATE for path in args.audio)
+    audio_seconds *= args.copies
+
+    transcriber = WhisperTranscriber(model_size=args.model_size, device='cpu', cpu_threads=args.cpu_threads)
+    # 先加载模型，加载时间不计入两种模式的耗时
+    with transcriber.checkout_model():
+        pass
+    print(f"{len(files)} 个任务，共 {audio_seconds / 3600:.2f} 小时音频，模型 {args.model_size}"
+          f"（{transcriber.compute_type}，{args.cpu_threads} 线程），批大小 {args.batch_size}")
+    print(f"{'模式':<10} {'耗时(s)':>9} {'音频小时/墙钟小时':>14} {'片段数':>7}")
+
+    # 逐个转写：与关闭批量模式时 WhisperTranscriber.transcript 的路径相同
+    start = time.perf_counter()
+    segments = 0
+    for path in files:
+        with transcriber.checkout_model() as model:
+            segments_raw, _ = model.transcribe(path)
+            segments += sum(1 for _ in segments_raw)
+    report('sequential', audio_seconds, time.perf_counter() - start, segments)
+
+    # 批量转写：多个任务同时提交，片段在同一个后台线程中凑批解码
+    batcher = WhisperBatcher(transcriber.checkout_model, batch_size=args.batch_size)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+        results = list(executor.map(batcher.transcribe, files))
+    report('batched', audio_seconds, time.perf_counter() - start, sum(len(r.segments) for r in results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+多进程分块转写的加速比基准：同一段音频分别用 1、2、4 … 个进程转写，
+输出墙钟时间、实时倍率（音频时长 / 耗时）、相对单进程的加速比和并行效率
+
+用法（在 backend 目录下，需要本地已有或可下载 whisper 模型）：
+    python benchmarks/bench_parallel_whisper.py audio.m4a --model-size base --workers 1,2,4,8
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def default_workers():
+    counts = []
+    n = 1
+    while n <= (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return ",".join(map(str, counts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('audio', help='测试音频文件，建议 30 分钟以上')
+    parser.add_argument('--model-size', default='base')
+    parser.add_argument('--workers', default=default_workers(), help='逗号分隔的进程数，默认 1 到 CPU 核数按 2 倍增长')
+    parser.add_argument('--chunk-seconds', type=float, default=None,
+                        help='每个窗口的目标长度，默认按音频时长和最大进程数均分（不超过 WHISPER_CHUNK_SECONDS）')
+    args = parser.parse_args()
+
+    import numpy as np
+    from faster_whisper import decode_audio
+    from app.transcriber.parallel import ParallelWhisperRunner, _transcribe_chunk
+    from app.transcriber.whisper import WhisperTranscriber, WHISPER_CHUNK_SECONDS
+    from app.utils.audio_stream import SAMPLE_RATE
+
+    logging.getLogger('app.transcriber.parallel').setLevel(logging.WARNING)
+
+    workers_list = [int(n) for n in args.workers.split(',') if n.strip()]
+    transcriber = WhisperTranscriber(model_size=args.model_size, device='cpu')
+    transcriber.prepare_model_files()
+
+    duration = len(decode_audio(args.audio, sampling_rate=SAMPLE_RATE)) / SAMPLE_RATE
+    # 窗口数至少与最大进程数相同，否则多出来的进程没有活可干
+    chunk_seconds = args.chunk_seconds or min(WHISPER_CHUNK_SECONDS, duration / max(workers_list))
+    print(f"音频时长 {duration:.0f}s，模型 {args.model_size}（{transcriber.compute_type}），"
+          f"窗口 {chunk_seconds:.0f}s，CPU 核数 {os.cpu_count()}")
+    print(f"{'进程数':>6} {'耗时(s)':>9} {'实时倍率':>9} {'加速比':>7} {'并行效率':>9} {'片段数':>7}")
+
+    baseline = None
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    for workers in workers_list:
+        runner = ParallelWhisperRunner(args.model_size, transcriber.device, transcriber.compute_type,
+                                       transcriber.model_dir, workers=workers, chunk_seconds=chunk_seconds)
+        # 先让每个进程完成模型加载，加载时间不计入转写耗时
+        for future in [runner.executor.submit(_transcribe_chunk, 0.0, silence) for _ in range(workers)]:
+            future.result()
+
+        start = time.perf_counter()
+        result = runner.transcribe(args.audio)
+        seconds = time.perf_counter() - start
+        runner.executor.shutdown()
+
+        # 加速比相对第一行（默认单进程）计算
+        if baseline is None:
+            baseline = (seconds, workers)
+        speedup = baseline[0] / seconds
+        print(f"{workers:>6} {seconds:>9.1f} {duration / seconds:>9.1f} {speedup:>7.2f} "
+              f"{speedup * baseline[1] / workers:>9.0%} {len(result.segments):>7}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+video_tasks 查询延迟基准：表规模逐步增长到 1M 行，多个读线程并发调用 get_task_by_video，
+输出各规模下的 p50 / p95 / p99 延迟，验证 (platform, video_id, created_at) 索引让查询延迟不随行数增长
+
+用法（在 backend 目录下）：
+    python benchmarks/bench_sqlite_lookup.py --rows 1000000 --readers 8
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+PLATFORMS = ('bilibili', 'youtube', 'douyin')
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def row(i: int):
+    return f"BV{i:010d}", PLATFORMS[i % len(PLATFORMS)], f"task-{i}"
+
+
+def run_readers(readers: int, lookups: int, total_rows: int):
+    from app.db.video_task_dao import get_task_by_video
+
+    latencies = [[] for _ in range(readers)]
+    barrier = threading.Barrier(readers)
+
+    def reader(slot: int):
+        rng = random.Random(slot)
+        # 每个线程先建立自己的连接，不计入延迟
+        get_task_by_video(*row(0)[:2])
+        barrier.wait()
+        for _ in range(lookups):
+            video_id, platform, _ = row(rng.randrange(total_rows))
+            start = time.perf_counter()
+            assert get_task_by_video(video_id, platform) is not None
+            latencies[slot].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+    return [x for slot in latencies for x in slot], wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='最终行数')
+    parser.add_argument('--checkpoints', type=int, default=4, help='从 1 万行开始按 10 倍增长测量的次数')
+    parser.add_argument('--readers', type=int, default=8, help='并发读线程数')
+    parser.add_argument('--lookups', type=int, default=2000, help='每个读线程的查询次数')
+    parser.add_argument('--batch', type=int, default=50_000, help='insert_video_tasks 每批写入行数')
+    parser.add_argument('--keep', action='store_true', help='保留测试数据库')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_sqlite_')
+    # 必须在导入 app.db 之前指定数据库路径
+    os.environ['NOTE_DB_PATH'] = os.path.join(workdir, 'note_tasks.db')
+
+    from app.db.sqlite_client import get_connection
+    from app.db.video_task_dao import init_video_task_table, insert_video_tasks
+
+    # 每次查询都会写一条 INFO 日志，基准只测数据库本身
+    logging.getLogger('app.db.video_task_dao').setLevel(logging.WARNING)
+    init_video_task_table()
+
+    plan = get_connection().execute(
+        "EXPLAIN QUERY PLAN SELECT task_id FROM video_tasks WHERE platform = ? AND video_id = ? "
+        "ORDER BY created_at DESC, id DESC LIMIT 1", ('bilibili', 'BV0')
+    ).fetchall()
+    print(f"数据库: {os.environ['NOTE_DB_PATH']}")
+    print(f"查询计划: {' | '.join(str(step[-1]) for step in plan)}")
+    print(f"{'行数':>10} {'写入秒数':>8} {'p50(ms)':>9} {'p95(ms)':>9} {'p99(ms)':>9} {'查询/秒':>10}")
+
+    checkpoints = sorted({min(args.rows, 10_000 * 10 ** i) for i in range(args.checkpoints)} | {args.rows})
+    inserted = 0
+    for target in checkpoints:
+        start = time.perf_counter()
+        while inserted < target:
+            end = min(target, inserted + args.batch)
+            insert_video_tasks(row(i) for i in range(inserted, end))
+            inserted = end
+        insert_seconds = time.perf_counter() - start
+
+        latencies, wall = run_readers(args.readers, args.lookups, inserted)
+        print(f"{inserted:>10} {insert_seconds:>8.2f} "
+              f"{percentile(latencies, 50) * 1000:>9.3f} {percentile(latencies, 95) * 1000:>9.3f} "
+              f"{percentile(latencies, 99) * 1000:>9.3f} {len(latencies) / wall:>10.0f}")
+
+    if not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
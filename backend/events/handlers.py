@@ -2,24 +2,33 @@ import os
 from app.utils.logger import get_logger
 logger = get_logger(__name__)
 
+def _remove(path: str):
+    try:
+        os.remove(path)
+        logger.info(f"删除文件：{path}")
+    except Exception as e:
+        logger.error(f"删除失败：{path}，原因：{e}")
+
+
 def cleanup_temp_files(data):
     logger.info(f"starting cleanup temp files ：{data['file_path']}")
     file_path = data['file_path']
+    # 截图用视频的文件名带格式号（如 BV….f30032.mp4），也可能单独下载到其他位置，直接按路径删除
+    video_path = data.get('video_path')
+    if video_path and os.path.exists(video_path):
+        _remove(video_path)
+
     if not os.path.exists(file_path):
         logger.warning(f"路径不存在：{file_path}")
         return
 
     dir_path = os.path.dirname(file_path)
     base_name = os.path.basename(file_path)
-    video_id, _ = os.path.splitext(base_name)
+    # 音频文件名可能带格式号（如 BV….f30280.m4a），优先按 video_id 匹配同一视频的所有文件
+    video_id = data.get('video_id') or os.path.splitext(base_name)[0]
 
     logger.info(f"开始清理 video_id={video_id} 所有相关文件")
 
     for file in os.listdir(dir_path):
         if file.startswith(video_id):
-            full_path = os.path.join(dir_path, file)
-            try:
-                os.remove(full_path)
-                logger.info(f"删除文件：{full_path}")
-            except Exception as e:
-                logger.error(f"删除失败：{full_path}，原因：{e}")
+            _remove(os.path.join(dir_path, file))
@@ -1,17 +1,22 @@
 import os
 
+from dotenv import load_dotenv
+
+# app 下的模块在导入时读取配置（数据库路径、缓存、分段预算等），必须先加载 .env 再导入
+load_dotenv()
+
 import uvicorn
 from starlette.staticfiles import StaticFiles
-from dotenv import load_dotenv
 from app.utils.logger import get_logger
 from app import create_app
+from app.db.note_result_dao import init_note_result_table, import_json_results
 from app.db.video_task_dao import init_video_task_table
-from app.transcriber.transcriber_provider import get_transcriber
+from app.routers.note import task_queue, NOTE_OUTPUT_DIR
+from app.services.warmup import warmup
 from events import register_handler
 from ffmpeg_helper import ensure_ffmpeg_or_raise
 
 logger = get_logger(__name__)
-load_dotenv()
 
 # 读取 .env 中的路径
 static_path = os.getenv('STATIC', '/static')
@@ -39,12 +44,12 @@ app.mount(screenshots_url, StaticFiles(directory=out_dir), name="screenshots")
 async def startup_event():
     register_handler()
     ensure_ffmpeg_or_raise()
-    try:
-        get_transcriber()
-    except Exception as e:
-        logger.error(f"初始化转录器失败，但不影响应用启动: {e}")
-        logger.warning("注意：转录功能可能无法正常使用，但其他功能不受影响")
     init_video_task_table()
+    init_note_result_table()
+    import_json_results(NOTE_OUTPUT_DIR)
+    task_queue.start()
+    # 重量级模块在后台加载，不阻塞服务启动
+    warmup.start()
 
 if __name__ == "__main__":
     port = int(os.getenv("BACKEND_PORT", 8000))
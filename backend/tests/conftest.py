@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# 测试从 backend 目录导入 app 包
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# 测试使用临时数据库，不写入 backend/note_tasks.db
+if not os.getenv('NOTE_DB_PATH'):
+    os.environ['NOTE_DB_PATH'] = os.path.join(tempfile.mkdtemp(prefix='bilinote_test_'), 'note_tasks.db')
@@ -0,0 +1,87 @@
+import os
+import stat
+import sys
+import time
+
+import pytest
+
+from app.models.audio_model import RemoteMediaSource
+from app.utils import audio_stream
+from app.utils.audio_stream import AudioStream, StreamNotStartedError, SAMPLE_RATE, BYTES_PER_SAMPLE
+
+# 本地替身：忽略参数，按 PCM_SECONDS 向 stdout 输出静音 PCM，再按 EXIT_CODE 退出
+FAKE_FFMPEG = """#!{python}
+import os, sys
+sys.stderr.write(os.environ.get("FAKE_STDERR", ""))
+for _ in range(int(os.environ.get("PCM_SECONDS", "0"))):
+    sys.stdout.buffer.write(b"\\0" * {second_bytes})
+    sys.stdout.buffer.flush()
+sys.exit(int(os.environ.get("EXIT_CODE", "0")))
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    path = tmp_path / "ffmpeg"
+    path.write_text(FAKE_FFMPEG.format(python=sys.executable, second_bytes=SAMPLE_RATE * BYTES_PER_SAMPLE))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(audio_stream, "get_ffmpeg_path", lambda: str(path))
+    return monkeypatch
+
+
+def _stream(tmp_path, window_seconds: float = 2) -> AudioStream:
+    source = RemoteMediaSource(url="https://example.invalid/a.m4a", title="t", duration=10, cover_url=None,
+                               platform="bilibili", video_id="BV1", raw_info={})
+    return AudioStream(source, str(tmp_path / "BV1.m4a"), window_seconds=window_seconds)
+
+
+def test_failure_before_first_window_is_reported_for_fallback(tmp_path, fake_ffmpeg):
+    fake_ffmpeg.setenv("EXIT_CODE", "1")
+    fake_ffmpeg.setenv("FAKE_STDERR", "403 Forbidden")
+    fake_ffmpeg.setenv("PCM_SECONDS", "1")
+    stream = _stream(tmp_path)
+    with pytest.raises(StreamNotStartedError, match="403"):
+        list(stream.windows())
+    stream.close()
+
+
+def test_failure_after_first_window_is_not_retried(tmp_path, fake_ffmpeg):
+    fake_ffmpeg.setenv("EXIT_CODE", "1")
+    fake_ffmpeg.setenv("PCM_SECONDS", "5")
+    stream = _stream(tmp_path)
+    windows = stream.windows()
+    next(windows)
+    with pytest.raises(RuntimeError) as excinfo:
+        list(windows)
+    assert not isinstance(excinfo.value, StreamNotStartedError)
+    stream.close()
+
+
+def test_pcm_buffer_is_bounded(tmp_path, fake_ffmpeg):
+    fake_ffmpeg.setattr(audio_stream, "STREAM_BUFFER_SECONDS", 2)
+    fake_ffmpeg.setenv("PCM_SECONDS", "30")
+    stream = _stream(tmp_path).start()
+    time.sleep(1)
+    # 没有消费时读取线程停在队列上，ffmpeg 写满管道后也停下
+    assert stream._queue.qsize() <= 2
+    assert stream._process.poll() is None
+
+    windows = list(stream.windows())
+    assert sum(len(samples) for _, samples in windows) == 30 * SAMPLE_RATE
+    assert stream._process.returncode == 0
+
+
+def test_note_generator_falls_back_when_stream_cannot_start(tmp_path, fake_ffmpeg):
+    from app.services.note import NoteGenerator
+
+    class ConsumingTranscriber:
+        def transcript_stream(self, windows, file_path):
+            list(windows)
+
+    fake_ffmpeg.setenv("EXIT_CODE", "1")
+    generator = NoteGenerator.__new__(NoteGenerator)
+    generator.task_id = None
+    generator.transcriber = ConsumingTranscriber()
+    source = _stream(tmp_path).source
+    assert generator.stream_download_and_transcribe(source, str(tmp_path), {}) is None
+    assert not os.path.exists(tmp_path / "BV1.m4a")
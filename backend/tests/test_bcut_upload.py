@@ -0,0 +1,116 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.transcriber import bcut
+
+PER_SIZE = 1024
+PARTS = 4
+
+
+class _BcutHandler(BaseHTTPRequestHandler):
+    # 本地必剪上传接口替身：申请上传、分片 PUT（可指定分片首次失败）、提交上传
+    def log_message(self, *args):
+        pass
+
+    def _json(self, data: dict):
+        payload = json.dumps(data).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def do_POST(self):
+        body = json.loads(self._body())
+        base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        if self.path == "/resource/create":
+            self._json({"code": 0, "data": {
+                "size": body["size"],
+                "per_size": PER_SIZE,
+                "upload_urls": [f"{base}/part/{i}" for i in range(PARTS)],
+                "in_boss_key": "boss",
+                "resource_id": "res",
+                "upload_id": "up",
+            }})
+        elif self.path == "/resource/create/complete":
+            self.server.committed = body
+            self._json({"code": 0, "data": {"download_url": f"{base}/audio"}})
+
+    def do_PUT(self):
+        clip = int(self.path.rsplit("/", 1)[1])
+        data = self._body()
+        server = self.server
+        with server.lock:
+            server.puts.append(clip)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            fail = clip in server.fail_once
+            server.fail_once.discard(clip)
+        # 让并发上传的分片在服务端重叠（测试中 time.sleep 被替换，这里用 Event 等待）
+        threading.Event().wait(0.1)
+        with server.lock:
+            server.in_flight -= 1
+        if fail:
+            self.send_response(500)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        server.received[clip] = data
+        self.send_response(200)
+        self.send_header('Etag', f'"etag-{clip}"')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+@pytest.fixture
+def bcut_server(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _BcutHandler)
+    server.lock = threading.Lock()
+    server.puts = []
+    server.received = {}
+    server.fail_once = set()
+    server.in_flight = server.max_in_flight = 0
+    server.committed = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(bcut, "API_REQ_UPLOAD", base + "/resource/create")
+    monkeypatch.setattr(bcut, "API_COMMIT_UPLOAD", base + "/resource/create/complete")
+    # 重试退避不需要真的等待
+    monkeypatch.setattr(bcut.time, "sleep", lambda seconds: None)
+    yield server
+    server.shutdown()
+
+
+def test_parts_upload_concurrently_and_only_failed_part_is_resent(bcut_server, tmp_path):
+    audio = tmp_path / "audio.mp3"
+    content = bytes(range(256)) * (PER_SIZE * PARTS // 256 - 1)
+    audio.write_bytes(content)
+    bcut_server.fail_once = {2}
+
+    download_url = bcut.BcutTranscriber()._upload(str(audio))
+
+    assert download_url.endswith("/audio")
+    assert sorted(bcut_server.puts) == [0, 1, 2, 2, 3]
+    assert bcut_server.max_in_flight > 1
+    # 各分片内容与文件切片一致，最后一个分片不足 per_size
+    for clip in range(PARTS):
+        assert bcut_server.received[clip] == content[clip * PER_SIZE:(clip + 1) * PER_SIZE]
+    # 提交时 Etag 按分片顺序排列，与完成顺序无关
+    assert bcut_server.committed["Etags"] == "etag-0,etag-1,etag-2,etag-3"
+
+
+def test_part_failing_past_retries_fails_the_upload(bcut_server, tmp_path, monkeypatch):
+    audio = tmp_path / "audio.mp3"
+    audio.write_bytes(b"\0" * PER_SIZE * PARTS)
+    monkeypatch.setattr(bcut, "BCUT_UPLOAD_RETRIES", 0)
+    bcut_server.fail_once = {1}
+
+    with pytest.raises(bcut.requests.HTTPError):
+        bcut.BcutTranscriber()._upload(str(audio))
+    assert bcut_server.committed is None
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from app.models.transcriber_model import TranscriptResult
+from app.transcriber import hedged
+from app.transcriber.base import Transcriber, TranscriptionCancelled, check_cancelled
+
+BUDGET = 0.3
+
+
+class StandInTranscriber(Transcriber):
+    """
+    后端替身：记录启动时间，按 seconds 耗时返回结果或抛出 error，期间每 10ms 检查一次取消信号
+    """
+
+    def __init__(self, name: str, seconds: float, error: Exception = None):
+        self.name = name
+        self.seconds = seconds
+        self.error = error
+        self.started_at = None
+        self.cancelled = threading.Event()
+
+    def transcript(self, file_path: str) -> TranscriptResult:
+        self.started_at = time.time()
+        deadline = self.started_at + self.seconds
+        try:
+            while time.time() < deadline:
+                check_cancelled()
+                time.sleep(0.01)
+        except TranscriptionCancelled:
+            self.cancelled.set()
+            raise
+        if self.error is not None:
+            raise self.error
+        return TranscriptResult(language="zh", full_text=self.name, segments=[])
+
+
+@pytest.fixture(autouse=True)
+def short_budget(monkeypatch):
+    monkeypatch.setattr(hedged, "probe_duration", lambda path: None)
+    monkeypatch.setattr(hedged, "HEDGE_MIN_BUDGET_SECONDS", BUDGET)
+
+
+def test_backup_launches_after_budget_and_cancels_the_loser():
+    local = StandInTranscriber("local", seconds=5)
+    cloud = StandInTranscriber("cloud", seconds=0.05)
+
+    start = time.time()
+    result = hedged.HedgedTranscriber([("local", local), ("cloud", cloud)]).transcript("audio.m4a")
+
+    assert result.full_text == "cloud"
+    # 备用后端在预算耗尽后才启动，采用先返回的结果
+    assert cloud.started_at - local.started_at >= BUDGET * 0.9
+    assert time.time() - start < 2
+    # 落后的首选后端收到取消信号
+    assert local.cancelled.wait(1)
+
+
+def test_primary_within_budget_never_launches_backup():
+    local = StandInTranscriber("local", seconds=0.05)
+    cloud = StandInTranscriber("cloud", seconds=0.05)
+
+    result = hedged.HedgedTranscriber([("local", local), ("cloud", cloud)]).transcript("audio.m4a")
+
+    assert result.full_text == "local"
+    time.sleep(BUDGET)
+    assert cloud.started_at is None
+
+
+def test_first_result_wins_when_primary_finishes_after_backup_launch():
+    local = StandInTranscriber("local", seconds=BUDGET + 0.1)
+    cloud = StandInTranscriber("cloud", seconds=5)
+
+    result = hedged.HedgedTranscriber([("local", local), ("cloud", cloud)]).transcript("audio.m4a")
+
+    assert result.full_text == "local"
+    assert cloud.started_at is not None
+    assert cloud.cancelled.wait(1)
+
+
+def test_failed_primary_launches_backup_without_waiting():
+    local = StandInTranscriber("local", seconds=0, error=RuntimeError("模型加载失败"))
+    cloud = StandInTranscriber("cloud", seconds=0.05)
+
+    result = hedged.HedgedTranscriber([("local", local), ("cloud", cloud)]).transcript("audio.m4a")
+
+    assert result.full_text == "cloud"
+    assert cloud.started_at - local.started_at < BUDGET
+
+
+def test_all_backends_failing_raises():
+    local = StandInTranscriber("local", seconds=0, error=RuntimeError("a"))
+    cloud = StandInTranscriber("cloud", seconds=0, error=RuntimeError("b"))
+
+    with pytest.raises(RuntimeError, match="所有转写后端均失败"):
+        hedged.HedgedTranscriber([("local", local), ("cloud", cloud)]).transcript("audio.m4a")
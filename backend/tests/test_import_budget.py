@@ -0,0 +1,42 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 这些模块只应在第一次使用或后台预热时加载
+HEAVY_MODULES = ('yt_dlp', 'openai', 'faster_whisper', 'huggingface_hub', 'execjs', 'torch')
+# 冷启动导入耗时上限（秒），本机约 0.6 秒，留出余量给较慢的 CI 机器
+IMPORT_BUDGET_SECONDS = float(os.getenv('IMPORT_BUDGET_SECONDS', 3))
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"seconds": time.perf_counter() - start, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _cold_import(module: str) -> dict:
+    # 在新的解释器中导入，不受其他测试已加载模块的影响
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR},
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_note_service_import_does_not_load_heavy_modules():
+    result = _cold_import("app.services.note")
+    loaded = [name for name in HEAVY_MODULES if name in result["modules"]]
+    assert loaded == []
+
+
+def test_note_service_import_within_budget():
+    result = _cold_import("app.services.note")
+    assert result["seconds"] < IMPORT_BUDGET_SECONDS
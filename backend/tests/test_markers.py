@@ -0,0 +1,52 @@
+from app.gpt.utils import format_time
+from app.services.screenshot_prefetch import parse_screenshot_markers
+from app.utils.note_helper import replace_content_markers
+
+
+def test_screenshot_marker_past_100_minutes():
+    assert format_time(6330) == "105:30"
+    assert parse_screenshot_markers("*Screenshot-[105:30]") == [("Screenshot-[105:30]", 6330)]
+    assert parse_screenshot_markers("*Screenshot-105:30 与 *Screenshot-03:39") == [
+        ("*Screenshot-105:30", 6330),
+        ("*Screenshot-03:39", 219),
+    ]
+
+
+def test_content_marker_past_100_minutes():
+    markdown = replace_content_markers("见 *Content-[105:30]", "BV1xx", "bilibili")
+    assert markdown == "见 [原片 @ 105:30](https://www.bilibili.com/video/BV1xx?t=6330)"
+
+
+def test_provider_prompt_timestamps_past_one_hour():
+    from app.gpt.openai_gpt import OpenaiGPT
+    from app.models.transcriber_model import TranscriptSegment
+
+    # 只渲染提示词，不创建客户端
+    gpt = OpenaiGPT.__new__(OpenaiGPT)
+    messages = gpt.create_messages([TranscriptSegment(start=4520, end=4525, text="结尾")], "标题", "", False, False)
+    assert "75:20 - 结尾" in messages[0]["content"]
+
+
+def test_map_reduce_passes_provider_kwargs():
+    from app.gpt.base import GPT
+    from app.gpt.map_reduce import MapReduceSummarizer
+    from app.models.gpt_model import GPTSource
+    from app.models.transcriber_model import TranscriptSegment
+
+    class RecordingGPT(GPT):
+        def __init__(self):
+            self.calls = []
+
+        def completion_kwargs(self):
+            return {"extra_headers": {"X-Title": "BiliNote"}}
+
+        def cached_chat_completion(self, messages, temperature=0.7, **kwargs):
+            self.calls.append(kwargs)
+            return "要点", False
+
+    gpt = RecordingGPT()
+    segments = [TranscriptSegment(start=i * 10, end=i * 10 + 10, text="内容" * 20) for i in range(6)]
+    source = GPTSource(title="标题", segment=segments, tags="", screenshot=False, link=False)
+    MapReduceSummarizer(gpt, token_budget=60).summarize(source)
+    assert len(gpt.calls) > 2
+    assert all(call == {"extra_headers": {"X-Title": "BiliNote"}} for call in gpt.calls)
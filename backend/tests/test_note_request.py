@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import note as note_router
+
+VIDEO_URL = "https://www.bilibili.com/video/BV1GJ411x7h7"
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.include_router(note_router.router)
+    return TestClient(app)
+
+
+def test_unknown_model_size_is_rejected():
+    for model_size in ("../../etc", "huge", "base/../../tmp"):
+        response = _client().post("/generate_note", json={
+            "video_url": VIDEO_URL, "platform": "bilibili", "quality": "fast", "model_size": model_size,
+        })
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"][-1] == "model_size"
+
+
+def test_supported_model_size_is_accepted():
+    request = note_router.VideoRequest(video_url=VIDEO_URL, platform="bilibili", quality="fast",
+                                       model_size="large-v3")
+    assert request.model_size.value == "large-v3"
+    assert note_router.VideoRequest(video_url=VIDEO_URL, platform="bilibili", quality="fast").model_size is None
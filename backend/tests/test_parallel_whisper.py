@@ -0,0 +1,86 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.transcriber import parallel
+from app.transcriber.base import set_segment_listener
+
+
+class FakeModel:
+    """
+    按窗口长度返回一个片段，窗口越靠前耗时越长，用于检查结果仍按时间顺序合并
+    """
+
+    def transcribe(self, samples):
+        seconds = len(samples) / parallel.SAMPLE_RATE
+        time.sleep(0.05 if seconds > 1.5 else 0.01)
+        return [SimpleNamespace(start=0.0, end=seconds, text=f" {seconds:.0f}s ")], SimpleNamespace(language="zh")
+
+
+def _runner(workers: int) -> parallel.ParallelWhisperRunner:
+    runner = parallel.ParallelWhisperRunner.__new__(parallel.ParallelWhisperRunner)
+    runner.workers = workers
+    runner.chunk_seconds = 60
+    runner.executor = ThreadPoolExecutor(max_workers=workers)
+    return runner
+
+
+def test_streamed_windows_are_transcribed_in_parallel_and_merged_in_order(monkeypatch):
+    monkeypatch.setattr(parallel, "_worker_model", FakeModel())
+    runner = _runner(workers=2)
+    pulled = []
+    max_ahead = 0
+    published = []
+
+    def windows():
+        nonlocal max_ahead
+        for i, seconds in enumerate([2, 1, 1, 1, 1, 1]):
+            pulled.append(i)
+            # 已提交但还没发布的窗口数不超过进程数的两倍
+            max_ahead = max(max_ahead, len(pulled) - len({seg.start for seg in published}))
+            yield float(i * 10), np.zeros(int(seconds * parallel.SAMPLE_RATE), dtype=np.float32)
+
+    set_segment_listener(published.append)
+    try:
+        result = runner.transcribe_windows(windows())
+    finally:
+        set_segment_listener(None)
+        runner.executor.shutdown()
+
+    assert [seg.start for seg in result.segments] == [0, 10, 20, 30, 40, 50]
+    assert [seg.text for seg in result.segments] == ["2s", "1s", "1s", "1s", "1s", "1s"]
+    assert published == result.segments
+    assert result.language == "zh"
+    assert max_ahead <= 2 * runner.workers + 1
+
+
+def test_runner_is_created_once_under_concurrent_requests(monkeypatch):
+    created = []
+
+    class FakeRunner:
+        def __init__(self, *args):
+            time.sleep(0.05)
+            created.append(args)
+
+    monkeypatch.setattr(parallel, "ParallelWhisperRunner", FakeRunner)
+    monkeypatch.setattr(parallel, "_runners", {})
+    reserved = []
+    monkeypatch.setattr(parallel.whisper_model_pool, "reserve", lambda size_mb, owner: reserved.append(size_mb))
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(
+            parallel.get_parallel_runner("base", "cpu", "int8", "/tmp", workers=4, chunk_seconds=60)))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(created) == 1
+    assert len({id(r) for r in results}) == 1
+    assert reserved == [4 * parallel.estimate_model_memory("base", "int8")]
@@ -0,0 +1,43 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import note as note_router
+from app.services.progress import ProgressTracker, progress_tracker
+
+
+def test_wait_for_unknown_task_does_not_evict_real_tasks():
+    tracker = ProgressTracker(max_tasks=2)
+    tracker.update("real", "transcribing", 50)
+
+    async def poll_unknown():
+        for i in range(5):
+            assert await tracker.wait_for_change(f"unknown-{i}", 0, 0.01) is None
+
+    asyncio.run(poll_unknown())
+    assert tracker.get("real")["stage"] == "transcribing"
+
+
+def test_wait_for_known_task_wakes_on_first_update():
+    tracker = ProgressTracker()
+
+    async def wait_then_update():
+        waiter = asyncio.ensure_future(tracker.wait_for_change("restored", 0, 5, known=True))
+        await asyncio.sleep(0.01)
+        tracker.update("restored", "downloading")
+        return await waiter
+
+    assert asyncio.run(wait_then_update())["stage"] == "downloading"
+
+
+def test_task_status_returns_304_for_matching_etag_without_wait():
+    app = FastAPI()
+    app.include_router(note_router.router)
+    client = TestClient(app)
+    progress_tracker.update("etag-task", "summarizing", 10)
+    etag = note_router.progress_etag(progress_tracker.get("etag-task"))
+
+    response = client.get("/task_status/etag-task", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
@@ -0,0 +1,132 @@
+import os
+import re
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.downloaders.youtube_downloader import YoutubeDownloader
+from app.services.note import NoteGenerator
+from app.utils.video_helper import probe_range_support
+
+PAYLOAD = bytes(range(256)) * 4096
+
+
+class _MediaHandler(BaseHTTPRequestHandler):
+    # 本地替身：返回固定内容的 mp4，按 support_range 决定是否响应 Range 请求
+    support_range = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body_only: bool):
+        self.server.requests.append((self.command, self.headers.get('Range')))
+        payload = self.server.payload
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get('Range') or "")
+        if self.support_range and match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), len(payload) - 1) if match.group(2) else len(payload) - 1
+            body = payload[start:end + 1]
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(payload)}")
+        else:
+            body = payload
+            self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(body)))
+        if self.support_range:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.end_headers()
+        if not body_only:
+            return
+        try:
+            self.wfile.write(body)
+            self.server.bytes_sent += len(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 探测 Range 时客户端只读两个字节就断开
+            pass
+
+    def do_GET(self):
+        self._send(body_only=True)
+
+    def do_HEAD(self):
+        self._send(body_only=False)
+
+
+class _NoRangeHandler(_MediaHandler):
+    support_range = False
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.payload = PAYLOAD
+    server.requests = []
+    server.bytes_sent = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def range_server():
+    server = _serve(_MediaHandler)
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def no_range_server():
+    server = _serve(_NoRangeHandler)
+    yield server
+    server.shutdown()
+
+
+def _url(server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/video.mp4"
+
+
+def test_probe_range_support(range_server, no_range_server):
+    assert probe_range_support(_url(range_server))
+    assert not probe_range_support(_url(no_range_server))
+
+
+def test_remote_video_falls_back_without_range(range_server, no_range_server):
+    downloader = YoutubeDownloader()
+    for server, expected in ((range_server, True), (no_range_server, False)):
+        url = _url(server)
+        info = downloader.extract_info(url)
+        source = NoteGenerator.resolve_remote_video(downloader, url, "fast", info)
+        assert (source is not None) == expected
+        if source is not None:
+            assert source.url == url
+
+
+def test_resolve_and_download_share_one_extraction(range_server, tmp_path):
+    downloader = YoutubeDownloader()
+    url = _url(range_server)
+    info = NoteGenerator.extract_media_info(downloader, url)
+    extracted = len(range_server.requests)
+
+    downloader.resolve_video_stream(url, "fast", info=info)
+    downloader.resolve_audio_stream(url, "fast", info=info)
+    assert len(range_server.requests) == extracted
+
+    audio = downloader.download(url, output_dir=str(tmp_path), info=info)
+    # 只多出下载本身的请求，没有重新解析
+    downloads = range_server.requests[extracted:]
+    assert [method for method, _ in downloads] == ['GET']
+    assert os.path.getsize(next(tmp_path.iterdir())) == len(PAYLOAD)
+    assert audio.video_id == info['id']
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="需要 ffmpeg")
+def test_remote_screenshot_reads_only_needed_ranges(range_server, tmp_path):
+    from app.utils.video_helper import generate_screenshots
+
+    src = tmp_path / "src.mp4"
+    os.system(f"ffmpeg -loglevel error -f lavfi -i testsrc=duration=60:size=320x240:rate=10 "
+              f"-g 10 -movflags +faststart {src}")
+    range_server.payload = src.read_bytes()
+    paths = generate_screenshots(_url(range_server), str(tmp_path / "shots"), [5, 50])
+    assert all(os.path.exists(p) for p in paths)
+    assert range_server.bytes_sent < len(range_server.payload)
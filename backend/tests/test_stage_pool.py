@@ -0,0 +1,41 @@
+import threading
+
+from app.services.stage_pool import StagePool
+from app.transcriber.base import set_stage_release, release_stage
+
+
+def test_slot_released_early_lets_next_task_in():
+    pool = StagePool({'transcribe': 1})
+    uploaded = threading.Event()
+    finish = threading.Event()
+
+    def remote_transcribe():
+        with pool.stage('transcribe') as slot:
+            set_stage_release(slot.release)
+            try:
+                # 上传完成，开始等待远端结果
+                release_stage()
+                uploaded.set()
+                finish.wait(5)
+            finally:
+                set_stage_release(None)
+
+    worker = threading.Thread(target=remote_transcribe)
+    worker.start()
+    assert uploaded.wait(5)
+
+    # 前一个任务仍在等待远端结果，后一个任务已经可以进入转写阶段
+    with pool.stage('transcribe'):
+        assert pool.snapshot()['transcribe']['active'] == 1
+    finish.set()
+    worker.join(5)
+
+    # 离开阶段时不会重复释放
+    snapshot = pool.snapshot()['transcribe']
+    assert snapshot['active'] == 0
+    with pool.stage('transcribe'):
+        assert not pool._semaphores['transcribe'].acquire(blocking=False)
+
+
+def test_release_stage_without_slot_is_a_no_op():
+    release_stage()
@@ -0,0 +1,83 @@
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.models.gpt_model import GPTSource
+from app.models.transcriber_model import TranscriptSegment
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    # 本地 OpenAI 兼容接口替身：记录每次请求，非流式返回 JSON，流式按 SSE 逐段返回
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.calls.append(body)
+        base = {"id": "chatcmpl-stub", "created": 0, "model": body["model"]}
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for text in ("# 笔记", "\n内容"):
+                chunk = dict(base, object="chat.completion.chunk",
+                             choices=[{"index": 0, "delta": {"content": text}, "finish_reason": None}])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+        payload = json.dumps(dict(base, object="chat.completion", choices=[{
+            "index": 0,
+            "message": {"role": "assistant", "content": "# 笔记\n内容"},
+            "finish_reason": "stop",
+        }])).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def stub_gpt(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _ChatHandler)
+    server.calls = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-stub")
+    monkeypatch.setenv("OPENAI_API_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setenv("OPENAI_MODEL", "stub-model")
+    monkeypatch.setenv("NO_PROXY", "127.0.0.1")
+    from app.gpt.openai_gpt import OpenaiGPT
+    yield OpenaiGPT(), server
+    server.shutdown()
+
+
+def _source() -> GPTSource:
+    # 每个测试使用不同标题，避免命中其他测试写入的缓存
+    return GPTSource(title=f"标题-{uuid.uuid4()}", segment=[TranscriptSegment(start=0, end=5, text="你好")],
+                     tags="", screenshot=False, link=False)
+
+
+def test_same_prompt_calls_upstream_once(stub_gpt):
+    gpt, server = stub_gpt
+    source = _source()
+    stats = {}
+    assert gpt.summarize(source, stats) == "# 笔记\n内容"
+    assert gpt.summarize(source, stats) == "# 笔记\n内容"
+    assert len(server.calls) == 1
+    assert stats['cache_hits'] == 1
+
+
+def test_stream_shares_cache_with_single_upstream_call(stub_gpt):
+    gpt, server = stub_gpt
+    source = _source()
+    stats = {}
+    assert "".join(gpt.summarize_stream(source, stats)) == "# 笔记\n内容"
+    assert "".join(gpt.summarize_stream(source, stats)) == "# 笔记\n内容"
+    # 流式写入的缓存，非流式调用同样命中
+    assert gpt.summarize(source, stats) == "# 笔记\n内容"
+    assert len(server.calls) == 1
+    assert server.calls[0]["stream"] is True
+    assert stats['cache_hits'] == 2
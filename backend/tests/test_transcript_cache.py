@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+from app.models.audio_model import RemoteMediaSource
+from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.services.note import NoteGenerator
+from app.services.transcript_cache import get_transcript_cache, audio_identity
+
+
+def _generator() -> NoteGenerator:
+    generator = NoteGenerator.__new__(NoteGenerator)
+    generator.transcriber = SimpleNamespace(model_size="base", compute_type="int8")
+    generator.task_id = None
+    return generator
+
+
+def _source(format_id):
+    return RemoteMediaSource(url="https://example.invalid/a.m4a", title="t", duration=10, cover_url=None,
+                             platform="bilibili", video_id="BV1cache", raw_info={}, format_id=format_id)
+
+
+def test_cache_is_looked_up_by_format_id_before_download(tmp_path):
+    generator = _generator()
+    cache = get_transcript_cache()
+    transcript = TranscriptResult(language="zh", full_text="你好",
+                                  segments=[TranscriptSegment(start=0, end=1, text="你好")])
+    key = cache.build_key("bilibili", "BV1cache", audio_identity(None, "30280"), generator.transcriber)
+    cache.set(key, "bilibili", "BV1cache", generator.transcriber, transcript)
+
+    timings = {}
+    cached = generator.lookup_cached_transcript(_source("30280"), timings)
+    assert cached is not None and cached.full_text == "你好"
+    assert timings['transcript_cache_hits'] == 1
+
+    # 其他格式号、没有格式号时不命中，需要下载后再查询
+    assert generator.lookup_cached_transcript(_source("30216"), {}) is None
+    assert generator.lookup_cached_transcript(_source(None), {}) is None
+
+    audio = generator.audio_from_source(_source("30280"), str(tmp_path))
+    assert audio.file_path == str(tmp_path / "BV1cache.m4a")
+    assert audio.format_id == "30280"
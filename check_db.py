@@ -1,6 +1,13 @@
+import os
 import sqlite3
 
-conn = sqlite3.connect('note_tasks.db')
+# 与后端相同的查找顺序：NOTE_DB_PATH、当前目录下的旧版数据库、backend/note_tasks.db
+db_path = os.getenv('NOTE_DB_PATH') or 'note_tasks.db'
+if not os.path.exists(db_path):
+    db_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend', 'note_tasks.db')
+print("Database:", db_path)
+
+conn = sqlite3.connect(db_path)
 cursor = conn.cursor()
 
 # 检查表